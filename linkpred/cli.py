@@ -91,6 +91,10 @@ def handle_arguments(args=None):
         "cache-predictions",
         "cache-evaluations",
         "fmax",
+        "auc",
+        "average-precision",
+        "r-precision",
+        "precision-at-k",
     ]
     output_help = (
         "Type of output(s) to produce (default: recall-precision). "
@@ -150,6 +154,16 @@ def handle_arguments(args=None):
         help=all_help,
     )
 
+    parser.add_argument(
+        "-k",
+        "--top-k",
+        dest="top_k",
+        type=int,
+        default=None,
+        help="Only keep the K highest-scoring predictions of each predictor",
+        metavar="K",
+    )
+
     parser.add_argument("-P", "--profile", help="JSON/YAML profile file")
 
     parser.add_argument("training-file", help="File with the training network")
@@ -1,3 +1,4 @@
 """Module for evaluating link prediction results"""
+from .metrics import *
 from .scoresheet import *
 from .static import *
@@ -5,7 +5,15 @@ from time import localtime, strftime
 import smokesignal
 
 from ..util import interpolate
-from .static import EvaluationSheet
+from .metrics import (
+    average_precision,
+    precision_at_k,
+    r_precision,
+    recall_at_k,
+    roc_auc,
+    scores_and_labels,
+)
+from .static import EvaluationSheet, UndefinedError
 
 log = logging.getLogger(__name__)
 
@@ -21,6 +29,11 @@ __all__ = [
     "ROCPlotter",
     "PrecisionAtKListener",
     "MarkednessPlotter",
+    "RankingMetricListener",
+    "AUCListener",
+    "AveragePrecisionListener",
+    "RPrecisionListener",
+    "CutoffListener",
 ]
 
 
@@ -74,7 +87,7 @@ class CacheEvaluationListener(Listener):
         super().__init__()
 
     def on_evaluation_finished(self, evaluation, dataset, predictor):
-        self.fname = _timestamped_filename(f"{dataset}-{predictor}-predictions")
+        self.fname = _timestamped_filename(f"{dataset}-{predictor}-predictions", "npz")
         evaluation.to_file(self.fname)
 
 
@@ -113,6 +126,112 @@ class PrecisionAtKListener(Listener):
         log.info("Evaluation finished: %s", status)
 
 
+class RankingMetricListener(Listener):
+    """Write a measure computed straight from the predictions to a file
+
+    Unlike listeners that respond to ``evaluation_finished``, these do not
+    need an `EvaluationSheet`: the measure is computed from the scores and
+    relevance of the predictions (see `linkpred.evaluation.metrics`).
+    Subclasses implement `measure()`.
+
+    Arguments
+    ---------
+    name : string
+        name used in the output file name
+
+    relevant : a set
+        relevant items
+
+    universe : an int or None
+        number of items in the universe, if known
+
+    """
+
+    metric = ""
+
+    def __init__(self, name, relevant, universe=None):
+        self.relevant = relevant
+        self.num_relevant = len(relevant)
+        self.num_universe = universe
+        self.fname = _timestamped_filename(f"{name}-{self.metric}")
+
+        smokesignal.on("prediction_finished", self.on_prediction_finished)
+        super().__init__()
+
+    def measure(self, scores, labels):
+        raise NotImplementedError
+
+    def on_prediction_finished(self, scoresheet, dataset, predictor):
+        scores, labels = scores_and_labels(scoresheet, self.relevant)
+        try:
+            value = f"{self.measure(scores, labels):.4f}"
+        except UndefinedError as e:
+            log.warning("%s undefined for %s: %s", self.metric, predictor, e)
+            value = "nan"
+
+        status = f"{dataset}\t{predictor}\t{value}\n"
+        with open(self.fname, "a") as f:
+            f.write(status)
+        log.info("Evaluation finished: %s", status)
+
+
+class AUCListener(RankingMetricListener):
+    """Write area under the ROC curve, see `roc_auc()`"""
+
+    metric = "AUC"
+
+    def measure(self, scores, labels):
+        return roc_auc(scores, labels, self.num_relevant, self.num_universe)
+
+
+class AveragePrecisionListener(RankingMetricListener):
+    """Write average precision, see `average_precision()`"""
+
+    metric = "average-precision"
+
+    def measure(self, scores, labels):
+        return average_precision(scores, labels, self.num_relevant)
+
+
+class RPrecisionListener(RankingMetricListener):
+    """Write R-precision, see `r_precision()`"""
+
+    metric = "R-precision"
+
+    def measure(self, scores, labels):
+        return r_precision(scores, labels, self.num_relevant)
+
+
+class CutoffListener(RankingMetricListener):
+    """Write precision and recall at several cut-offs
+
+    Each line has the dataset, predictor, cut-off, precision and recall.
+
+    """
+
+    metric = "precision-at-k"
+
+    def __init__(self, name, relevant, universe=None, cutoffs=(10, 100, 1000)):
+        self.cutoffs = list(cutoffs)
+        super().__init__(name, relevant, universe)
+
+    def on_prediction_finished(self, scoresheet, dataset, predictor):
+        scores, labels = scores_and_labels(scoresheet, self.relevant)
+        precision = precision_at_k(scores, labels, self.cutoffs)
+        if self.num_relevant:
+            recall = recall_at_k(scores, labels, self.cutoffs, self.num_relevant)
+        else:
+            recall = [float("nan")] * len(self.cutoffs)
+
+        status = "".join(
+            f"{dataset}\t{predictor}\t{k}\t{p:.4f}\t{r:.4f}\n"
+            for k, p, r in zip(self.cutoffs, precision, recall)
+        )
+        with open(self.fname, "a") as f:
+            f.write(status)
+        log.info("Evaluation finished: %s", status)
+
+
 GENERIC_CHART_LOOKS = [
     "k-",
     "k--",
@@ -0,0 +1,293 @@
+"""Summary measures computed directly from scores and relevance
+
+Unlike `EvaluationSheet`, which stores the numbers of tp, fp, fn and tn after
+every item of a ranking, the functions in this module only compute a single
+number (or a few). They take an array of scores and an array of booleans
+telling which items are relevant, in any order, and need at most one sort.
+
+Ties are treated fairly: the result is the average over all orderings of
+tied items. Relevant items that have not been scored at all can be taken into
+account with `num_relevant`.
+
+Example
+-------
+>>> scores = [0.9, 0.8, 0.8, 0.1]
+>>> labels = [True, False, True, False]
+>>> round(float(average_precision(scores, labels)), 4)
+0.9167
+>>> precision_at_k(scores, labels, [1, 2])
+array([1.  , 0.75])
+
+"""
+
+import numpy as np
+
+from .scoresheet import ArrayScoresheet, Pair
+from .static import UndefinedError
+
+__all__ = [
+    "average_precision",
+    "precision_at_k",
+    "r_precision",
+    "recall_at_k",
+    "roc_auc",
+    "scores_and_labels",
+]
+
+
+def scores_and_labels(scoresheet, relevant):
+    """Get arrays of scores and relevance of all items in `scoresheet`
+
+    The items are not ranked; both arrays follow the same (arbitrary) order.
+
+    Arguments
+    ---------
+    scoresheet : a scoresheet
+        predictions
+
+    relevant : a set
+        relevant items
+
+    Returns
+    -------
+    scores : array of floats
+
+    labels : array of bools
+        true for each relevant item
+
+    """
+    if isinstance(scoresheet, ArrayScoresheet) and all(
+        isinstance(item, Pair) for item in relevant
+    ):
+        # Compare integer codes rather than Pairs
+        rows, cols, scores = scoresheet.arrays()
+        codes = scoresheet.encode(rows, cols)
+        return scores, np.isin(codes, scoresheet.encode_pairs(relevant))
+
+    if isinstance(scoresheet, dict):
+        items = scoresheet.items()
+    else:
+        items = scoresheet.ranked_items()
+    n = len(scoresheet)
+    scores = np.empty(n, dtype=float)
+    labels = np.empty(n, dtype=bool)
+    for i, (item, score) in enumerate(items):
+        scores[i] = score
+        labels[i] = item in relevant
+    return scores, labels
+
+
+def _as_arrays(scores, labels):
+    scores = np.asarray(scores, dtype=float)
+    labels = np.asarray(labels, dtype=bool)
+    if scores.shape != labels.shape:
+        msg = "Scores and labels should have the same length"
+        raise ValueError(msg)
+    return scores, labels
+
+
+def _num_relevant(labels, num_relevant):
+    num_relevant = int(labels.sum()) if num_relevant is None else num_relevant
+    if num_relevant == 0:
+        msg = "Measure is undefined if there are no relevant items"
+        raise UndefinedError(msg)
+    return num_relevant
+
+
+def _tie_groups(scores, labels):
+    """Get sizes and numbers of relevant items of groups of tied scores
+
+    Groups are in decreasing order of score.
+
+    """
+    order = np.argsort(-scores, kind="stable")
+    scores, labels = scores[order], labels[order]
+    starts = np.flatnonzero(np.r_[True, scores[1:] != scores[:-1]])
+    sizes = np.diff(np.r_[starts, len(scores)])
+    hits = np.add.reduceat(labels.astype(np.int64), starts)
+    return sizes, hits
+
+
+def roc_auc(scores, labels, num_relevant=None, num_universe=None):
+    """Area under the ROC curve
+
+    This is the probability that a random relevant item is ranked above a
+    random non-relevant item (ties count for half).
+
+    Arguments
+    ---------
+    scores : array of floats
+
+    labels : array of bools
+        true for each relevant item
+
+    num_relevant : int or None
+        Total number of relevant items. If larger than the number of relevant
+        items in `labels`, the others are ranked below all scored items.
+
+    num_universe : int or None
+        Total number of items. If given, the items that have not been scored
+        are ranked (tied) below all scored items.
+
+    """
+    scores, labels = _as_arrays(scores, labels)
+    if len(scores) == 0:
+        msg = "Measure is undefined if there are no retrieved items"
+        raise UndefinedError(msg)
+    num_relevant = _num_relevant(labels, num_relevant)
+    sizes, hits = _tie_groups(scores, labels)
+    misses = sizes - hits
+    num_scored_relevant, num_scored_other = int(hits.sum()), int(misses.sum())
+    if num_universe is None:
+        num_other = num_scored_other
+    else:
+        num_other = num_universe - num_relevant
+    if num_other <= 0:
+        msg = "Measure is undefined if there are no non-relevant items"
+        raise UndefinedError(msg)
+
+    # Non-relevant scored items below each group
+    below = num_scored_other - np.cumsum(misses)
+    wins = np.sum(hits * (below + 0.5 * misses))
+    unscored_other = num_other - num_scored_other
+    wins += num_scored_relevant * unscored_other
+    wins += 0.5 * (num_relevant - num_scored_relevant) * unscored_other
+    return wins / (num_relevant * num_other)
+
+
+def average_precision(scores, labels, num_relevant=None):
+    """Average of the precision at each relevant item
+
+    Relevant items that have not been scored (see `num_relevant`) count as a
+    precision of zero.
+
+    Arguments
+    ---------
+    scores : array of floats
+
+    labels : array of bools
+        true for each relevant item
+
+    num_relevant : int or None
+        total number of relevant items (default: number of relevant items in
+        `labels`)
+
+    """
+    scores, labels = _as_arrays(scores, labels)
+    num_relevant = _num_relevant(labels, num_relevant)
+    sizes, hits = _tie_groups(scores, labels)
+    # Every position within a group of t items, r of which are relevant, is
+    # relevant with probability r / t. If it is, the expected number of other
+    # relevant items before it in the group grows linearly with the position.
+    group = np.repeat(np.arange(len(sizes)), sizes)
+    before = np.cumsum(sizes) - sizes
+    hits_before = np.cumsum(hits) - hits
+    position = np.arange(1, len(scores) + 1)
+    offset = position - 1 - before[group]
+    step = (hits - 1) / np.maximum(sizes - 1, 1)
+    expected_hits = hits_before[group] + 1 + offset * step[group]
+    p_relevant = (hits / sizes)[group]
+    return np.sum(p_relevant * expected_hits / position) / num_relevant
+
+
+def _hits_at(scores, labels, cutoffs):
+    """Get expected number of relevant items among the top k, for each k"""
+    shape = np.shape(cutoffs)
+    cutoffs = np.atleast_1d(np.asarray(cutoffs, dtype=np.int64))
+    if np.any(cutoffs <= 0):
+        msg = "Cut-offs should be positive"
+        raise ValueError(msg)
+    n = len(scores)
+    result = np.full(cutoffs.shape, labels.sum(), dtype=float)
+    if n == 0:
+        return result.reshape(shape)
+    kmax = int(min(cutoffs.max(), n))
+    top = np.argpartition(-scores, kmax - 1)[:kmax]
+    top = top[np.argsort(-scores[top], kind="stable")]
+    top_scores = -scores[top]
+    top_hits = np.r_[0, np.cumsum(labels[top])]
+
+    # Items outside the top that are tied with its lowest score
+    lowest = -top_scores[-1]
+    rest = np.ones(n, dtype=bool)
+    rest[top] = False
+    rest &= scores == lowest
+    rest_size, rest_hits = rest.sum(), labels[rest].sum()
+
+    for i, k in enumerate(cutoffs.tolist()):
+        if k > n:
+            continue
+        threshold = top_scores[k - 1]
+        lo = np.searchsorted(top_scores, threshold, "left")
+        hi = np.searchsorted(top_scores, threshold, "right")
+        tied, tied_hits = hi - lo, top_hits[hi] - top_hits[lo]
+        if -threshold == lowest:
+            tied, tied_hits = tied + rest_size, tied_hits + rest_hits
+        result[i] = top_hits[lo] + (k - lo) * tied_hits / tied
+    return result.reshape(shape)
+
+
+def precision_at_k(scores, labels, k=10):
+    """Precision among the k highest-scoring items
+
+    Only the k highest scores are sorted. If fewer than k items have been
+    scored, the precision is still relative to k.
+
+    Arguments
+    ---------
+    scores : array of floats
+
+    labels : array of bools
+        true for each relevant item
+
+    k : int or list of ints
+        cut-off(s); for a list, an array with the precision at each cut-off is
+        returned
+
+    """
+    scores, labels = _as_arrays(scores, labels)
+    return _hits_at(scores, labels, k) / np.asarray(k)
+
+
+def recall_at_k(scores, labels, k=10, num_relevant=None):
+    """Recall among the k highest-scoring items
+
+    Arguments
+    ---------
+    scores : array of floats
+
+    labels : array of bools
+        true for each relevant item
+
+    k : int or list of ints
+        cut-off(s); for a list, an array with the recall at each cut-off is
+        returned
+
+    num_relevant : int or None
+        total number of relevant items (default: number of relevant items in
+        `labels`)
+
+    """
+    scores, labels = _as_arrays(scores, labels)
+    num_relevant = _num_relevant(labels, num_relevant)
+    return _hits_at(scores, labels, k) / num_relevant
+
+
+def r_precision(scores, labels, num_relevant=None):
+    """Precision among the R highest-scoring items, where R = #relevant
+
+    Arguments
+    ---------
+    scores : array of floats
+
+    labels : array of bools
+        true for each relevant item
+
+    num_relevant : int or None
+        total number of relevant items (default: number of relevant items in
+        `labels`)
+
+    """
+    scores, labels = _as_arrays(scores, labels)
+    num_relevant = _num_relevant(labels, num_relevant)
+    return _hits_at(scores, labels, num_relevant) / num_relevant
@@ -1,11 +1,67 @@
+import heapq
 import logging
 from collections import defaultdict
+from collections.abc import Mapping
+from itertools import islice
 
 import networkx as nx
+import numpy as np
 from networkx.readwrite.pajek import make_qstr
 
 log = logging.getLogger(__name__)
-__all__ = ["Pair", "BaseScoresheet", "Scoresheet"]
+__all__ = [
+    "Pair",
+    "BaseScoresheet",
+    "Scoresheet",
+    "BoundedScoresheet",
+    "ImplicitScoresheet",
+    "ProductScoresheet",
+    "RandomScoresheet",
+    "CommunityScoresheet",
+    "ArrayScoresheet",
+]
+
+
+def _ranks(items):
+    """Map each of the (distinct) items to its position in sorted order"""
+    try:
+        items = sorted(items)
+    except TypeError:
+        # Different types, as in Pair._sorted_tuple()
+        items = sorted(items, key=str)
+    return {item: i for i, item in enumerate(items)}
+
+
+def _node_ranks(nodes):
+    """Get array with the position of each node in sorted order
+
+    Ranking pairs by the ranks of their nodes gives the same order as in
+    `Scoresheet`, see `Scoresheet._tie_breakers()`.
+
+    """
+    ranks = _ranks(nodes)
+    return np.fromiter(map(ranks.get, nodes), dtype=np.intp, count=len(nodes))
+
+
+def _rank(scores, ties, n=None):
+    """Get indices of the `n` (default: all) highest scores in sorted order
+
+    Scores are sorted in decreasing order. Ties are broken by the arrays in
+    `ties`, in increasing order, with the last array as the most significant
+    (as in `np.lexsort`). If `n` is given, only the scores that can be among
+    the first `n` are sorted.
+
+    """
+    candidates = None
+    if n is not None and n < len(scores):
+        if n <= 0:
+            return np.empty(0, dtype=np.intp)
+        kth = np.partition(scores, len(scores) - n)[len(scores) - n]
+        candidates = np.flatnonzero(scores >= kth)
+        scores = scores[candidates]
+        ties = [array[candidates] for array in ties]
+    order = np.lexsort((*ties, -scores))[:n]
+    return order if candidates is None else candidates[order]
 
 
 class BaseScoresheet(defaultdict):
@@ -26,14 +82,43 @@ class BaseScoresheet(defaultdict):
 
     """
 
+    # Cached ranking as lists of keys and their scores. It is reset whenever
+    # the scoresheet changes.
+    _ranking = None
+
     def __init__(self, data=None):
         defaultdict.__init__(self, float)
         if data:
             self.update(self.process_data(data))
 
     def __setitem__(self, key, val):
+        self._ranking = None
         dict.__setitem__(self, key, float(val))
 
+    def __delitem__(self, key):
+        self._ranking = None
+        dict.__delitem__(self, key)
+
+    def update(self, *args, **kwargs):
+        self._ranking = None
+        defaultdict.update(self, *args, **kwargs)
+
+    def setdefault(self, key, default=None):
+        self._ranking = None
+        return defaultdict.setdefault(self, key, default)
+
+    def pop(self, *args):
+        self._ranking = None
+        return defaultdict.pop(self, *args)
+
+    def popitem(self):
+        self._ranking = None
+        return defaultdict.popitem(self)
+
+    def clear(self):
+        self._ranking = None
+        defaultdict.clear(self)
+
     def process_data(self, data):
         """Can be overridden by child classes"""
         return data
@@ -41,6 +126,10 @@ class BaseScoresheet(defaultdict):
     def ranked_items(self, threshold=None):
         """Return items in decreasing order of their score
 
+        The ranking of all items is cached until the scoresheet changes. If
+        only the first `threshold` items are needed, only the items that
+        might be among them are sorted.
+
         Arguments
         ---------
         threshold : int
@@ -54,19 +143,36 @@ class BaseScoresheet(defaultdict):
         threshold = threshold or len(self)
         log.debug("Called Scoresheet.ranked_items(): threshold=%d", threshold)
 
-        # Sort first by score, then by key. This way, we always get the same
-        # ranking, even in case of ties.
-        # We use the tmp structure because it is much faster than
-        # itemgetter(1, 0).
-        tmp = ((score, key) for key, score in self.items())
-        ranked_data = sorted(tmp, reverse=True)
-
-        for score, key in ranked_data[:threshold]:
-            yield key, score
+        if self._ranking is None and threshold < len(self):
+            keys, scores = self._rank(threshold)
+        else:
+            if self._ranking is None:
+                self._ranking = self._rank()
+            keys, scores = self._ranking
+        yield from zip(keys[:threshold], scores[:threshold])
 
     def top(self, n=10):
         return dict(self.ranked_items(threshold=n))
 
+    def _rank(self, n=None):
+        """Get keys and scores of the first `n` (default: all) ranked items
+
+        Items are sorted first by score, then by key (both decreasing). This
+        way, we always get the same ranking, even in case of ties.
+
+        """
+        keys, values = list(self.keys()), list(self.values())
+        scores = np.array(values, dtype=np.float64)
+        order = _rank(scores, [-ties for ties in self._tie_breakers(keys)], n)
+        order = order.tolist()
+        return [keys[i] for i in order], [values[i] for i in order]
+
+    @staticmethod
+    def _tie_breakers(keys):
+        """Get integer arrays by which keys are ordered, as for `np.lexsort`"""
+        ranks = _ranks(keys)
+        return [np.fromiter(map(ranks.get, keys), dtype=np.intp, count=len(keys))]
+
     @staticmethod
     def from_record(line, delimiter="\t"):
         line = line.rstrip("\n")
@@ -110,23 +216,41 @@ class Pair:
 
     """
 
+    # Pairs are created for every prediction, so we keep them small: both
+    # elements are stored in slots (without a tuple or instance dict) and the
+    # hash, needed for every scoresheet lookup, is only computed once.
+    __slots__ = ("_a", "_b", "_hash")
+
     def __init__(self, *args):
-        if len(args) == 1:
+        if len(args) == 2:
+            a, b = args
+        elif len(args) == 1:
             key = args[0]
             if isinstance(key, Pair):
-                a, b = key.elements
-            elif isinstance(key, tuple) and len(key) == 2:
+                self._a, self._b, self._hash = key._a, key._b, key._hash
+                return
+            if isinstance(key, tuple) and len(key) == 2:
                 a, b = key
             else:
                 raise TypeError("Key '%s' is not a Pair or tuple." % (key))
-        elif len(args) == 2:
-            a, b = args
         else:
             msg = "__init__() takes 1 or 2 arguments in addition to self"
             raise TypeError(msg)
         # For link prediction, a and b are two different nodes
         assert a != b, f"Predicted link ({a}, {b}) is a self-loop!"
-        self.elements = self._sorted_tuple((a, b))
+        try:
+            if a < b:
+                a, b = b, a
+        except TypeError:
+            a, b = self._sorted_tuple((a, b))
+        self._a = a
+        self._b = b
+        self._hash = hash((a, b))
+
+    @property
+    def elements(self):
+        """Tuple of both elements, in sorted (descending) order"""
+        return (self._a, self._b)
 
     @staticmethod
     def _sorted_tuple(t):
@@ -138,9 +262,13 @@ class Pair:
             # cases but should be enough for most real-world scenarios.
             return (a, b) if str(a) > str(b) else (b, a)
 
+    def __reduce__(self):
+        # The cached hash may differ between processes, so it is not pickled
+        return (Pair, (self._a, self._b))
+
     def __eq__(self, other):
         try:
-            return self.elements == other.elements
+            return self._a == other._a and self._b == other._b
         except AttributeError:
             return self.elements == self._sorted_tuple(other)
 
@@ -169,19 +297,19 @@ class Pair:
         return self.elements[idx]
 
     def __hash__(self):
-        return hash(self.elements)
+        return self._hash
 
     def __str__(self):
-        return "{} - {}".format(*self.elements)
+        return f"{self._a} - {self._b}"
 
     def __repr__(self):
         return "Pair%s" % repr(self.elements)
 
     def __iter__(self):
-        return iter(self.elements)
+        return iter((self._a, self._b))
 
     def __len__(self):
-        return len(self.elements)
+        return 2
 
 
 class Scoresheet(BaseScoresheet):
@@ -192,16 +320,39 @@ class Scoresheet(BaseScoresheet):
     """
 
     def __getitem__(self, key):
-        return BaseScoresheet.__getitem__(self, Pair(key))
+        if type(key) is not Pair:
+            key = Pair(key)
+        return BaseScoresheet.__getitem__(self, key)
 
     def __setitem__(self, key, val):
-        BaseScoresheet.__setitem__(self, Pair(key), float(val))
+        if type(key) is not Pair:
+            key = Pair(key)
+        self._ranking = None
+        dict.__setitem__(self, key, float(val))
 
     def __delitem__(self, key):
-        return dict.__delitem__(self, Pair(key))
+        if type(key) is not Pair:
+            key = Pair(key)
+        self._ranking = None
+        return dict.__delitem__(self, key)
+
+    @staticmethod
+    def _tie_breakers(keys):
+        # Rank the nodes rather than the pairs: pairs are then ordered by
+        # their first and second (i.e., largest and smallest) node.
+        firsts = [key._a for key in keys]
+        seconds = [key._b for key in keys]
+        ranks = _ranks({*firsts, *seconds})
+        return [
+            np.fromiter(map(ranks.get, seconds), dtype=np.intp, count=len(keys)),
+            np.fromiter(map(ranks.get, firsts), dtype=np.intp, count=len(keys)),
+        ]
 
     def process_data(self, data, weight="weight"):
-        if isinstance(data, dict):
+        if isinstance(data, Scoresheet):
+            # Keys are already Pairs and values floats
+            return data
+        if isinstance(data, Mapping):
             return {Pair(k): float(v) for k, v in data.items()}
         if isinstance(data, nx.Graph):
             return {Pair(u, v): float(d[weight]) for u, v, d in data.edges(data=True)}
@@ -218,3 +369,695 @@ class Scoresheet(BaseScoresheet):
         u, v = key
         u, v, score = map(make_qstr, (u, v, value))
         return f"{u}{delimiter}{v}{delimiter}{score}\n"
+
+
+class BoundedScoresheet(Scoresheet):
+    """Scoresheet that only keeps the `n` highest-scoring pairs
+
+    Pairs are ranked in the same way as in `ranked_items`, so this yields the
+    same result as `top(n)` of a scoresheet holding all pairs, while only
+    using memory for `n` pairs. Since dropped pairs are forgotten, each pair
+    should be set only once (or always to the same score); incrementing
+    scores with `+=` is not supported.
+
+    Example
+    -------
+    >>> sheet = BoundedScoresheet(2)
+    >>> sheet[("a", "b")] = 0.8
+    >>> sheet[("b", "c")] = 0.5
+    >>> sheet[("c", "a")] = 0.9
+    >>> sorted(sheet.values())
+    [0.8, 0.9]
+
+    """
+
+    def __init__(self, n, data=None, excluded=()):
+        """
+        Arguments
+        ---------
+        n : int
+            maximum number of pairs to keep
+
+        data : mapping (e.g. a scoresheet), iterable of (pair, score) or None
+            initial data
+
+        excluded : container
+            pairs (as `Pair`s) that are never added to the scoresheet
+
+        """
+        defaultdict.__init__(self, float)
+        self.n = n
+        self.excluded = excluded
+        self._heap = []
+        if data:
+            items = data.items() if isinstance(data, Mapping) else data
+            for key, val in items:
+                self[key] = val
+
+    def __missing__(self, key):
+        # Do not insert missing pairs, as a defaultdict would
+        return 0.0
+
+    def __setitem__(self, key, val):
+        if type(key) is not Pair:
+            key = Pair(key)
+        if key in self.excluded or self.n <= 0:
+            return
+        self._ranking = None
+        val = float(val)
+        if dict.__contains__(self, key):
+            dict.__setitem__(self, key, val)
+            self._rebuild_heap()
+        elif len(self) < self.n:
+            dict.__setitem__(self, key, val)
+            heapq.heappush(self._heap, (val, key))
+        elif (val, key) > self._heap[0]:
+            _, dropped = heapq.heapreplace(self._heap, (val, key))
+            dict.__delitem__(self, dropped)
+            dict.__setitem__(self, key, val)
+
+    def __delitem__(self, key):
+        if type(key) is not Pair:
+            key = Pair(key)
+        self._ranking = None
+        dict.__delitem__(self, key)
+        self._rebuild_heap()
+
+    def _rebuild_heap(self):
+        self._heap = [(val, key) for key, val in self.items()]
+        heapq.heapify(self._heap)
+
+
+class ImplicitScoresheet(Mapping):
+    """Read-only scoresheet whose scores are computed when needed
+
+    Subclasses represent all scores implicitly (e.g., as a function of two
+    node vectors) and only compute the ones that are actually looked up or
+    iterated over. Pairs can be removed with `del`, which is how excluded
+    pairs are handled. Missing pairs have a score of 0.0, as in a
+    `Scoresheet`.
+
+    Subclasses should implement `_score()`, `_ranked()` and `_count()`.
+
+    """
+
+    def __init__(self):
+        self._deleted = set()
+
+    def _score(self, pair):
+        """Get score of `pair` or None if it is not in the scoresheet"""
+        raise NotImplementedError
+
+    def _ranked(self):
+        """Yield (pair, score) in decreasing order of score, ignoring `del`"""
+        raise NotImplementedError
+
+    def _count(self):
+        """Get number of pairs, ignoring `del`"""
+        raise NotImplementedError
+
+    def __getitem__(self, key):
+        if type(key) is not Pair:
+            key = Pair(key)
+        score = None if key in self._deleted else self._score(key)
+        return 0.0 if score is None else score
+
+    def __contains__(self, key):
+        if type(key) is not Pair:
+            key = Pair(key)
+        return key not in self._deleted and self._score(key) is not None
+
+    def __delitem__(self, key):
+        if type(key) is not Pair:
+            key = Pair(key)
+        if key in self._deleted or self._score(key) is None:
+            raise KeyError(key)
+        self._deleted.add(key)
+
+    def __len__(self):
+        return self._count() - len(self._deleted)
+
+    def __iter__(self):
+        for key, _ in self.ranked_items():
+            yield key
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} with {len(self)} pairs>"
+
+    def ranked_items(self, threshold=None):
+        """Return items in decreasing order of their score
+
+        Items are only computed as they are consumed.
+
+        Arguments
+        ---------
+        threshold : int
+            Maximum number of items to return (in total)
+
+        Returns
+        -------
+        (item, score) : tuple of item and score
+
+        """
+        threshold = threshold or len(self)
+        if threshold <= 0:
+            return
+        for key, score in self._ranked():
+            if key in self._deleted:
+                continue
+            yield key, score
+            threshold -= 1
+            if threshold == 0:
+                return
+
+    def top(self, n=10):
+        return dict(self.ranked_items(threshold=n))
+
+    to_record = staticmethod(Scoresheet.to_record)
+    to_file = BaseScoresheet.to_file
+
+
+class ArrayScoresheet(ImplicitScoresheet):
+    """Scoresheet that stores pairs and scores in arrays
+
+    Pairs are stored as two arrays of node indices (into `nodes`) and scores
+    as an array of floats, which takes 16 bytes per pair. Code that works
+    with arrays can use `arrays()` directly, without ever creating a `Pair`.
+    For other code, this behaves as a (read-only) scoresheet: `Pair`s are
+    only created when items are looked up or iterated over.
+
+    Pairs with the same score are ranked in the same order as in `Scoresheet`.
+
+    Example
+    -------
+    >>> sheet = ArrayScoresheet(["a", "b", "c"], [0, 1, 2], [1, 2, 0], [0.8, 0.5, 0.2])
+    >>> sheet[("c", "b")]
+    0.5
+    >>> for (x, y), score in sheet.ranked_items():
+    ...     print("{}-{}: {}".format(x, y, score))
+    b-a: 0.8
+    c-b: 0.5
+    c-a: 0.2
+
+    """
+
+    def __init__(self, nodes, rows, cols, scores):
+        """
+        Arguments
+        ---------
+        nodes : list
+            nodes that can be part of a pair
+
+        rows, cols : arrays of ints
+            indices (into `nodes`) of the nodes of each pair. Every pair
+            should occur only once.
+
+        scores : array of floats
+            score of each pair
+
+        """
+        super().__init__()
+        self.nodes = nodes
+        dtype = np.int32 if len(nodes) < 2**31 else np.int64
+        rows, cols = np.asarray(rows, dtype=dtype), np.asarray(cols, dtype=dtype)
+        self.rows = np.minimum(rows, cols)
+        self.cols = np.maximum(rows, cols)
+        self.scores = np.asarray(scores, dtype=np.float64)
+        self._positions = None
+        self._codes = None
+        self._order = None
+        self._ranks = None
+        self._ranking = None
+
+    def arrays(self):
+        """Get node indices and scores of all pairs (without deleted pairs)"""
+        if not self._deleted:
+            return self.rows, self.cols, self.scores
+        keep = ~np.isin(self._pair_codes(), self.encode_pairs(self._deleted))
+        return self.rows[keep], self.cols[keep], self.scores[keep]
+
+    def ranked_arrays(self):
+        """Get node indices and scores as in `arrays()`, in ranked order"""
+        if self._ranking is None:
+            self._ranking = self._rank()
+        ranking = self._ranking
+        if self._deleted:
+            deleted = self.encode_pairs(self._deleted)
+            ranking = ranking[~np.isin(self._pair_codes()[ranking], deleted)]
+        return self.rows[ranking], self.cols[ranking], self.scores[ranking]
+
+    def truncated(self, n):
+        """Get scoresheet with only the first `n` pairs of the ranking"""
+        rows, cols, scores = self.arrays()
+        if n < len(scores):
+            keep = _rank(scores, self._tie_breakers(rows, cols), n)
+            rows, cols, scores = rows[keep], cols[keep], scores[keep]
+        return self.__class__(self.nodes, rows, cols, scores)
+
+    def _rank(self, n=None):
+        """Get positions of the first `n` (default: all) pairs in the ranking"""
+        return _rank(self.scores, self._tie_breakers(self.rows, self.cols), n)
+
+    def _tie_breakers(self, rows, cols):
+        """Get arrays by which pairs with the same score are ranked
+
+        As in `Scoresheet`, pairs are ordered by their first and second node
+        (i.e., with the highest and lowest rank), both decreasing. The arrays
+        are meant for `_rank()`.
+
+        """
+        if self._ranks is None:
+            self._ranks = _node_ranks(self.nodes)
+        rows, cols = self._ranks[rows], self._ranks[cols]
+        return [-np.minimum(rows, cols), -np.maximum(rows, cols)]
+
+    def encode(self, rows, cols):
+        """Encode pairs of node indices (with `rows < cols`) as integers"""
+        return np.asarray(rows).astype(np.int64) * len(self.nodes) + cols
+
+    def encode_pairs(self, pairs):
+        """Encode node pairs as integers (see `encode()`)
+
+        Pairs with nodes that are not in `nodes` are left out.
+
+        """
+        positions = self._node_positions()
+        pairs = np.array(
+            [
+                sorted((positions[u], positions[v]))
+                for u, v in pairs
+                if u in positions and v in positions
+            ],
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        return self.encode(pairs[:, 0], pairs[:, 1])
+
+    def _pair_codes(self):
+        if self._codes is None:
+            self._codes = self.encode(self.rows, self.cols)
+        return self._codes
+
+    def _node_positions(self):
+        if self._positions is None:
+            self._positions = {v: i for i, v in enumerate(self.nodes)}
+        return self._positions
+
+    def _score(self, pair):
+        positions = self._node_positions()
+        u, v = pair
+        try:
+            i, j = sorted((positions[u], positions[v]))
+        except KeyError:
+            return None
+        codes = self._pair_codes()
+        if self._order is None:
+            self._order = np.argsort(codes, kind="stable")
+        code = i * len(self.nodes) + j
+        k = int(np.searchsorted(codes, code, sorter=self._order))
+        if k == len(codes) or codes[self._order[k]] != code:
+            return None
+        return float(self.scores[self._order[k]])
+
+    def ranked_items(self, threshold=None):
+        """Return items in decreasing order of their score
+
+        See `ImplicitScoresheet.ranked_items()`. The ranking of all pairs is
+        cached, but if only the first `threshold` pairs are needed (and the
+        ranking has not been cached yet), only pairs that might be among them
+        are sorted.
+
+        """
+        if threshold and self._ranking is None:
+            # Only rank the pairs that might be among the top, keeping in mind
+            # that deleted pairs may take up places in it
+            n = threshold + len(self._deleted)
+            if n < len(self.scores):
+                items = self._items(self._rank(n))
+                yield from islice(
+                    ((key, score) for key, score in items if key not in self._deleted),
+                    threshold,
+                )
+                return
+        yield from super().ranked_items(threshold)
+
+    def _ranked(self):
+        if self._ranking is None:
+            self._ranking = self._rank()
+        return self._items(self._ranking)
+
+    def _items(self, ranking):
+        """Yield (pair, score) for the given positions"""
+        nodes = self.nodes
+        for start in range(0, len(ranking), 1 << 16):
+            chunk = ranking[start : start + (1 << 16)]
+            for i, j, score in zip(
+                self.rows[chunk].tolist(),
+                self.cols[chunk].tolist(),
+                self.scores[chunk].tolist(),
+            ):
+                yield Pair(nodes[i], nodes[j]), score
+
+    def _count(self):
+        return len(self.scores)
+
+
+class ProductScoresheet(ImplicitScoresheet):
+    """Implicit scoresheet where each pair scores the product of node values
+
+    The score of the pair (u, v) is ``values[u] * values[v]``, where values
+    should not be negative. Only pairs that score at least `minimum` are
+    included. Ranked items are generated lazily from the distinct values in
+    decreasing order, such that getting the top `k` pairs only creates `k`
+    pairs. Pairs with the same score are ranked in the same order as in
+    `Scoresheet`.
+
+    Example
+    -------
+    >>> sheet = ProductScoresheet(["a", "b", "c"], [1, 2, 3])
+    >>> sheet[("a", "c")]
+    3.0
+    >>> for (x, y), score in sheet.ranked_items(2):
+    ...     print("{}-{}: {}".format(x, y, score))
+    c-b: 6.0
+    c-a: 3.0
+
+    """
+
+    def __init__(self, nodes, values, minimum=0):
+        """
+        Arguments
+        ---------
+        nodes : list
+            nodes that can be part of a pair
+
+        values : sequence of numbers
+            value of each node (same order as `nodes`)
+
+        minimum : number
+            minimum score of a pair to be included
+
+        """
+        super().__init__()
+        values = np.asarray(values, dtype=float)
+        self.minimum = minimum
+        self._nodes = list(nodes)
+        self._values = dict(zip(self._nodes, values.tolist()))
+        self._sorted = -np.sort(-values)
+        self._classes = None
+
+    def _score(self, pair):
+        u, v = pair
+        try:
+            score = self._values[u] * self._values[v]
+        except KeyError:
+            return None
+        return score if score >= self.minimum else None
+
+    def _value_classes(self):
+        """Group nodes by value, see `_ranked()`
+
+        Returns the distinct values in decreasing order, for each of these
+        the ranks of its nodes in increasing order, the distinct value of
+        each node rank and the node of each rank.
+
+        """
+        if self._classes is None:
+            nodes = self._nodes
+            ranks = _node_ranks(nodes)
+            by_rank = [None] * len(nodes)
+            for v, rank in zip(nodes, ranks.tolist()):
+                by_rank[rank] = v
+            values = np.array([self._values[v] for v in by_rank])
+            distinct, class_of = np.unique(-values, return_inverse=True)
+            order = np.argsort(class_of, kind="stable")
+            members = np.split(order, np.flatnonzero(np.diff(class_of[order])) + 1)
+            self._classes = (-distinct).tolist(), members, class_of, by_rank
+        return self._classes
+
+    def _ranked(self):
+        if len(self._nodes) <= 1:
+            return
+        values, members, class_of, by_rank = self._value_classes()
+        m = len(values)
+        # Pairs of nodes with the a-th and b-th highest value (a <= b) score
+        # less as b increases. The heap holds the next candidate (a, b) of
+        # each a that has been reached; all candidates with the same score
+        # are popped together.
+        heap = [(-values[0] * values[0], 0, 0)]
+        while heap:
+            score = heap[0][0]
+            partners = defaultdict(list)
+            while heap and heap[0][0] == score:
+                _, a, b = heapq.heappop(heap)
+                partners[a].append(b)
+                if a != b:
+                    partners[b].append(a)
+                if b + 1 < m:
+                    heapq.heappush(heap, (-values[a] * values[b + 1], a, b + 1))
+                if a == b and a + 1 < m:
+                    heapq.heappush(heap, (-values[a + 1] * values[a + 1], a + 1, a + 1))
+            score = -score
+            if score < self.minimum:
+                return
+            # Tied pairs are ranked by their first and then their second node
+            # (both decreasing), see `Scoresheet._tie_breakers()`
+            partners = {
+                a: np.sort(np.concatenate([members[b] for b in bs]))
+                for a, bs in partners.items()
+            }
+            firsts = np.concatenate([members[a] for a in partners])
+            for first in np.sort(firsts)[::-1].tolist():
+                others = partners[class_of[first]]
+                others = others[: np.searchsorted(others, first)]
+                u = by_rank[first]
+                for second in others[::-1].tolist():
+                    yield Pair(u, by_rank[second]), score
+
+    def _count(self):
+        values = self._sorted
+        n = len(values)
+        if self.minimum <= 0:
+            return n * (n - 1) // 2
+        # For every i, the j with values[i] * values[j] >= minimum form the
+        # prefix values[:ends[i]] (values are sorted in decreasing order).
+        with np.errstate(divide="ignore"):
+            thresholds = self.minimum / values
+        ends = np.searchsorted(-values, -thresholds, side="right")
+        # Correct for rounding errors in the division
+        while True:
+            over = ends < n
+            over[over] = values[over] * values[ends[over]] >= self.minimum
+            under = ends > 0
+            under[under] = values[under] * values[ends[under] - 1] < self.minimum
+            if not (over.any() or under.any()):
+                break
+            ends += over.astype(int) - under.astype(int)
+        return int(np.maximum(ends - np.arange(n) - 1, 0).sum())
+
+
+def _splitmix64(x):
+    """Hash array of uint64 to pseudo-random uint64 (SplitMix64 finalizer)"""
+    with np.errstate(over="ignore"):
+        x = x + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+
+class RandomScoresheet(ImplicitScoresheet):
+    """Implicit scoresheet where each pair gets a random score in [0, 1)
+
+    Scores are derived from `key` and the positions of both nodes by a hash
+    function, such that the same pair always gets the same score and scores
+    only need to be computed when they are looked up or iterated over.
+    Ranked items are found in rounds of increasing size, each scanning all
+    scores, so getting the top `k` pairs needs O(k) memory.
+
+    Example
+    -------
+    >>> sheet = RandomScoresheet(["a", "b", "c"], key=42)
+    >>> len(sheet)
+    3
+    >>> sheet[("a", "b")] == sheet[("b", "a")]
+    True
+
+    """
+
+    block_size = 1 << 20
+
+    def __init__(self, nodes, key=0):
+        """
+        Arguments
+        ---------
+        nodes : list
+            nodes that can be part of a pair
+
+        key : int
+            key from which all scores are derived
+
+        """
+        super().__init__()
+        self._nodes = list(nodes)
+        self._positions = {v: i for i, v in enumerate(self._nodes)}
+        self._key = _splitmix64(np.uint64(key % 2**64))
+
+    def _scores(self, rows, cols):
+        n = np.uint64(len(self._nodes))
+        rows, cols = np.minimum(rows, cols), np.maximum(rows, cols)
+        x = self._key ^ (rows.astype(np.uint64) * n + cols.astype(np.uint64))
+        return (_splitmix64(x) >> np.uint64(11)) * 2.0**-53
+
+    def _score(self, pair):
+        u, v = pair
+        try:
+            i, j = self._positions[u], self._positions[v]
+        except KeyError:
+            return None
+        return float(self._scores(np.array([i]), np.array([j]))[0])
+
+    def _blocks(self):
+        """Yield rows, cols and scores of all pairs in blocks"""
+        n = len(self._nodes)
+        start = 0
+        while start < n - 1:
+            # Rows start, start + 1... each have n - 1 - row pairs
+            counts = n - 1 - np.arange(start, n - 1)
+            stop = start + max(
+                1, int(np.searchsorted(np.cumsum(counts), self.block_size))
+            )
+            stop = min(stop, n - 1)
+            rows = np.repeat(np.arange(start, stop), counts[: stop - start])
+            offsets = np.arange(len(rows)) - np.repeat(
+                np.cumsum(counts[: stop - start]) - counts[: stop - start],
+                counts[: stop - start],
+            )
+            cols = rows + 1 + offsets
+            yield rows, cols, self._scores(rows, cols)
+            start = stop
+
+    def _ranked(self):
+        nodes = self._nodes
+        size = 1 << 12
+        # Pairs are ranked by score, then by row and column (all decreasing).
+        # `last` holds the sort key of the last pair yielded so far.
+        last = None
+        while True:
+            scores, rows, cols = np.empty(0), np.empty(0, int), np.empty(0, int)
+            for block_rows, block_cols, block_scores in self._blocks():
+                if last is None:
+                    below = np.ones(len(block_scores), dtype=bool)
+                else:
+                    s, r, c = last
+                    below = (block_scores < s) | (
+                        (block_scores == s)
+                        & ((block_rows < r) | ((block_rows == r) & (block_cols < c)))
+                    )
+                scores = np.concatenate((scores, block_scores[below]))
+                rows = np.concatenate((rows, block_rows[below]))
+                cols = np.concatenate((cols, block_cols[below]))
+                if len(scores) > size:
+                    keep = np.argpartition(-scores, size - 1)[:size]
+                    # Include all ties of the smallest score that is kept
+                    keep = scores >= scores[keep].min()
+                    scores, rows, cols = scores[keep], rows[keep], cols[keep]
+            if not len(scores):
+                return
+            order = np.lexsort((-cols, -rows, -scores))[:size]
+            for i, j, score in zip(
+                rows[order].tolist(), cols[order].tolist(), scores[order].tolist()
+            ):
+                yield Pair(nodes[i], nodes[j]), score
+            last = scores[order[-1]], rows[order[-1]], cols[order[-1]]
+            size *= 4
+
+    def _count(self):
+        n = len(self._nodes)
+        return n * (n - 1) // 2
+
+
+class CommunityScoresheet(ImplicitScoresheet):
+    """Implicit scoresheet based on nested communities at several levels
+
+    Communities are given as one array of community labels per level, from
+    the finest level (0) to the coarsest one. The score of a pair is the sum
+    of ``len(labels) - i`` over all levels `i` at which both nodes are in the
+    same community. Only pairs that share a community at some level are
+    included.
+
+    Communities should be nested, as the levels of a dendrogram: nodes in the
+    same community at one level are also in the same community at all coarser
+    levels. Memory use is proportional to the number of nodes times the number
+    of levels, and looking up a score takes O(levels) time. Pairs with the
+    same score are ranked in the same order as in `Scoresheet`.
+
+    Example
+    -------
+    >>> sheet = CommunityScoresheet(["a", "b", "c", "d"], [[0, 0, 1, 2], [0, 0, 0, 1]])
+    >>> sheet[("a", "b")], sheet[("a", "c")], sheet[("a", "d")]
+    (3.0, 1.0, 0.0)
+    >>> len(sheet)
+    3
+
+    """
+
+    def __init__(self, nodes, labels):
+        """
+        Arguments
+        ---------
+        nodes : list
+            nodes that can be part of a pair
+
+        labels : sequence of sequences
+            community label of each node (same order as `nodes`) at each
+            level, from finest to coarsest
+
+        """
+        super().__init__()
+        self._nodes = list(nodes)
+        self._positions = {v: i for i, v in enumerate(self._nodes)}
+        self._labels = np.asarray(labels, dtype=int).reshape(-1, len(self._nodes))
+        levels = len(self._labels)
+        self._weights = np.arange(levels, 0, -1, dtype=float)
+
+    def _score(self, pair):
+        u, v = pair
+        try:
+            i, j = self._positions[u], self._positions[v]
+        except KeyError:
+            return None
+        same = self._labels[:, i] == self._labels[:, j]
+        if not same.any():
+            return None
+        return float(self._weights[same].sum())
+
+    def _ranked(self):
+        nodes = self._nodes
+        n = len(nodes)
+        by_rank = np.argsort(_node_ranks(nodes))
+        labels = self._labels[:, by_rank]
+        # Pairs that first share a community at a finer level score higher
+        scores = np.cumsum(self._weights[::-1])[::-1].tolist()
+        previous = np.arange(n)
+        for current, score in zip(labels, scores):
+            # New pairs are pairs of nodes in the same community that were in
+            # different communities at the previous level. As in Scoresheet,
+            # they are ranked by their first and second node (decreasing).
+            order = np.argsort(current, kind="stable")
+            bounds = np.flatnonzero(np.diff(current[order])) + 1
+            members = dict(
+                zip(current[order[np.r_[0, bounds]]].tolist(), np.split(order, bounds))
+            )
+            for first in range(n - 1, 0, -1):
+                others = members[current[first]]
+                others = others[: np.searchsorted(others, first)]
+                others = others[previous[others] != previous[first]]
+                u = nodes[by_rank[first]]
+                for second in others[::-1].tolist():
+                    yield Pair(u, nodes[by_rank[second]]), score
+            previous = current
+
+    def _count(self):
+        if not len(self._labels):
+            return 0
+        _, sizes = np.unique(self._labels[-1], return_counts=True)
+        return int((sizes * (sizes - 1) // 2).sum())
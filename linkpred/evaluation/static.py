@@ -2,7 +2,7 @@ import logging
 
 import numpy as np
 
-from .scoresheet import BaseScoresheet
+from .scoresheet import ArrayScoresheet, BaseScoresheet, ImplicitScoresheet, Pair
 
 log = logging.getLogger(__name__)
 
@@ -113,7 +113,7 @@ class StaticEvaluation:
 
 def ensure_defined(func):
     def _wrapper(self, *args, **kwargs):
-        if self.data.shape[0] == 0:
+        if len(self) == 0:
             msg = "Measure is undefined if there are no relevant or retrieved items"
             raise UndefinedError(msg)
         return func(self, *args, **kwargs)
@@ -132,9 +132,61 @@ def ensure_universe_known(func):
     return _wrapper
 
 
+def _ranked_relevance(scoresheet, relevant):
+    """Get boolean array that is true for each relevant item, in ranked order"""
+    if isinstance(scoresheet, ArrayScoresheet) and all(
+        isinstance(item, Pair) for item in relevant
+    ):
+        # Compare integer codes rather than Pairs
+        rows, cols, _ = scoresheet.ranked_arrays()
+        codes = scoresheet.encode(rows, cols)
+        return np.isin(codes, scoresheet.encode_pairs(relevant))
+    return np.fromiter(
+        (item in relevant for item, _ in scoresheet.ranked_items()),
+        dtype=bool,
+        count=len(scoresheet),
+    )
+
+
+def _universe_size(scoresheet, relevant, universe):
+    """Get number of items in universe (-1 if unknown), see `StaticEvaluation`"""
+    if universe is None:
+        return -1
+    if isinstance(universe, int):
+        if len(relevant) > universe:
+            msg = "Retrieved cannot be larger than universe."
+            raise ValueError(msg)
+        return universe
+    universe = set(universe)
+    if not relevant <= universe:
+        msg = "Retrieved and relevant should be subsets of universe."
+        raise ValueError(msg)
+    if not all(item in universe for item in scoresheet):
+        msg = "Newly retrieved items should be a subset of currently unretrieved items."
+        raise ValueError(msg)
+    return len(universe)
+
+
+def _count_dtype(*counts):
+    """Get smallest integer dtype (int32 or int64) that fits all counts"""
+    return np.int32 if max(counts, default=0) < 2**31 else np.int64
+
+
 class EvaluationSheet:
+    """Numbers of tp, fp, fn and tn after each item of a ranking
+
+    An evaluation sheet is either created from a scoresheet and the relevant
+    items or from an array `data` with the four columns tp, fp, fn and tn.
+    In the former case, it only stores the cumulative numbers of true and
+    false positives as integers, together with the number of relevant items
+    (`num_relevant`) and the size of the universe (`num_universe`, -1 if
+    unknown). The numbers of false and true negatives follow from these and
+    are only computed when needed.
+
+    """
+
     def __init__(self, data=None, relevant=None, universe=None):
-        if isinstance(data, BaseScoresheet):
+        if isinstance(data, (BaseScoresheet, ImplicitScoresheet)):
             if relevant is None:
                 msg = (
                     "Cannot create evaluation sheet from "
@@ -142,49 +194,122 @@ class EvaluationSheet:
                 )
                 raise TypeError(msg)
             log.debug("Counting for evaluation sheet...")
-            static = StaticEvaluation(relevant=relevant, universe=universe)
-            # Initialize empty array of right dimensions
-            # 4 columns for tp, fp, fn, tn
-            self.data = np.empty((len(data), 4))
-            for i, (prediction, _) in enumerate(data.ranked_items()):
-                static.add_retrieved_item(prediction)
-                self.data[i] = (
-                    static.num_tp,
-                    static.num_fp,
-                    static.num_fn,
-                    static.num_tn,
-                )
+            relevant = set(relevant) if relevant else set()
+            is_relevant = _ranked_relevance(data, relevant)
+            num_universe = _universe_size(data, relevant, universe)
+            dtype = _count_dtype(len(is_relevant), len(relevant))
+            tp = np.cumsum(is_relevant, dtype=dtype)
+            fp = np.arange(1, len(tp) + 1, dtype=dtype) - tp
+            self._set_counts(tp, fp, len(relevant), num_universe)
+            if num_universe != -1 and len(self) and self.tn[-1] < 0:
+                msg = "Retrieved cannot be larger than universe."
+                raise ValueError(msg)
             log.debug("Finished counting evaluation sheet...")
         elif isinstance(data, np.ndarray):
-            self.data = data
+            self._data = data
         else:
             msg = f"Cannot create evaluation sheet from unknown data type {type(data)}."
             raise TypeError(msg)
 
+    @classmethod
+    def from_counts(cls, tp, fp, num_relevant, num_universe=-1):
+        """Create evaluation sheet from cumulative numbers of tp and fp
+
+        Arguments
+        ---------
+        tp, fp : arrays of ints
+            numbers of true and false positives after each item
+
+        num_relevant : int
+            number of relevant items
+
+        num_universe : int
+            number of items in the universe or -1 if unknown
+
+        """
+        sheet = cls.__new__(cls)
+        dtype = _count_dtype(len(tp), num_relevant)
+        sheet._set_counts(
+            np.asarray(tp, dtype=dtype),
+            np.asarray(fp, dtype=dtype),
+            num_relevant,
+            num_universe,
+        )
+        return sheet
+
+    def _set_counts(self, tp, fp, num_relevant, num_universe):
+        self._data = None
+        self._tp, self._fp = tp, fp
+        self.num_relevant = int(num_relevant)
+        self.num_universe = int(num_universe)
+
     def __len__(self):
-        return len(self.data)
+        return len(self.data) if self._data is not None else len(self._tp)
+
+    @property
+    def compact(self):
+        """True if only the cumulative numbers of tp and fp are stored"""
+        return self._data is None
+
+    @property
+    def data(self):
+        """Array with columns tp, fp, fn and tn (as floats)"""
+        if self._data is None:
+            return np.column_stack((self.tp, self.fp, self.fn, self.tn)).astype(float)
+        return self._data
 
     @property
     def tp(self):
-        return self.data[:, 0]
+        return self._tp if self._data is None else self._data[:, 0]
 
     @property
     def fp(self):
-        return self.data[:, 1]
+        return self._fp if self._data is None else self._data[:, 1]
 
     @property
     def fn(self):
-        return self.data[:, 2]
+        if self._data is None:
+            return self.num_relevant - self._tp
+        return self._data[:, 2]
 
     @property
     def tn(self):
-        return self.data[:, 3]
+        if self._data is not None:
+            return self._data[:, 3]
+        if self.num_universe == -1:
+            return np.full(len(self._tp), -1, dtype=self._tp.dtype)
+        # The universe may be too large for the dtype of the other counts
+        retrieved = (self._tp + self._fp).astype(np.int64)
+        return self.num_universe - retrieved - self.fn
 
     def to_file(self, fname, *args, **kwargs):
-        np.savetxt(fname, self.data, *args, **kwargs)
+        """Save to file *fname*
+
+        If *fname* ends in ``.npz``, a compact evaluation sheet is saved in
+        NumPy's binary format. Otherwise, the data are saved as text with
+        `np.savetxt`, which gets any other arguments.
+
+        """
+        if self._data is None and str(fname).endswith(".npz"):
+            totals = np.array([self.num_relevant, self.num_universe], dtype=np.int64)
+            with open(fname, "wb") as fh:
+                np.savez(fh, tp=self._tp, fp=self._fp, totals=totals)
+        else:
+            np.savetxt(fname, self.data, *args, **kwargs)
 
     @classmethod
     def from_file(cls, fname, *args, **kwargs):
+        """Load from file *fname*, saved with `to_file()`
+
+        Other arguments are passed to `np.loadtxt` for text files.
+
+        """
+        with open(fname, "rb") as fh:
+            # .npz files are zip files
+            binary = fh.read(4) == b"PK\x03\x04"
+        if binary:
+            with np.load(fname) as npz:
+                return cls.from_counts(npz["tp"], npz["fp"], *npz["totals"].tolist())
         data = np.loadtxt(fname, *args, **kwargs)
         return cls(data)
 
@@ -209,7 +334,7 @@ class EvaluationSheet:
     @ensure_defined
     @ensure_universe_known
     def accuracy(self):
-        return (self.tp + self.tn) / self.data.sum(axis=1)
+        return (self.tp + self.tn) / (self.tp + self.fp + self.fn + self.tn)
 
     @ensure_defined
     def f_score(self, beta=1):
@@ -249,4 +374,5 @@ class EvaluationSheet:
 
         """
         # Return single number: this is constant wrt what is retrieved
-        return ((self.tp + self.fn) / self.data.sum(axis=1))[0]
+        total = self.tp + self.fp + self.fn + self.tn
+        return ((self.tp + self.fn) / total)[0]
@@ -2,6 +2,7 @@
 import contextlib
 import logging
 import os
+from collections import defaultdict
 
 import networkx as nx
 import smokesignal
@@ -30,8 +31,10 @@ def for_comparison(G, exclude=None):
     if not exclude:
         return set(G.edges())
 
-    exclude = {Pair(u, v) for u, v in exclude}
-    return {Pair(u, v) for u, v in G.edges()} - exclude
+    pairs = {Pair(u, v) for u, v in G.edges()}
+    if isinstance(exclude, predictors.ExcludedPairs):
+        return {pair for pair in pairs if pair not in exclude}
+    return pairs - {Pair(u, v) for u, v in exclude}
 
 
 def pretty_print(name, params=None):
@@ -125,6 +128,7 @@ class LinkPred:
             "output": ["recall-precision"],
             "predictors": [],
             "test-file": None,
+            "top_k": None,
             "training-file": None,
         }
         if config:
@@ -142,17 +146,34 @@ class LinkPred:
         self.test = self.network("test-file")
         self.evaluator = None
         self.listeners = []
+        self._excluded = None
 
     @property
     def excluded(self):
-        """Get set of links that should not be predicted"""
+        """Get links that should not be predicted, as `ExcludedPairs`
+
+        This is built once for the current training network (so, again after
+        `preprocess()`) and shared by all predictors and the evaluator.
+
+        """
+        rule = self.exclusion_rule()
+        if self._excluded is None or self._excluded.index.G is not self.training:
+            index = predictors.GraphIndex.for_graph(self.training)
+            self._excluded = predictors.ExcludedPairs.from_rule(index, rule)
+        return self._excluded
+
+    def exclusion_rule(self):
+        """Get rule for the links that should not be predicted
+
+        This is either 'old', 'new' or None (no exclusions), see
+        `ExcludedPairs.from_rule()`.
+
+        """
         exclude = self.config["exclude"]
         if not exclude:
-            return set()  # No nodes are excluded
-        if exclude == "old":
-            return set(self.training.edges())
-        if exclude == "new":
-            return set(nx.non_edges(self.training))
+            return None
+        if exclude in ("old", "new"):
+            return exclude
 
         msg = (
             f"Value '{exclude}' for exclude is unexpected. Use either 'old', 'new' or "
@@ -210,7 +231,16 @@ class LinkPred:
             "roc": (l.ROCPlotter, True, {"name": self.label, "filetype": filetype}),
             "fmax": (l.FMaxListener, True, {"name": self.label}),
             "cache-evaluations": (l.CacheEvaluationListener, True, {}),
+            "auc": (l.AUCListener, True, {"name": self.label}),
+            "average-precision": (
+                l.AveragePrecisionListener,
+                True,
+                {"name": self.label},
+            ),
+            "r-precision": (l.RPrecisionListener, True, {"name": self.label}),
+            "precision-at-k": (l.CutoffListener, True, {"name": self.label}),
         }
+        comparison = None
 
         for output in self.config["output"]:
             name = output.lower()
@@ -221,25 +251,66 @@ class LinkPred:
                     msg = f"Cannot evaluate ({output}) without test network"
                     raise LinkPredError(msg)
 
-                # Set up an 'evaluator': a listener that routes predictions
-                # and turns them into evaluations
-                if not self.evaluator:
-                    test_set = for_comparison(self.test, exclude=self.excluded)
+                if comparison is None:
+                    excluded = self.excluded
+                    test_set = for_comparison(self.test, exclude=excluded)
                     n = len(self.test)
                     # Universe = all possible edges, except for the ones that
                     # we no longer consider because they're excluded
                     # Make sure we get an int here.
-                    num_universe = n * (n - 1) // 2 - len(self.excluded)
-                    self.evaluator = l.EvaluatingListener(
-                        relevant=test_set, universe=num_universe
-                    )
+                    num_universe = n * (n - 1) // 2 - len(excluded)
+                    comparison = {"relevant": test_set, "universe": num_universe}
+
+                if issubclass(listener, l.RankingMetricListener):
+                    # These compute their measure straight from predictions
+                    kwargs = {**kwargs, **comparison}
+                elif not self.evaluator:
+                    # Set up an 'evaluator': a listener that routes predictions
+                    # and turns them into evaluations
+                    self.evaluator = l.EvaluatingListener(**comparison)
 
             self.listeners.append(listener(**kwargs))
             log.debug("Added listener for '%s'", output)
 
+    def _neighbour_batches(self):
+        """Find groups of predictor profiles that can be computed together
+
+        Neighbour-based predictors that only differ in their name (and not in
+        their `weight` or `method` parameters) share the work of finding
+        common neighbours, see `predict_neighbour_measures`.
+
+        Returns
+        -------
+        batches : dict
+            Maps (weight, method) to the list of indices (in the list of
+            predictor profiles) of the profiles in the group. Profiles with
+            other parameters, or with the same name as an earlier profile in
+            the group, are left out.
+
+        """
+        groups = defaultdict(dict)
+        for i, predictor_profile in enumerate(self.config["predictors"]):
+            name = predictor_profile["name"]
+            params = predictor_profile.get("parameters", {})
+            if name in predictors.neighbour_measures and set(params) <= {
+                "weight",
+                "method",
+            }:
+                key = (params.get("weight"), params.get("method", "pairwise"))
+                groups[key].setdefault(name, i)
+
+        return {
+            key: list(indices.values())
+            for key, indices in groups.items()
+            if len(indices) > 1
+        }
+
     def do_predict_all(self):
         """Generator that yields predictions based on training network
 
+        Compatible neighbour-based predictors are computed together, as soon
+        as the first of them is needed.
+
         Yields
         ------
         (label, scoresheet) : a 2-tuple
@@ -247,15 +318,44 @@ class LinkPred:
             a Scoresheet (actual predictions)
 
         """
-        for predictor_profile in self.config["predictors"]:
+        profiles = self.config["predictors"]
+        batches = self._neighbour_batches()
+        batch_of = {i: key for key, indices in batches.items() for i in indices}
+        batch_results = {}
+        excluded = self.excluded
+
+        for i, predictor_profile in enumerate(profiles):
             params = predictor_profile.get("parameters", {})
             name = predictor_profile["name"]
-            predictor_class = getattr(predictors, name)
             label = predictor_profile.get("displayname", pretty_print(name, params))
 
+            if i in batch_of:
+                key = batch_of[i]
+                if key not in batch_results:
+                    names = [profiles[j]["name"] for j in batches[key]]
+                    log.info("Executing %s together...", ", ".join(names))
+                    batch_results[key] = predictors.predict_neighbour_measures(
+                        self.training,
+                        names,
+                        weight=key[0],
+                        method=key[1],
+                        eligible=self.config["eligible"],
+                        excluded=excluded,
+                        top_k=self.config["top_k"],
+                    )
+                scoresheet = batch_results[key].pop(name)
+                log.info("Finished executing %s.", label)
+                yield name, scoresheet
+                continue
+
+            predictor_class = getattr(predictors, name)
+
             log.info("Executing %s...", label)
             predictor = predictor_class(
-                self.training, eligible=self.config["eligible"], excluded=self.excluded
+                self.training,
+                eligible=self.config["eligible"],
+                excluded=excluded,
+                top_k=self.config["top_k"],
             )
             scoresheet = predictor.predict(**params)
             log.info("Finished executing %s.", label)
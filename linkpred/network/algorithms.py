@@ -1,11 +1,107 @@
 import logging
+from collections import deque
 
 import networkx as nx
 import numpy as np
+import scipy.sparse as sp
 
 log = logging.getLogger(__name__)
 
-__all__ = ["rooted_pagerank", "simrank"]
+__all__ = [
+    "GoogleMatrix",
+    "SimRankFingerprints",
+    "approximate_rooted_pagerank",
+    "rooted_pagerank",
+    "rooted_pagerank_block",
+    "simrank",
+    "sparse_simrank",
+]
+
+
+class GoogleMatrix:
+    r"""Sparse Google matrix of a network
+
+    The (raw) Google matrix M describes a random walk: M[i, j] is the
+    probability of going from node i to node j. Walkers at a 'dangling' node
+    without outgoing links jump to another node, by default chosen uniformly at
+    random (cf. Langville & Meyer, 2006). M is therefore never stored as
+    such, but as
+
+    .. math ::
+
+        M = T + d t^T
+
+    where T is the (sparse) adjacency matrix with each row divided by its sum,
+    d is the indicator vector of dangling nodes and t is the distribution of
+    where walkers at dangling nodes jump to. This is shared by all random walk
+    based predictors.
+
+    Parameters
+    ----------
+    A : a sparse or dense array
+        adjacency matrix of the network
+
+    Example
+    -------
+    >>> import numpy as np
+    >>> M = GoogleMatrix(np.array([[0, 1, 3], [0, 0, 0], [2, 0, 0]]))
+    >>> M.toarray()
+    array([[0.        , 0.25      , 0.75      ],
+           [0.33333333, 0.33333333, 0.33333333],
+           [1.        , 0.        , 0.        ]])
+
+    """
+
+    def __init__(self, A):
+        A = sp.csr_array(A, dtype=float)
+        if A.shape[0] == 0:
+            msg = "Empty network, cannot calculate Google matrix"
+            raise ValueError(msg)
+        sums = np.asarray(A.sum(axis=1)).ravel()
+        self.dangling = sums == 0
+        sums[self.dangling] = 1
+        self.transition = sp.csr_array(sp.diags(1 / sums) @ A)
+
+    @classmethod
+    def from_graph(cls, G, nodelist=None, weight="weight", *, reverse=False):
+        """Get Google matrix of G (or of G with all links reversed)"""
+        if len(G) == 0:
+            msg = "Empty network, cannot calculate Google matrix"
+            raise ValueError(msg)
+        A = nx.to_scipy_sparse_array(G, nodelist=nodelist, weight=weight, dtype=float)
+        return cls(A.T if reverse else A)
+
+    @property
+    def shape(self):
+        return self.transition.shape
+
+    def dot(self, x):
+        """Return M x, for a vector or matrix x"""
+        return self.transition @ x + np.multiply.outer(self.dangling, x.mean(axis=0))
+
+    def propagate(self, x, teleport=None):
+        """Return M^T x, i.e. where walkers with distribution x go next
+
+        Arguments
+        ---------
+        x : array
+            vector or matrix (with one distribution per column)
+
+        teleport : array or None
+            distribution of where walkers at dangling nodes go, with the
+            same shape as x (default: uniform)
+
+        """
+        stuck = x[self.dangling].sum(axis=0)
+        if teleport is None:
+            return self.transition.T @ x + stuck / self.shape[0]
+        return self.transition.T @ x + teleport * stuck
+
+    def toarray(self):
+        """Get the full Google matrix as a dense array"""
+        M = self.transition.toarray()
+        M[self.dangling] = 1 / self.shape[0]
+        return M
 
 
 def rooted_pagerank(G, root, alpha=0.85, beta=0, weight="weight"):
@@ -41,6 +137,128 @@ def rooted_pagerank(G, root, alpha=0.85, beta=0, weight="weight"):
     return nx.pagerank(G, alpha, personalization, weight=weight)
 
 
+def approximate_rooted_pagerank(google, root, alpha=0.85, epsilon=1.0e-4):
+    """Approximate the rooted PageRank with respect to node `root`
+
+    This uses the local forward push algorithm of Andersen, Chung & Lang
+    (2006). Probability mass is pushed from the root to its neighbours, and so
+    on, until the residual mass of every node is smaller than `epsilon` times
+    its number of neighbours. The running time depends on `1 / epsilon` and
+    not on the size of the network.
+
+    As in `rooted_pagerank()` (with beta = 0), random walkers at a 'dangling'
+    node without outgoing links return to the root.
+
+    Parameters
+    ----------
+    google : a GoogleMatrix
+        Google matrix of the network
+
+    root : int
+        index of the root node
+
+    alpha : float
+        PageRank probability that we will advance to a neighbour of the
+        current node in a random walk
+
+    epsilon : float
+        residual tolerance
+
+    Returns
+    -------
+    A dict that maps node indices to their approximate rooted PageRank and
+    the total remaining residual. The latter is the exact L1 error of the
+    approximation: every estimate is too low by at most this much.
+
+    """
+    transition = google.transition
+    indptr, indices, data = transition.indptr, transition.indices, transition.data
+
+    def should_push(v):
+        return residual[v] >= epsilon * max(int(indptr[v + 1] - indptr[v]), 1)
+
+    estimate = {}
+    residual = {root: 1.0}
+    queue = deque([root])
+    queued = {root}
+    while queue:
+        u = queue.popleft()
+        queued.discard(u)
+        mass = residual[u]
+        if not should_push(u):
+            continue
+        residual[u] = 0.0
+        estimate[u] = estimate.get(u, 0.0) + (1 - alpha) * mass
+        start, stop = int(indptr[u]), int(indptr[u + 1])
+        if start == stop:
+            targets = ((root, 1.0),)
+        else:
+            targets = zip(indices[start:stop].tolist(), data[start:stop].tolist())
+        for v, w in targets:
+            residual[v] = residual.get(v, 0.0) + alpha * mass * w
+            if v not in queued and should_push(v):
+                queue.append(v)
+                queued.add(v)
+
+    return estimate, sum(residual.values())
+
+
+def rooted_pagerank_block(
+    google, roots, alpha=0.85, beta=0, *, max_iter=100, tol=1.0e-6
+):
+    """Return the rooted PageRank with respect to several roots at once
+
+    This gives the same results as `rooted_pagerank()`, but power-iterates
+    the PageRank vectors of all roots together as columns of a dense n x b
+    matrix (with n the number of nodes and b the number of roots).
+
+    Parameters
+    ----------
+    google : a GoogleMatrix
+        Google matrix of the network
+
+    roots : array of ints
+        indices of the root nodes
+
+    alpha : float
+        PageRank probability that we will advance to a neighbour of the
+        current node in a random walk
+
+    beta : float or int
+        Probability that we advance to a random other node in the network,
+        see `rooted_pagerank()`
+
+    max_iter : int, optional
+        maximum number of power iterations
+
+    tol : float, optional
+        error tolerance to check convergence, as in `networkx.pagerank()`
+
+    Returns
+    -------
+    An n x b array, in which column j holds the rooted PageRank of all nodes
+    with respect to root j.
+
+    """
+    n = google.shape[0]
+    roots = np.asarray(roots)
+    personalization = np.full((n, len(roots)), float(beta))
+    personalization[roots, np.arange(len(roots))] = 1 - beta
+    personalization /= personalization.sum(axis=0)
+
+    x = np.full((n, len(roots)), 1.0 / n)
+    for _ in range(max_iter):
+        last = x
+        # Random walkers at dangling nodes jump as if they teleported
+        x = (
+            alpha * google.propagate(x, teleport=personalization)
+            + (1 - alpha) * personalization
+        )
+        if (np.abs(x - last).sum(axis=0) < n * tol).all():
+            return x
+    raise nx.PowerIterationFailedConvergence(max_iter)
+
+
 def simrank(G, nodelist=None, c=0.8, num_iterations=10, weight="weight"):
     r"""Calculate SimRank matrix for nodes in nodelist
 
@@ -69,31 +287,263 @@ def simrank(G, nodelist=None, c=0.8, num_iterations=10, weight="weight"):
         If None, all edge weights are considered equal.
         Otherwise holds the name of the edge attribute used as weight.
 
+    Here, `N(v)` are the nodes with a link to `v`, but the sum is divided by
+    the (weighted) number of links from `u` and `v`. Nodes without outgoing
+    links count as linking to every node, with weight 1/n, as in the raw
+    Google matrix. In undirected networks without isolated nodes, this is
+    the usual definition.
+
     """
-    n = len(G)
-    M = raw_google_matrix(G, nodelist=nodelist, weight=weight)
-    sim = np.identity(n, dtype=np.float32)
+    A = nx.to_scipy_sparse_array(G, nodelist=nodelist, weight=weight, dtype=float)
+    M = GoogleMatrix(A)
+    # Number of links from each node, or 1 for dangling nodes. With D =
+    # diag(sums), D M is A with the rows of dangling nodes filled in, so
+    # column v of D M D^-1 holds the links to v, divided by the links from v.
+    sums = np.asarray(A.sum(axis=1)).ravel()
+    sums[M.dangling] = 1
+    scale = np.multiply.outer(sums, sums)
+    sim = np.identity(A.shape[0])
     for i in range(num_iterations):
         log.debug("Starting SimRank iteration %d", i)
-        temp = c * M.T @ sim @ M
-        sim = temp + np.identity(n) - np.diag(np.diag(temp))
+        # (D M D^-1)^T sim (D M D^-1), using that sim is symmetric
+        sim *= scale
+        sim = c * M.propagate(M.propagate(sim).T) / scale
+        np.fill_diagonal(sim, 1)
     return sim
 
 
+def sparse_simrank(google, sources=None, c=0.8, num_iterations=10, threshold=1e-4):
+    r"""Calculate sparse SimRank matrix, pruning small similarities
+
+    Unlike `simrank()`, this follows the usual definition of SimRank, in which
+    the sum of similarities is divided by the (weighted) number of incoming
+    links of both nodes. After each iteration, similarities below `threshold`
+    are dropped, which keeps the matrix sparse.
+
+    If `sources` is given, only the rows of these nodes are calculated. This
+    only involves the nodes within `num_iterations` steps of the sources.
+
+    Parameters
+    ----------
+    google : a GoogleMatrix
+        Google matrix of the reversed network, i.e. row u holds the
+        probabilities of going from u to each of its in-neighbours. Nodes
+        without in-neighbours are not similar to any other node; there is no
+        teleportation.
+
+    sources : array of ints, optional
+        indices of the nodes to calculate similarities for (default: all)
+
+    c : float, optional
+        decay factor, determines how quickly similarity decreases
+
+    num_iterations : int, optional
+        number of iterations to calculate
+
+    threshold : float or None, optional
+        similarities below this value are dropped after each iteration
+
+    Returns
+    -------
+    A sparse array in CSR format, with one row for each source (in the given
+    order) and one column for each node.
+
+    """
+    transition = google.transition
+    n = transition.shape[0]
+    if sources is None:
+        levels = [np.arange(n)] * (num_iterations + 1)
+    else:
+        # Similarities of the sources in iteration k follow from those of
+        # their in-neighbours in iteration k - 1.
+        levels = [np.unique(sources)]
+        for _ in range(num_iterations):
+            levels.append(np.unique(transition[levels[-1]].indices))
+        levels.reverse()
+
+    first = levels[0]
+    sim = sp.csr_array(
+        (np.ones(len(first)), (np.arange(len(first)), first)), shape=(len(first), n)
+    )
+    propagate = transition.T
+    for k in range(1, num_iterations + 1):
+        log.debug("Starting SimRank iteration %d", k)
+        rows = levels[k]
+        step = transition if sources is None else transition[rows][:, levels[k - 1]]
+        sim = sp.coo_array(c * (step @ sim) @ propagate)
+        keep = sim.col != rows[sim.row]
+        if threshold:
+            keep &= sim.data >= threshold
+        sim = sp.csr_array(
+            (
+                np.concatenate((sim.data[keep], np.ones(len(rows)))),
+                (
+                    np.concatenate((sim.row[keep], np.arange(len(rows)))),
+                    np.concatenate((sim.col[keep], rows)),
+                ),
+            ),
+            shape=(len(rows), n),
+        )
+
+    if sources is None:
+        return sim
+    return sim[np.searchsorted(levels[-1], sources)]
+
+
+class SimRankFingerprints:
+    r"""Index of random walks to estimate SimRank by Monte Carlo simulation
+
+    SimRank sim(u, v) equals the expected value of c^t, where t is the first
+    step at which two random walks from u and v that follow incoming links
+    meet. This index simulates `num_walks` walks of `num_iterations` steps
+    from every node, following Fogaras & Rácz (2005): in each simulation, all
+    walks that arrive at the same node in the same step continue together.
+
+    The index holds num_walks * (num_iterations + 1) node indices per node.
+    The estimate of a similarity has a standard deviation of at most
+    `1 / (2 sqrt(num_walks))`.
+
+    Parameters
+    ----------
+    google : a GoogleMatrix
+        Google matrix of the reversed network, see `sparse_simrank()`
+
+    c : float, optional
+        decay factor, determines how quickly similarity decreases
+
+    num_iterations : int, optional
+        length of the random walks
+
+    num_walks : int, optional
+        number of simulated walks per node
+
+    seed : int, numpy.random.Generator or None, optional
+        seed for the random number generator
+
+    """
+
+    def __init__(self, google, c=0.8, num_iterations=10, num_walks=100, seed=None):
+        transition = google.transition
+        n = transition.shape[0]
+        self.c = c
+        self.num_walks = num_walks
+        rng = np.random.default_rng(seed)
+
+        # Walks that cannot go any further (no incoming links) end up at the
+        # dummy node n, where walks do not meet.
+        cumulative = np.concatenate(([0], np.cumsum(transition.data)))
+        starts, stops = transition.indptr[:-1], transition.indptr[1:]
+        offsets = cumulative[starts]
+        totals = cumulative[stops] - offsets
+        dead_end = starts == stops
+        last = np.maximum(stops - 1, 0)
+
+        positions = np.empty((num_walks, num_iterations + 1, n), dtype=np.int32)
+        positions[:, 0] = np.arange(n)
+        for step in range(1, num_iterations + 1):
+            for walk in range(num_walks):
+                targets = offsets + rng.random(n) * totals
+                chosen = np.minimum(
+                    np.searchsorted(cumulative[1:], targets, side="right"), last
+                )
+                successors = np.full(n + 1, n, dtype=np.int32)
+                if transition.nnz:
+                    successors[:n] = np.where(dead_end, n, transition.indices[chosen])
+                positions[walk, step] = successors[positions[walk, step - 1]]
+        self.positions = positions
+
+    def similarity(self, u, v):
+        """Estimate SimRank of nodes with indices u and v"""
+        if u == v:
+            return 1.0
+        walks = self.positions[:, 1:]
+        return self._estimate(
+            (walks[:, :, u] == walks[:, :, v]) & (walks[:, :, u] < walks.shape[2])
+        )
+
+    def similarities(self, u):
+        """Estimate SimRank of node with index u and all nodes"""
+        walks = self.positions[:, 1:]
+        own = walks[:, :, u, np.newaxis]
+        sim = self._estimate((walks == own) & (own < walks.shape[2]))
+        sim[u] = 1
+        return sim
+
+    def all_pairs(self):
+        """Estimate SimRank of all pairs of nodes
+
+        Returns
+        -------
+        Arrays of node indices i and j (with i < j) and the estimated
+        similarities of all pairs whose walks meet at least once.
+
+        """
+        n = self.positions.shape[2]
+        sim = sp.csr_array((n, n))
+        for walks in self.positions:
+            rows, cols, values = [], [], []
+            for step in range(1, len(walks)):
+                i, j = _newly_met(walks[step - 1], walks[step], n)
+                rows.append(np.minimum(i, j))
+                cols.append(np.maximum(i, j))
+                values.append(np.full(len(i), self.c**step))
+            sim = sim + sp.csr_array(
+                (np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))),
+                shape=(n, n),
+            )
+        sim = sp.coo_array(sim / self.num_walks)
+        return sim.row, sim.col, sim.data
+
+    def _estimate(self, meetings):
+        # Walks keep together once they have met, so c^t for the first step t
+        # at which walks meet
+        met = meetings.any(axis=1)
+        first = meetings.argmax(axis=1) + 1
+        return np.where(met, self.c**first, 0).sum(axis=0) / self.num_walks
+
+
+def _newly_met(before, after, n):
+    """Get pairs of walks that are at the same node after, but not before"""
+    # Walks at the same node before are at the same node after. We therefore
+    # look at groups of walks that were at the same node before ('bundles') and
+    # find pairs of bundles that arrive at the same node.
+    active = np.flatnonzero(after < n)
+    order = active[np.argsort(before[active], kind="stable")]
+    bundles, bundle_starts, bundle_sizes = np.unique(
+        before[order], return_index=True, return_counts=True
+    )
+    destinations = after[order[bundle_starts]]
+
+    # Pairs of bundles with the same destination
+    by_destination = np.argsort(destinations, kind="stable")
+    _, group_starts, group_sizes = np.unique(
+        destinations[by_destination], return_index=True, return_counts=True
+    )
+    group_stops = np.repeat(group_starts + group_sizes, group_sizes)
+    first, second = _expand(np.arange(len(bundles)), group_stops, by_destination)
+
+    # All pairs of walks from both bundles
+    counts = bundle_sizes[first] * bundle_sizes[second]
+    pair = np.repeat(np.arange(len(first)), counts)
+    local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    sizes = bundle_sizes[second[pair]]
+    i = order[bundle_starts[first[pair]] + local // sizes]
+    j = order[bundle_starts[second[pair]] + local % sizes]
+    return i, j
+
+
+def _expand(positions, stops, items):
+    """Pair items[p] with items[p + 1], ..., items[stops[p] - 1], for all p"""
+    counts = stops - positions - 1
+    left = np.repeat(positions, counts)
+    right = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return items[left], items[left + 1 + right]
+
+
 def raw_google_matrix(G, nodelist=None, weight="weight"):
-    """Calculate the raw Google matrix (stochastic without teleportation)"""
-    n = len(G)
-    if n == 0:
-        msg = "Empty network, cannot calculate Google matrix"
-        raise ValueError(msg)
-    M = nx.to_numpy_array(G, nodelist=nodelist, dtype=np.float32, weight=weight)
-
-    # Find 'dangling' nodes, i.e. nodes whose row's sum = 0
-    dangling = np.where(M.sum(axis=1) == 0)
-    # add constant to dangling nodes' row
-    for d in dangling[0]:
-        M[d] = 1.0 / n
-    # Normalize. We now have the 'raw' Google matrix (cf. example on p. 11 of
-    # Langville & Meyer (2006)).
-    M = M / M.sum(axis=1)
-    return M
+    """Calculate the raw Google matrix (stochastic without teleportation)
+
+    This is a dense array, see `GoogleMatrix` for a sparse alternative.
+
+    """
+    return GoogleMatrix.from_graph(G, nodelist, weight).toarray()
@@ -1,5 +1,6 @@
 from .base import *
 from .eigenvector import *
+from .index import *
 from .misc import *
 from .neighbour import *
 from .path import *
@@ -1,5 +1,15 @@
 import contextlib
 
+import numpy as np
+
+from ..evaluation import (
+    ArrayScoresheet,
+    BoundedScoresheet,
+    ImplicitScoresheet,
+    Pair,
+    Scoresheet,
+)
+from .index import ExcludedPairs, GraphIndex
 from .util import neighbourhood
 
 __all__ = ["Predictor", "all_predictors"]
@@ -32,7 +42,7 @@ class Predictor:
 
     """
 
-    def __init__(self, G, eligible=None, excluded=None):
+    def __init__(self, G, eligible=None, excluded=None, top_k=None):
         """
         Initialize predictor
 
@@ -46,27 +56,39 @@ class Predictor:
             and non-eligible nodes. We only try to predict links between
             two eligible nodes.
 
-        excluded : iterable or None
+        excluded : iterable, string or None
             A list or iterable of node pairs that should be excluded (i.e., not
             predicted). This is useful to, for instance, make sure that we only
-            predict new links that are not currently in G.
+            predict new links that are not currently in G. Instead of listing
+            pairs, this can also be 'old' (exclude all pairs that are linked
+            in G), 'new' (exclude all pairs that are not linked in G) or an
+            `ExcludedPairs` instance. Excluded pairs are left out while
+            looking for candidates, without ever listing them.
+
+        top_k : int or None
+            If this is an int, only the `top_k` highest-scoring predictions are
+            kept. Where possible, predictors then only hold this many
+            predictions in memory while scoring.
 
         """
         self.G = G
         self.eligible_attr = eligible
         self.name = self.__class__.__name__
         self.excluded = [] if excluded is None else excluded
+        self.top_k = top_k
+        # Approximate methods store an estimate or bound of their error here
+        self.approximation_error = None
+        self._index = None
+        self._excluded_pairs = None
+        self._exclusions = None
 
         # Add a decorator to predict(), to do the necessary postprocessing for
-        # filtering out links if `excluded` is not empty. We do this in
-        # __init__() such that child classes need not be changed.
+        # filtering out links if `excluded` is not empty and keeping only the
+        # top predictions if `top_k` is set. We do this in __init__() such
+        # that child classes need not be changed.
         def add_postprocessing(func):
             def predict_and_postprocess(*args, **kwargs):
-                scoresheet = func(*args, **kwargs)
-                for u, v in self.excluded:
-                    with contextlib.suppress(KeyError):
-                        del scoresheet[(u, v)]
-                return scoresheet
+                return self._postprocess(func(*args, **kwargs))
 
             predict_and_postprocess.__name__ = func.__name__
             predict_and_postprocess.__doc__ = func.__doc__
@@ -84,6 +106,60 @@ class Predictor:
     def predict(self, *args, **kwargs):
         raise NotImplementedError
 
+    def predict_for(self, nodes, **kwargs):
+        """Predict links between the given nodes and any other nodes
+
+        Keyword arguments are the same as for `predict()`. Excluded pairs and
+        `top_k` are handled as in `predict()`.
+
+        Arguments
+        ---------
+        nodes : iterable
+            nodes for which we want predictions
+
+        """
+        nodes = [v for v in nodes if self.eligible_node(v)]
+        return self._postprocess(self._predict_for(nodes, **kwargs))
+
+    def score_pairs(self, pairs, **kwargs):
+        """Get the scores of the given node pairs
+
+        Keyword arguments are the same as for `predict()`. As in `predict()`,
+        pairs with a score of zero and excluded pairs are left out.
+
+        Arguments
+        ---------
+        pairs : iterable
+            node pairs (2-tuples) for which we want scores
+
+        """
+        pairs = list(dict.fromkeys(Pair(u, v) for u, v in pairs if self.eligible(u, v)))
+        return self._postprocess(self._score_pairs(pairs, **kwargs))
+
+    def _predict_for(self, nodes, **kwargs):
+        # Fallback: restrict predictions for the whole network to the nodes.
+        # Predictors that can do better override this.
+        nodes = set(nodes)
+        res = Scoresheet()
+        for pair, score in self._predict_unfiltered(**kwargs).items():
+            u, v = pair
+            if u in nodes or v in nodes:
+                res[pair] = score
+        return res
+
+    def _score_pairs(self, pairs, **kwargs):
+        # Fallback: look up pairs in predictions for the whole network.
+        # Predictors that can do better override this.
+        scoresheet = self._predict_unfiltered(**kwargs)
+        return Scoresheet(
+            (pair, scoresheet[pair]) for pair in pairs if pair in scoresheet
+        )
+
+    def _predict_unfiltered(self, **kwargs):
+        """Predict for the whole network, ignoring `excluded` and `top_k`"""
+        predictor = self.__class__(self.G, eligible=self.eligible_attr)
+        return predictor.predict(**kwargs)
+
     def eligible(self, u, v):
         """Check if link between nodes u and v is eligible
 
@@ -110,6 +186,24 @@ class Predictor:
         """
         return [v for v in self.G if self.eligible_node(v)]
 
+    @property
+    def index(self):
+        """Integer-based index of G, see `GraphIndex`"""
+        if self._index is None:
+            self._index = GraphIndex.for_graph(self.G)
+        return self._index
+
+    def eligible_mask(self):
+        """Get boolean array that is true for eligible nodes
+
+        The array follows the node numbering of `self.index`.
+
+        """
+        nodes = self.index.nodes
+        return np.fromiter(
+            (bool(self.eligible_node(v)) for v in nodes), dtype=bool, count=len(nodes)
+        )
+
     def likely_pairs(self, k=2):
         """
         Yield node pairs from the same neighbourhood
@@ -120,15 +214,164 @@ class Predictor:
             size of the neighbourhood (e.g., if k = 2, the neighbourhood
             consists of all nodes that are two links away)
 
+        In undirected networks, every pair is only yielded once, in an
+        arbitrary order. In directed networks, both (a, b) and (b, a) may be
+        yielded. Excluded pairs are skipped.
+
         """
+        if not self.G.is_directed():
+            nodes, eligible = self.index.nodes, self.eligible_mask()
+            for i, candidates in self.index.neighbourhood_pairs(k, eligible):
+                others = candidates
+                if self.excluded:
+                    others = candidates[~self.excluded_mask(i, candidates)]
+                a = nodes[i]
+                for j in others.tolist():
+                    yield (a, nodes[j])
+            return
+
         for a in self.G.nodes():
             if not self.eligible_node(a):
                 continue
             for b in neighbourhood(self.G, a, k):
-                if not self.eligible_node(b):
+                if not self.eligible_node(b) or self.is_excluded(a, b):
                     continue
                 yield (a, b)
 
+    def _postprocess(self, scoresheet):
+        """Remove excluded pairs and keep only the top predictions"""
+        if self.excluded:
+            scoresheet = self._without_excluded(scoresheet)
+        if self.top_k is not None and len(scoresheet) > self.top_k:
+            if isinstance(scoresheet, ImplicitScoresheet):
+                scoresheet = Scoresheet(scoresheet.ranked_items(self.top_k))
+            else:
+                scoresheet = BoundedScoresheet(self.top_k, scoresheet)
+        return scoresheet
+
+    def _without_excluded(self, scoresheet):
+        """Remove excluded pairs from scoresheet"""
+        exclusions = self.exclusions()
+        if (
+            isinstance(scoresheet, ArrayScoresheet)
+            and scoresheet.nodes is self.index.nodes
+        ):
+            rows, cols, scores = scoresheet.arrays()
+            keep = ~exclusions.mask(rows, cols)
+            if keep.all():
+                return scoresheet
+            return ArrayScoresheet(
+                scoresheet.nodes, rows[keep], cols[keep], scores[keep]
+            )
+        if exclusions.inverted:
+            # Rather than removing all other pairs, we only keep allowed ones
+            if isinstance(scoresheet, ImplicitScoresheet):
+                allowed = (Pair(u, v) for u, v in exclusions.coded_pairs())
+                return Scoresheet(
+                    (pair, scoresheet[pair]) for pair in allowed if pair in scoresheet
+                )
+            excluded = [pair for pair in scoresheet if pair in exclusions]
+        else:
+            excluded = (Pair(u, v) for u, v in exclusions.coded_pairs())
+        for pair in excluded:
+            with contextlib.suppress(KeyError):
+                del scoresheet[pair]
+        return scoresheet
+
+    def exclusions(self):
+        """Get the excluded pairs as `ExcludedPairs`, following `self.index`
+
+        This is built once from `excluded`, which may already be an
+        `ExcludedPairs` instance (e.g., shared by several predictors).
+
+        """
+        if self._exclusions is None:
+            excluded = self.excluded
+            if isinstance(excluded, ExcludedPairs):
+                self._exclusions = excluded.for_index(self.index)
+            elif isinstance(excluded, str):
+                self._exclusions = ExcludedPairs.from_rule(self.index, excluded)
+            else:
+                self._exclusions = ExcludedPairs.from_pairs(self.index, excluded)
+        return self._exclusions
+
+    def excluded_pairs(self):
+        """Get set of excluded pairs (as `Pair`s)
+
+        If all unlinked pairs are excluded, this set may be huge. Use
+        `is_excluded()`, `excluded_mask()` or `exclusions()` instead.
+
+        """
+        if self._excluded_pairs is None:
+            pairs = self.excluded
+            if isinstance(pairs, str):
+                pairs = self.exclusions()
+            self._excluded_pairs = {Pair(u, v) for u, v in pairs if u != v}
+        return self._excluded_pairs
+
+    def is_excluded(self, u, v):
+        """Check if the pair (u, v) is excluded"""
+        return (u, v) in self.exclusions()
+
+    def excluded_mask(self, rows, cols):
+        """Get boolean array that is true for excluded pairs
+
+        Arguments
+        ---------
+        rows, cols : arrays of ints
+            indices (following the numbering of `self.index`) of the nodes of
+            each pair
+
+        """
+        return self.exclusions().mask(rows, cols)
+
+    def _new_scoresheet(self):
+        """Get empty scoresheet to store predictions in
+
+        If `top_k` is set, this is a `BoundedScoresheet` that skips excluded
+        pairs, so each pair should only be set once.
+
+        """
+        if self.top_k is None:
+            return Scoresheet()
+        return BoundedScoresheet(self.top_k, excluded=self.exclusions())
+
+    def _keep_top(self, rows, cols, scores, *, largest=True):
+        """Only keep entries that are not excluded and may be among the top_k
+
+        This is meant for the partial results of a block of nodes. If
+        `largest` is false, the lowest values are kept instead.
+
+        """
+        if self.excluded:
+            keep = ~self.excluded_mask(rows, cols)
+            rows, cols, scores = rows[keep], cols[keep], scores[keep]
+        k = self.top_k
+        if k is not None and 0 < k < len(scores):
+            if largest:
+                keep = scores >= np.partition(scores, -k)[-k]
+            else:
+                keep = scores <= np.partition(scores, k - 1)[k - 1]
+            rows, cols, scores = rows[keep], cols[keep], scores[keep]
+        return rows, cols, scores
+
+    def _scoresheet_from_arrays(self, rows, cols, scores):
+        """Get scoresheet from arrays of node indices and their scores
+
+        This is an `ArrayScoresheet` without excluded pairs and, if `top_k` is
+        set, with only the `top_k` highest-scoring pairs.
+
+        """
+        rows, cols, scores = map(np.asarray, (rows, cols, scores))
+        if self.excluded:
+            keep = ~self.excluded_mask(rows, cols)
+            rows, cols, scores = rows[keep], cols[keep], scores[keep]
+        scoresheet = ArrayScoresheet(self.index.nodes, rows, cols, scores)
+        if self.top_k is not None:
+            # Ties are broken as in `top()` of the full scoresheet
+            scoresheet = scoresheet.truncated(max(self.top_k, 0))
+        return scoresheet
+
 
 def all_predictors():
     """Returns a list of all predictors"""
@@ -1,13 +1,37 @@
+import logging
+
 import networkx as nx
+import numpy as np
+import scipy.sparse as sp
 
 from ..evaluation import Scoresheet
-from ..network import rooted_pagerank, simrank
+from ..network import (
+    SimRankFingerprints,
+    approximate_rooted_pagerank,
+    rooted_pagerank,
+    rooted_pagerank_block,
+    simrank,
+    sparse_simrank,
+)
 from ..util import progressbar
 from .base import Predictor
 
+log = logging.getLogger(__name__)
+
 
 class RootedPageRank(Predictor):
-    def predict(self, nbunch=None, alpha=0.85, beta=0, weight="weight", k=None):
+    def predict(
+        self,
+        nbunch=None,
+        alpha=0.85,
+        beta=0,
+        weight="weight",
+        k=None,
+        *,
+        method="networkx",
+        block_size=None,
+        epsilon=1.0e-4,
+    ):
         """Predict using rooted PageRank.
 
         Parameters
@@ -36,10 +60,47 @@ class RootedPageRank(Predictor):
             of the k-neighbourhood of the current node.
             Results are often very similar but much faster.
 
+        method : string, optional
+            Either 'networkx' (run `networkx.pagerank()` for each node),
+            'matrix' (use the sparse Google matrix and compute the
+            PageRank vectors of blocks of nodes together) or 'push'
+            (approximate the PageRank vectors by local forward push, which
+            only visits the area around each node). The latter two are much
+            faster, but do not support `k`; 'push' requires beta = 0.
+
+        block_size : int or None, optional
+            Only for method 'matrix': number of nodes whose PageRank vectors
+            are computed together. Memory use is proportional to the number
+            of nodes times `block_size`.
+
+        epsilon : float, optional
+            Only for method 'push': residual tolerance, see
+            `linkpred.network.approximate_rooted_pagerank`. The largest L1
+            error of the rooted PageRank of any node is stored in
+            `self.approximation_error`; the score of a pair is off by at most
+            twice this value.
+
         See documentation for linkpred.network.rooted_pagerank for these
         parameters.
 
         """
+        if method not in ("networkx", "matrix", "push"):
+            msg = f"Unknown method '{method}': use 'networkx', 'matrix' or 'push'"
+            raise ValueError(msg)
+        if method != "networkx" and k is not None:
+            msg = f"Method '{method}' does not support the k-neighbourhood"
+            raise ValueError(msg)
+        if method == "matrix":
+            return self._matrix(nbunch, alpha, beta, weight, block_size)
+        if method == "push":
+            if beta != 0:
+                msg = "Method 'push' does not support beta"
+                raise ValueError(msg)
+            return self._push(nbunch, alpha, weight, epsilon)
+
+        return self._networkx(nbunch, alpha, beta, weight, k)
+
+    def _networkx(self, nbunch, alpha, beta, weight, k):
         res = Scoresheet()
         if nbunch is None:
             nbunch = self.G.nodes()
@@ -55,9 +116,83 @@ class RootedPageRank(Predictor):
                     res[(u, v)] += w
         return res
 
+    def _matrix(self, nbunch, alpha, beta, weight, block_size=None):
+        index = self.index
+        n = len(index)
+        if block_size is None:
+            # Keep dense blocks to about 10 million entries
+            block_size = max(1, 10**7 // max(n, 1))
+        google = index.google_matrix(weight)
+        eligible = self.eligible_mask()
+        roots = self._roots(nbunch, eligible)
+
+        rows, cols, scores = [np.empty(0, int)], [np.empty(0, int)], [np.empty(0)]
+        for start in progressbar(range(0, len(roots), block_size), "Blocks: "):
+            block = roots[start : start + block_size]
+            pagerank = rooted_pagerank_block(google, block, alpha, beta)
+            pagerank[~eligible] = 0
+            pagerank[block, np.arange(len(block))] = 0
+            j, i = np.nonzero(pagerank > 0)
+            rows.append(block[i])
+            cols.append(j)
+            scores.append(pagerank[j, i])
+        return self._pair_scores(rows, cols, scores)
+
+    def _push(self, nbunch, alpha, weight, epsilon):
+        index = self.index
+        google = index.google_matrix(weight)
+        eligible = self.eligible_mask()
+        roots = self._roots(nbunch, eligible)
+
+        rows, cols, scores = [np.empty(0, int)], [np.empty(0, int)], [np.empty(0)]
+        error = 0.0
+        for root in progressbar(roots.tolist()):
+            estimate, residual = approximate_rooted_pagerank(
+                google, root, alpha, epsilon
+            )
+            error = max(error, residual)
+            estimate.pop(root, None)
+            others = np.fromiter(estimate.keys(), dtype=int, count=len(estimate))
+            values = np.fromiter(estimate.values(), dtype=float, count=len(estimate))
+            keep = eligible[others] & (values > 0)
+            rows.append(np.full(keep.sum(), root))
+            cols.append(others[keep])
+            scores.append(values[keep])
+
+        self.approximation_error = error
+        log.info("Approximate rooted PageRank: L1 error at most %g", error)
+        return self._pair_scores(rows, cols, scores)
+
+    def _roots(self, nbunch, eligible):
+        """Get indices of the eligible nodes in nbunch (default: all)"""
+        if nbunch is None:
+            return np.flatnonzero(eligible)
+        roots = np.array([self.index.index[v] for v in nbunch], dtype=int)
+        return roots[eligible[roots]]
+
+    def _pair_scores(self, rows, cols, scores):
+        # The score of a pair is the sum of the scores for both roots
+        n = len(self.index)
+        scores = sp.coo_array(
+            (np.concatenate(scores), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(n, n),
+        ).tocsr()
+        scores = sp.triu(scores + scores.T, k=1).tocoo()
+        return self._scoresheet_from_arrays(scores.row, scores.col, scores.data)
+
 
 class SimRank(Predictor):
-    def predict(self, c=0.8, num_iterations=10, weight="weight"):
+    def predict(
+        self,
+        c=0.8,
+        num_iterations=10,
+        weight="weight",
+        *,
+        method="dense",
+        threshold=1e-4,
+        num_walks=100,
+        seed=None,
+    ):
         r"""Predict using SimRank
 
         .. math ::
@@ -78,11 +213,50 @@ class SimRank(Predictor):
             If None, all edge weights are considered equal.
             Otherwise holds the name of the edge attribute used as weight.
 
+        method : string, optional
+            One of 'dense' (iterate on the full similarity matrix, see
+            `linkpred.network.simrank`), 'sparse' (iterate on a sparse
+            similarity matrix, dropping similarities below `threshold`) or
+            'montecarlo' (estimate similarities from `num_walks` simulated
+            random walks per node). The latter two never need memory for all
+            pairs of nodes. They follow the usual definition of SimRank, in
+            which `N(v)` are the nodes with a link to `v`, whereas 'dense'
+            divides by the number of links from `u` and `v` and lets nodes
+            without outgoing links link to every node. In undirected networks
+            without isolated nodes, all three agree.
+
+        threshold : float or None, optional
+            Only for method 'sparse': similarities below this value are
+            dropped after each iteration
+
+        num_walks : int, optional
+            Only for method 'montecarlo': number of random walks per node
+
+        seed : int or None, optional
+            Only for method 'montecarlo': seed for the random number generator
+
         """
-        res = Scoresheet()
+        if method == "dense":
+            return self._dense(c, num_iterations, weight)
+        google = self._google_matrix(method, weight)
+        if method == "sparse":
+            sim = sparse_simrank(google, None, c, num_iterations, threshold)
+            sim = sp.triu(sim, k=1).tocoo()
+            rows, cols, scores = sim.row, sim.col, sim.data
+        else:
+            fingerprints = SimRankFingerprints(
+                google, c, num_iterations, num_walks, seed
+            )
+            rows, cols, scores = fingerprints.all_pairs()
+        eligible = self.eligible_mask()
+        keep = eligible[rows] & eligible[cols]
+        return self._scoresheet_from_arrays(rows[keep], cols[keep], scores[keep])
+
+    def _dense(self, c, num_iterations, weight):
+        res = self._new_scoresheet()
         nodelist = list(self.G.nodes)
         sim = simrank(self.G, nodelist, c, num_iterations, weight)
-        (m, n) = sim.shape
+        m, n = sim.shape
         assert m == n
 
         for i in range(m):
@@ -97,3 +271,85 @@ class SimRank(Predictor):
                     if self.eligible(u, v):
                         res[(u, v)] = sim[i, j]
         return res
+
+    def _predict_for(
+        self,
+        nodes,
+        c=0.8,
+        num_iterations=10,
+        weight="weight",
+        *,
+        method="dense",
+        threshold=1e-4,
+        num_walks=100,
+        seed=None,
+    ):
+        if method == "dense":
+            return super()._predict_for(
+                nodes, c=c, num_iterations=num_iterations, weight=weight
+            )
+        google = self._google_matrix(method, weight)
+        sources = np.unique([self.index.index[v] for v in nodes]).astype(int)
+        if method == "sparse":
+            sim = sparse_simrank(google, sources, c, num_iterations, threshold).tocoo()
+            rows, cols, scores = sources[sim.row], sim.col, sim.data
+        else:
+            fingerprints = SimRankFingerprints(
+                google, c, num_iterations, num_walks, seed
+            )
+            rows, cols, scores = [], [], []
+            for i in sources.tolist():
+                sim = fingerprints.similarities(i)
+                (others,) = np.nonzero(sim)
+                rows.append(np.full(len(others), i))
+                cols.append(others)
+                scores.append(sim[others])
+            rows, cols, scores = map(np.concatenate, (rows, cols, scores))
+
+        # Pairs of two sources only once
+        is_source = np.zeros(len(self.index), dtype=bool)
+        is_source[sources] = True
+        eligible = self.eligible_mask()
+        keep = eligible[cols] & (rows != cols) & ~(is_source[cols] & (cols < rows))
+        return self._scoresheet_from_arrays(rows[keep], cols[keep], scores[keep])
+
+    def _score_pairs(
+        self,
+        pairs,
+        c=0.8,
+        num_iterations=10,
+        weight="weight",
+        *,
+        method="dense",
+        threshold=1e-4,
+        num_walks=100,
+        seed=None,
+    ):
+        if method == "dense":
+            return super()._score_pairs(
+                pairs, c=c, num_iterations=num_iterations, weight=weight
+            )
+        google = self._google_matrix(method, weight)
+        index = self.index.index
+        rows = np.array([index[u] for u, _ in pairs], dtype=int)
+        cols = np.array([index[v] for _, v in pairs], dtype=int)
+        if method == "sparse":
+            sources, rows = np.unique(rows, return_inverse=True)
+            sim = sparse_simrank(google, sources, c, num_iterations, threshold)
+            scores = np.asarray(sim[rows, cols]).ravel()
+            rows = sources[rows]
+        else:
+            fingerprints = SimRankFingerprints(
+                google, c, num_iterations, num_walks, seed
+            )
+            scores = np.array(
+                [fingerprints.similarity(i, j) for i, j in zip(rows, cols)]
+            )
+        keep = scores > 0
+        return self._scoresheet_from_arrays(rows[keep], cols[keep], scores[keep])
+
+    def _google_matrix(self, method, weight):
+        if method not in ("sparse", "montecarlo"):
+            msg = f"Unknown method '{method}': use 'dense', 'sparse' or 'montecarlo'"
+            raise ValueError(msg)
+        return self.index.google_matrix(weight, reverse=True)
@@ -0,0 +1,360 @@
+"""Integer-based index of a network, used by the vectorized predictors"""
+
+import weakref
+from collections.abc import Set
+
+import networkx as nx
+import numpy as np
+
+from ..network import GoogleMatrix
+
+__all__ = ["ExcludedPairs", "GraphIndex"]
+
+_indices = weakref.WeakKeyDictionary()
+
+
+def _edge_hash(G, weight=None):
+    """Hash of the edges of G and, unless `weight` is None, their weights"""
+    if weight is None:
+        return hash(tuple(G.edges()))
+    return hash(tuple(G.edges(data=weight, default=1)))
+
+
+class GraphIndex:
+    """Numbering of the nodes of a graph, with its sparse adjacency matrix
+
+    Nodes are numbered in the order in which `G` yields them. All vectorized
+    code uses this numbering, such that results can be combined and mapped
+    back to the original nodes.
+
+    Example
+    -------
+    >>> import networkx as nx
+    >>> index = GraphIndex(nx.path_graph(["a", "b", "c"]))
+    >>> index.index["c"]
+    2
+    >>> index.adjacency().toarray()
+    array([[0., 1., 0.],
+           [1., 0., 1.],
+           [0., 1., 0.]])
+
+    """
+
+    def __init__(self, G):
+        self.G = G
+        self.nodes = list(G)
+        self.index = {v: i for i, v in enumerate(self.nodes)}
+        self._edge_hashes = {None: _edge_hash(G)}
+        self._adjacency = {}
+        self._sizes = {}
+        self._size_maps = {}
+        self._neighbours = None
+
+    def __len__(self):
+        return len(self.nodes)
+
+    @classmethod
+    def for_graph(cls, G):
+        """Get the index of G, shared by all predictors working on G
+
+        The index is built on first use and then kept for as long as G
+        exists. It is rebuilt if G has changed in the meantime, see
+        `is_current()`.
+
+        """
+        index = _indices.get(G)
+        if index is None or not index.is_current():
+            index = _indices[G] = cls(G)
+        return index
+
+    def is_current(self):
+        """Check if everything cached so far still agrees with G
+
+        This checks the nodes and edges of G and, for each weighted adjacency
+        matrix that has been built, the edge weights.
+
+        """
+        return self.nodes == list(self.G) and all(
+            h == _edge_hash(self.G, weight) for weight, h in self._edge_hashes.items()
+        )
+
+    def pair_codes(self, rows, cols):
+        """Encode pairs of node indices as integers (in either order)
+
+        The pair (i, j) with i < j gets code ``i * n + j``, where n is the
+        number of nodes.
+
+        """
+        rows, cols = np.asarray(rows), np.asarray(cols)
+        rows, cols = np.minimum(rows, cols), np.maximum(rows, cols)
+        return rows.astype(np.int64) * len(self.nodes) + cols
+
+    def adjacency(self, weight=None):
+        """Get the adjacency matrix in CSR format
+
+        Arguments
+        ---------
+        weight : None or string, optional
+            If None, all edge weights are considered equal.
+            Otherwise holds the name of the edge attribute used as weight.
+
+        """
+        if weight not in self._adjacency:
+            self._edge_hashes.setdefault(weight, _edge_hash(self.G, weight))
+            A = nx.to_scipy_sparse_array(
+                self.G, nodelist=self.nodes, weight=weight, dtype=float, format="csr"
+            )
+            A.sort_indices()
+            self._adjacency[weight] = A
+        return self._adjacency[weight]
+
+    def transposed_adjacency(self, weight=None):
+        """Get the transpose of the adjacency matrix in CSR format
+
+        For undirected graphs, this is simply the adjacency matrix itself.
+
+        """
+        if not self.G.is_directed():
+            return self.adjacency(weight)
+        key = ("transposed", weight)
+        if key not in self._adjacency:
+            A = self.adjacency(weight).T.tocsr()
+            A.sort_indices()
+            self._adjacency[key] = A
+        return self._adjacency[key]
+
+    def google_matrix(self, weight=None, *, reverse=False):
+        """Get the (sparse) Google matrix, see `linkpred.network.GoogleMatrix`
+
+        Arguments
+        ---------
+        weight : None or string, optional
+            If None, all edge weights are considered equal.
+            Otherwise holds the name of the edge attribute used as weight.
+
+        reverse : bool, optional
+            If true, get the Google matrix of the network with all links
+            reversed, describing a random walk along incoming links.
+
+        """
+        key = ("google", weight, reverse)
+        if key not in self._adjacency:
+            if reverse:
+                self._adjacency[key] = GoogleMatrix(self.transposed_adjacency(weight))
+            else:
+                self._adjacency[key] = GoogleMatrix(self.adjacency(weight))
+        return self._adjacency[key]
+
+    def neighbourhood_sizes(self, weight=None, power=2):
+        """Get array with the (weighted) neighbourhood size of each node
+
+        This is the vectorized equivalent of `neighbourhood_size()`: if
+        weighted, we use the sum of edge weights to the given power.
+
+        Arguments
+        ---------
+        weight : None or string, optional
+            If None, all edge weights are considered equal.
+            Otherwise holds the name of the edge attribute used as weight.
+
+        power : int, optional
+            Power to which edge weights are raised (ignored if unweighted)
+
+        """
+        if weight is None:
+            power = 1
+        key = (weight, power)
+        if key not in self._sizes:
+            A = self.adjacency(weight)
+            if power != 1:
+                A = A.power(power)
+            self._sizes[key] = np.asarray(A.sum(axis=1)).ravel()
+        return self._sizes[key]
+
+    def neighbourhood_size_map(self, weight=None, power=2):
+        """Get dict that maps each node to its (weighted) neighbourhood size"""
+        if weight is None:
+            power = 1
+        key = (weight, power)
+        if key not in self._size_maps:
+            sizes = self.neighbourhood_sizes(weight, power).tolist()
+            self._size_maps[key] = dict(zip(self.nodes, sizes))
+        return self._size_maps[key]
+
+    def neighbourhood_pairs(self, k=2, eligible=None):
+        """Yield node indices together with those of their k-neighbourhood
+
+        For each node index `i`, this yields `i` and a sorted array with the
+        indices `j > i` of all nodes that are at most `k` links away from `i`.
+        In an undirected network, every pair of nodes within distance `k` is
+        thus visited exactly once.
+
+        Arguments
+        ---------
+        k : int
+            size of the neighbourhood
+
+        eligible : boolean array or None
+            If given, only pairs of eligible nodes are considered.
+
+        """
+        if self._neighbours is None:
+            A = self.adjacency()
+            self._neighbours = np.split(A.indices, A.indptr[1:-1])
+        neighbours = self._neighbours
+
+        for i in range(len(self.nodes)):
+            if eligible is not None and not eligible[i]:
+                continue
+            reached = frontier = neighbours[i]
+            for step in range(1, k):
+                frontier = np.concatenate(
+                    [frontier[:0]] + [neighbours[j] for j in frontier.tolist()]
+                )
+                if step < k - 1:
+                    frontier = np.setdiff1d(frontier, reached)
+                reached = np.concatenate((reached, frontier))
+            reached = np.unique(reached[reached > i])
+            if eligible is not None:
+                reached = reached[eligible[reached]]
+            yield i, reached
+
+
+class ExcludedPairs(Set):
+    """Set of node pairs that should not be predicted
+
+    Pairs are stored as a sorted array of their codes (see
+    `GraphIndex.pair_codes`). If `inverted` is true, the codes are those of
+    the pairs that are *not* excluded, such that excluding all unlinked pairs
+    of a network only takes memory for its links. Pairs involving nodes that
+    are not in the index are never excluded.
+
+    Membership tests take the node pair as a tuple (in either order) or
+    `Pair`. Iterating yields 2-tuples of nodes; for an inverted set, this
+    lists all excluded pairs and is best avoided.
+
+    Example
+    -------
+    >>> import networkx as nx
+    >>> index = GraphIndex(nx.path_graph(["a", "b", "c"]))
+    >>> excluded = ExcludedPairs.from_rule(index, "new")
+    >>> len(excluded), ("c", "a") in excluded, ("a", "b") in excluded
+    (1, True, False)
+
+    """
+
+    def __init__(self, index, codes, *, inverted=False):
+        self.index = index
+        self.codes = np.unique(np.asarray(codes, dtype=np.int64))
+        self.inverted = inverted
+
+    @classmethod
+    def from_rule(cls, index, rule):
+        """Get excluded pairs of the network of `index` according to `rule`
+
+        Arguments
+        ---------
+        index : GraphIndex
+            index of the network
+
+        rule : 'old', 'new' or None
+            If 'old', all linked pairs are excluded; if 'new', all pairs that
+            are not linked (in either direction). If None, no pairs are
+            excluded.
+
+        """
+        if rule is None:
+            return cls(index, [])
+        if rule not in ("old", "new"):
+            msg = f"Unknown exclusion rule '{rule}': use either 'old' or 'new'"
+            raise ValueError(msg)
+        links = index.adjacency().tocoo()
+        loops = links.row == links.col
+        codes = index.pair_codes(links.row[~loops], links.col[~loops])
+        return cls(index, codes, inverted=rule == "new")
+
+    @classmethod
+    def from_pairs(cls, index, pairs):
+        """Get excluded pairs from an iterable of node pairs"""
+        positions = index.index
+        pairs = np.array(
+            [
+                (positions[u], positions[v])
+                for u, v in pairs
+                if u in positions and v in positions and u != v
+            ],
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        return cls(index, index.pair_codes(pairs[:, 0], pairs[:, 1]))
+
+    def for_index(self, index):
+        """Get the same excluded pairs, following the numbering of `index`"""
+        if index is self.index:
+            return self
+        nodes, positions = self.index.nodes, index.index
+        rows, cols = np.divmod(self.codes, len(nodes))
+        pairs = np.array(
+            [
+                (positions[nodes[i]], positions[nodes[j]])
+                for i, j in zip(rows.tolist(), cols.tolist())
+                if nodes[i] in positions and nodes[j] in positions
+            ],
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        codes = index.pair_codes(pairs[:, 0], pairs[:, 1])
+        return self.__class__(index, codes, inverted=self.inverted)
+
+    def mask(self, rows, cols):
+        """Get boolean array that is true for excluded pairs
+
+        Arguments
+        ---------
+        rows, cols : arrays of ints
+            indices (following the numbering of `index`) of the nodes of
+            each pair
+
+        """
+        pairs = self.index.pair_codes(rows, cols)
+        if len(self.codes) == 0:
+            return np.full(pairs.shape, self.inverted)
+        pos = np.minimum(np.searchsorted(self.codes, pairs), len(self.codes) - 1)
+        return (self.codes[pos] == pairs) != self.inverted
+
+    def coded_pairs(self):
+        """Yield the pairs whose codes are stored, as 2-tuples of nodes
+
+        These are the excluded pairs or, if `inverted`, the pairs that are
+        not excluded.
+
+        """
+        nodes = self.index.nodes
+        rows, cols = np.divmod(self.codes, len(nodes))
+        for i, j in zip(rows.tolist(), cols.tolist()):
+            yield nodes[i], nodes[j]
+
+    def __contains__(self, pair):
+        u, v = pair
+        positions = self.index.index
+        if u == v or u not in positions or v not in positions:
+            return False
+        return bool(self.mask(positions[u], positions[v]))
+
+    def __len__(self):
+        if not self.inverted:
+            return len(self.codes)
+        n = len(self.index)
+        return n * (n - 1) // 2 - len(self.codes)
+
+    def __iter__(self):
+        if not self.inverted:
+            yield from self.coded_pairs()
+            return
+        nodes, n = self.index.nodes, len(self.index)
+        for i in range(n - 1):
+            others = np.arange(i + 1, n)
+            others = others[self.mask(i, others)]
+            for j in others.tolist():
+                yield nodes[i], nodes[j]
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} with {len(self)} pairs>"
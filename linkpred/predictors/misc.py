@@ -1,8 +1,6 @@
-import random
-from collections import defaultdict
+import numpy as np
 
-from ..evaluation import Scoresheet
-from ..util import all_pairs
+from ..evaluation import CommunityScoresheet, RandomScoresheet, Scoresheet
 from .base import Predictor
 
 __all__ = ["Community", "Copy", "Random"]
@@ -15,7 +13,8 @@ class Community(Predictor):
         If two nodes belong to the same community, they are predicted to form
         a link. This uses the Louvain algorithm, which determines communities
         at different granularity levels: the finer grained the community, the
-        higher the resulting score.
+        higher the resulting score. Scores are derived from the community
+        labels of both nodes when needed, see `CommunityScoresheet`.
 
         This needs the python-louvain package. Install linkpred as follows:
 
@@ -31,22 +30,14 @@ class Community(Predictor):
             )
             raise ImportError(msg) from err
 
-        res = Scoresheet()
         dendogram = community.generate_dendrogram(self.G)
-
+        nodes = self.eligible_nodes()
+        labels = []
         for i in range(len(dendogram)):
+            # Lower i, smaller communities
             partition = community.partition_at_level(dendogram, i)
-            communities = defaultdict(list)
-            weight = len(dendogram) - i  # Lower i, smaller communities
-
-            for n, com in partition.items():
-                communities[com].append(n)
-            for nodes in communities.values():
-                for u, v in all_pairs(nodes):
-                    if not self.eligible(u, v):
-                        continue
-                    res[(u, v)] += weight
-        return res
+            labels.append([partition[v] for v in nodes])
+        return CommunityScoresheet(nodes, labels)
 
 
 class Copy(Predictor):
@@ -72,13 +63,74 @@ class Copy(Predictor):
 
 
 class Random(Predictor):
-    def predict(self):  # pylint:disable=E0202
+    def predict(self, sample=None, seed=None):  # pylint:disable=E0202
         """Predict randomly
 
-        This predictor can be used as a baseline.
+        This predictor can be used as a baseline. By default, every pair of
+        eligible nodes gets a random score. Scores are computed as needed,
+        see `RandomScoresheet`.
+
+        Parameters
+        ----------
+        sample : int or None, optional
+            If this is an int, only this many pairs of eligible nodes are
+            randomly drawn (without replacement and leaving out excluded
+            pairs) and predicted with a random score.
+
+        seed : None, int or np.random.Generator, optional
+            Seed for the random number generator (see
+            `numpy.random.default_rng`). Predictions with the same seed are
+            the same.
 
         """
-        res = Scoresheet()
-        for a, b in all_pairs(self.eligible_nodes()):
-            res[(a, b)] = random.random()
-        return res
+        rng = np.random.default_rng(seed)
+        eligible = np.flatnonzero(self.eligible_mask())
+        nodes = self.index.nodes
+        if sample is None:
+            key = int(rng.integers(2**63))
+            return RandomScoresheet([nodes[i] for i in eligible.tolist()], key)
+
+        n = len(eligible)
+        num_pairs = n * (n - 1) // 2
+        exclusions = self.exclusions()
+        rows, cols = np.divmod(exclusions.codes, len(nodes))
+        if exclusions.inverted:
+            # Only the pairs in `codes` are not excluded, so we draw from those
+            is_eligible = self.eligible_mask()
+            keep = is_eligible[rows] & is_eligible[cols]
+            rows, cols = rows[keep], cols[keep]
+            drawn = rng.choice(len(rows), size=min(sample, len(rows)), replace=False)
+            return self._scoresheet_from_arrays(
+                rows[drawn], cols[drawn], rng.random(len(drawn))
+            )
+
+        # Positions of excluded pairs among all pairs of eligible nodes
+        position = np.full(len(nodes), -1)
+        position[eligible] = np.arange(n)
+        excluded = np.column_stack((position[rows], position[cols]))
+        excluded = excluded[(excluded >= 0).all(axis=1)]
+        excluded = np.unique(_pair_number(np.sort(excluded, axis=1), n))
+
+        # Drawing in random order and skipping excluded pairs keeps the sample
+        # uniformly random.
+        size = min(sample + len(excluded), num_pairs)
+        drawn = rng.choice(num_pairs, size=size, replace=False)
+        drawn = drawn[~np.isin(drawn, excluded)][:sample]
+        rows, cols = _numbered_pair(drawn, n)
+        return self._scoresheet_from_arrays(
+            eligible[rows], eligible[cols], rng.random(len(drawn))
+        )
+
+
+def _pair_number(pairs, n):
+    """Number pairs (i, j) with i < j < n consecutively, row by row"""
+    i, j = pairs[:, 0], pairs[:, 1]
+    return i * n - i * (i + 1) // 2 + j - i - 1
+
+
+def _numbered_pair(k, n):
+    """Inverse of `_pair_number`"""
+    k = np.asarray(k, dtype=np.int64)
+    i = n - 2 - np.floor(np.sqrt(-8 * k + 4 * n * (n - 1) - 7) / 2 - 0.5).astype(int)
+    j = k + i + 1 - n * (n - 1) // 2 + (n - i) * (n - i - 1) // 2
+    return i, j
@@ -1,14 +1,12 @@
 import math
+from functools import partial
 
-from ..evaluation import Scoresheet
-from ..util import all_pairs
+import numpy as np
+import scipy.sparse as sp
+
+from ..evaluation import ProductScoresheet
 from .base import Predictor
-from .util import (
-    neighbourhood,
-    neighbourhood_intersection_size,
-    neighbourhood_size,
-    neighbourhood_union_size,
-)
+from .util import neighbourhood, neighbourhood_intersection_size
 
 __all__ = [
     "AdamicAdar",
@@ -22,11 +20,360 @@ __all__ = [
     "NMeasure",
     "Pearson",
     "ResourceAllocation",
+    "neighbour_measures",
+    "predict_neighbour_measures",
 ]
 
 
+class _Intersections:
+    """Common neighbours of the likely pairs of a predictor
+
+    With the 'sparse' method, the (weighted) intersection sizes of all pairs
+    of eligible nodes are obtained at once as the product of the adjacency
+    matrix with its transpose. With the 'pairwise' method, we make a single
+    pass over the likely pairs and record their common neighbours. Either
+    way, only pairs with at least one common neighbour are kept, each of them
+    once (with `rows < cols`).
+
+    Alternatively, we can restrict ourselves to the likely pairs involving
+    one of the given `sources` (a list of eligible nodes) or look at an
+    explicit list of `pairs` (eligible `Pair`s). The cost then only depends
+    on the neighbourhoods of the nodes involved.
+
+    If `factors` is given (sparse method only), each common neighbour c counts
+    `factors[c]` in `values`, i.e. we use the product A * diag(factors) * A^T.
+
+    """
+
+    def __init__(
+        self,
+        predictor,
+        weight=None,
+        method="sparse",
+        *,
+        sources=None,
+        pairs=None,
+        factors=None,
+    ):
+        self.predictor = predictor
+        self.weight = weight
+        self.method = method
+        self.factors = factors
+
+        if pairs is not None:
+            self.method = "pairs"
+            index = predictor.index.index
+            pairs = np.array([(index[u], index[v]) for u, v in pairs], dtype=int)
+            self.rows, self.cols = pairs.reshape(-1, 2).T
+            self.values = self._dot(predictor.index.adjacency(weight))
+        elif sources is not None:
+            self.method = "pairs"
+            self._products_for(sources)
+        else:
+            self._nodes = np.flatnonzero(predictor.eligible_mask())
+            if method == "sparse":
+                product = self._product(weight, factors)
+                self._row, self._col = product.row, product.col
+                self.rows = self._nodes[self._row]
+                self.cols = self._nodes[self._col]
+                self.values = product.data
+                if predictor.excluded:
+                    # Leave out excluded pairs before computing any measures
+                    keep = ~predictor.excluded_mask(self.rows, self.cols)
+                    self._row, self._col = self._row[keep], self._col[keep]
+                    self.rows, self.cols = self.rows[keep], self.cols[keep]
+                    self.values = self.values[keep]
+            else:
+                self._common_neighbours()
+
+    def _product(self, weight, factors=None):
+        index = self.predictor.index
+        A = index.adjacency(weight)[self._nodes]
+        left = A if factors is None else A @ sp.diags(factors)
+        product = sp.triu(left @ A.T, k=1).tocsr()
+        if self.predictor.G.is_directed():
+            # Likely pairs in a directed network are only those where one node
+            # can be reached from the other in at most two steps.
+            adj = index.adjacency()[self._nodes]
+            reachable = adj[:, self._nodes] + adj @ index.adjacency()[:, self._nodes]
+            product = product.multiply(reachable + reachable.T > 0).tocsr()
+        product.eliminate_zeros()
+        product.sort_indices()
+        return product.tocoo()
+
+    def _products_for(self, sources):
+        predictor, index = self.predictor, self.predictor.index
+        sources = np.unique([index.index[v] for v in sources]).astype(int)
+        A = index.adjacency(self.weight)
+        product = (A[sources] @ index.transposed_adjacency(self.weight)).tocoo()
+        rows, cols = sources[product.row], product.col
+        # Pairs of two sources would otherwise be found twice
+        keep = (rows != cols) & (product.data != 0)
+        keep &= ~(np.isin(cols, sources) & (cols < rows))
+        if predictor.eligible_attr is not None:
+            nodes = index.nodes
+            keep &= np.fromiter(
+                (bool(predictor.eligible_node(nodes[j])) for j in cols.tolist()),
+                dtype=bool,
+                count=len(cols),
+            )
+        if predictor.G.is_directed():
+            # See _product(): only pairs within two steps of each other
+            adj, adj_t = index.adjacency(), index.transposed_adjacency()
+            out, into = adj[sources], adj_t[sources]
+            reachable = out + out @ adj + into + into @ adj_t
+            keep &= np.asarray(reachable[product.row, cols]).ravel() > 0
+        if predictor.excluded:
+            keep &= ~predictor.excluded_mask(rows, cols)
+        self.rows, self.cols = rows[keep], cols[keep]
+        self.values = product.data[keep]
+
+    def _common_neighbours(self):
+        G, weight = self.predictor.G, self.weight
+        node_index = self.predictor.index.index
+        pairs, common, products, starts = [], [], [], []
+        directed, seen = G.is_directed(), set()
+        for pair in self.predictor.likely_pairs():
+            a, b = sorted(pair, key=node_index.__getitem__)
+            i, j = node_index[a], node_index[b]
+            # Directed networks may yield the same pair in both directions
+            if directed:
+                if (i, j) in seen:
+                    continue
+                seen.add((i, j))
+            intersection = set(neighbourhood(G, a)) & set(neighbourhood(G, b))
+            if not intersection:
+                continue
+            pairs.append((i, j))
+            starts.append(len(common))
+            for c in intersection:
+                common.append(node_index[c])
+                products.append(G[a][c][weight] * G[b][c][weight] if weight else 1)
+
+        pairs = np.array(pairs, dtype=int).reshape(-1, 2)
+        self.rows, self.cols = pairs[:, 0], pairs[:, 1]
+        self._common = np.array(common, dtype=int)
+        self._products = np.array(products, dtype=float)
+        self._starts = np.array(starts, dtype=int)
+        self.values = np.add.reduceat(self._products, self._starts)
+
+    def _dot(self, A, factors=None):
+        """Get (weighted) intersection sizes of the pairs from matrix A"""
+        products = A[self.rows].multiply(A[self.cols])
+        if factors is None:
+            return np.asarray(products.sum(axis=1)).ravel()
+        return np.asarray(products @ factors).ravel()
+
+    def count(self):
+        """Get unweighted number of common neighbours for each pair"""
+        if self.method == "pairwise":
+            return np.diff(np.append(self._starts, len(self._common))).astype(float)
+        if self.method == "pairs":
+            return self._dot(self.predictor.index.adjacency())
+        if self.weight is None and self.factors is None:
+            return self.values
+        A = self.predictor.index.adjacency()[self._nodes]
+        return np.asarray((A @ A.T)[self._row, self._col]).ravel()
+
+    def weighted(self, factors):
+        """Get intersection sizes where each common neighbour c counts factors[c]
+
+        This corresponds to the product A * diag(factors) * A^T.
+
+        """
+        if self.method == "pairwise":
+            return np.add.reduceat(self._products * factors[self._common], self._starts)
+        if self.method == "pairs":
+            return self._dot(self.predictor.index.adjacency(self.weight), factors)
+        A = self.predictor.index.adjacency(self.weight)[self._nodes]
+        product = (A @ sp.diags(factors)) @ A.T
+        return np.asarray(product[self._row, self._col]).ravel()
+
+    def sizes(self, power=2):
+        """Get neighbourhood sizes of the nodes in each pair"""
+        size = self.predictor.index.neighbourhood_sizes(self.weight, power)
+        return size[self.rows], size[self.cols]
+
+    def scoresheet(self, scores):
+        """Get scoresheet of all pairs with a positive score"""
+        keep = scores > 0
+        return self.predictor._scoresheet_from_arrays(
+            self.rows[keep], self.cols[keep], scores[keep]
+        )
+
+
+def _check_method(method):
+    if method not in ("pairwise", "sparse"):
+        msg = f"Unknown method '{method}': use either 'pairwise' or 'sparse'"
+        raise ValueError(msg)
+
+
+def _adamic_adar_factors(index, weight=None):
+    size = index.neighbourhood_sizes(weight)
+    # Nodes with a size of 0 or 1 are never common neighbours
+    with np.errstate(divide="ignore"):
+        return 1 / np.log(size)
+
+
+def _adamic_adar(inter):
+    return inter.weighted(_adamic_adar_factors(inter.predictor.index, inter.weight))
+
+
+def _association_strength(inter):
+    a_size, b_size = inter.sizes()
+    return inter.values / (a_size * b_size)
+
+
+def _common_neighbours(inter, alpha=1.0):
+    if inter.weight is None or alpha == 0.0:
+        return inter.count()
+    if alpha == 1.0:
+        return inter.values
+    return (inter.count() ** (1.0 - alpha)) * (inter.values**alpha)
+
+
+def _cosine(inter):
+    a_size, b_size = inter.sizes()
+    return inter.values / np.sqrt(a_size * b_size)
+
+
+def _jaccard(inter):
+    a_size, b_size = inter.sizes()
+    return inter.values / (a_size + b_size - inter.values)
+
+
+def _overlap(inter, function):
+    return inter.values / function(*inter.sizes())
+
+
+_max_overlap = partial(_overlap, function=np.maximum)
+_min_overlap = partial(_overlap, function=np.minimum)
+
+
+def _n_measure(inter):
+    a_size, b_size = inter.sizes()
+    return math.sqrt(2) * inter.values / np.sqrt(a_size**2 + b_size**2)
+
+
+def _pearson(inter):
+    # Pairs without common neighbours always have a negative score, so we can
+    # safely restrict ourselves to pairs with common neighbours.
+    n = len(inter.predictor.G)
+    a_l2norm, b_l2norm = inter.sizes()
+    a_l1norm, b_l1norm = inter.sizes(power=1)
+    numerator = (n * inter.values) - (a_l1norm * b_l1norm)
+    denominator = np.sqrt(n * a_l2norm - a_l1norm**2) * np.sqrt(
+        n * b_l2norm - b_l1norm**2
+    )
+    return numerator / denominator
+
+
+def _resource_allocation_factors(index, weight=None):
+    size = index.neighbourhood_sizes(weight)
+    with np.errstate(divide="ignore"):
+        return 1 / size
+
+
+def _resource_allocation(inter):
+    factors = _resource_allocation_factors(inter.predictor.index, inter.weight)
+    return inter.weighted(factors)
+
+
+def _predict_for(predictor, measure, nodes, weight=None, method="pairwise", **params):
+    _check_method(method)
+    inter = _Intersections(predictor, weight, sources=nodes)
+    return inter.scoresheet(measure(inter, **params))
+
+
+def _score_pairs(predictor, measure, pairs, weight=None, method="pairwise", **params):
+    _check_method(method)
+    inter = _Intersections(predictor, weight, pairs=pairs)
+    return inter.scoresheet(measure(inter, **params))
+
+
+_measures = {
+    "AdamicAdar": _adamic_adar,
+    "AssociationStrength": _association_strength,
+    "CommonNeighbours": _common_neighbours,
+    "Cosine": _cosine,
+    "Jaccard": _jaccard,
+    "MaxOverlap": _max_overlap,
+    "MinOverlap": _min_overlap,
+    "NMeasure": _n_measure,
+    "Pearson": _pearson,
+    "ResourceAllocation": _resource_allocation,
+}
+
+#: Names of the predictors that `predict_neighbour_measures` can compute
+neighbour_measures = tuple(_measures)
+
+
+def predict_neighbour_measures(
+    G,
+    measures,
+    *,
+    weight=None,
+    method="pairwise",
+    eligible=None,
+    excluded=None,
+    top_k=None,
+):
+    """Predict with several neighbour-based measures at once
+
+    The common neighbours of all likely pairs are determined only once and
+    shared by all measures. Each measure yields the same predictions as the
+    corresponding predictor with default parameters.
+
+    Example
+    -------
+    >>> import networkx as nx
+    >>> G = nx.Graph([(1, 2), (1, 3), (2, 4), (3, 4)])
+    >>> scores = predict_neighbour_measures(G, ["CommonNeighbours", "Jaccard"])
+    >>> scores["CommonNeighbours"][(1, 4)], scores["Jaccard"][(2, 3)]
+    (2.0, 1.0)
+
+    Parameters
+    ----------
+    G : nx.Graph
+        a graph
+
+    measures : iterable of strings
+        Names of the predictors to use (see `neighbour_measures`)
+
+    weight : None or string, optional
+        If None, all edge weights are considered equal.
+        Otherwise holds the name of the edge attribute used as weight.
+
+    method : string, optional
+        Either 'pairwise' (make a single pass over all likely pairs) or
+        'sparse' (compute a single sparse matrix product).
+
+    eligible, excluded, top_k
+        See `Predictor`
+
+    Returns
+    -------
+    scoresheets : dict
+        Dictionary mapping each measure name to its Scoresheet
+
+    """
+    _check_method(method)
+    measures = list(measures)
+    for name in measures:
+        if name not in _measures:
+            msg = f"Unknown neighbour measure '{name}'"
+            raise ValueError(msg)
+
+    predictor = Predictor(G, eligible=eligible, excluded=excluded, top_k=top_k)
+    inter = _Intersections(predictor, weight, method)
+    return {
+        name: predictor._postprocess(inter.scoresheet(_measures[name](inter)))
+        for name in measures
+    }
+
+
 class AdamicAdar(Predictor):
-    def predict(self, weight=None):
+    def predict(self, weight=None, method="pairwise"):
         """Predict by Adamic/Adar measure of neighbours
 
         Parameters
@@ -35,8 +382,19 @@ class AdamicAdar(Predictor):
             If None, all edge weights are considered equal.
             Otherwise holds the name of the edge attribute used as weight.
 
+        method : string, optional
+            Either 'pairwise' (compute scores pair by pair) or 'sparse'
+            (compute all scores at once from a sparse matrix product).
+
         """
-        res = Scoresheet()
+        _check_method(method)
+        if method == "sparse":
+            factors = _adamic_adar_factors(self.index, weight)
+            inter = _Intersections(self, weight, factors=factors)
+            return inter.scoresheet(inter.values)
+
+        res = self._new_scoresheet()
+        size = self.index.neighbourhood_size_map(weight)
         for a, b in self.likely_pairs():
             intersection = set(neighbourhood(self.G, a)) & set(neighbourhood(self.G, b))
             w = 0
@@ -45,14 +403,20 @@ class AdamicAdar(Predictor):
                     numerator = self.G[a][c][weight] * self.G[b][c][weight]
                 else:
                     numerator = 1
-                w += numerator / math.log(neighbourhood_size(self.G, c, weight))
+                w += numerator / math.log(size[c])
             if w > 0:
                 res[(a, b)] = w
         return res
 
+    def _predict_for(self, nodes, weight=None, method="pairwise"):
+        return _predict_for(self, _adamic_adar, nodes, weight, method)
+
+    def _score_pairs(self, pairs, weight=None, method="pairwise"):
+        return _score_pairs(self, _adamic_adar, pairs, weight, method)
+
 
 class AssociationStrength(Predictor):
-    def predict(self, weight=None):
+    def predict(self, weight=None, method="pairwise"):
         """Predict by association strength of neighbours
 
         Parameters
@@ -61,20 +425,35 @@ class AssociationStrength(Predictor):
             If None, all edge weights are considered equal.
             Otherwise holds the name of the edge attribute used as weight.
 
+        method : string, optional
+            Either 'pairwise' (compute scores pair by pair) or 'sparse'
+            (compute all scores at once from a sparse matrix product).
+
         """
-        res = Scoresheet()
+        _check_method(method)
+        if method == "sparse":
+            inter = _Intersections(self, weight)
+            return inter.scoresheet(_association_strength(inter))
+
+        res = self._new_scoresheet()
+        size = self.index.neighbourhood_size_map(weight)
         for a, b in self.likely_pairs():
             w = neighbourhood_intersection_size(self.G, a, b, weight) / (
-                neighbourhood_size(self.G, a, weight)
-                * neighbourhood_size(self.G, b, weight)
+                size[a] * size[b]
             )
             if w > 0:
                 res[(a, b)] = w
         return res
 
+    def _predict_for(self, nodes, weight=None, method="pairwise"):
+        return _predict_for(self, _association_strength, nodes, weight, method)
+
+    def _score_pairs(self, pairs, weight=None, method="pairwise"):
+        return _score_pairs(self, _association_strength, pairs, weight, method)
+
 
 class CommonNeighbours(Predictor):
-    def predict(self, alpha=1.0, weight=None):
+    def predict(self, alpha=1.0, weight=None, method="pairwise"):
         r"""Predict using common neighbours
 
         This is loosely based on Opsahl et al. (2010):
@@ -95,8 +474,17 @@ class CommonNeighbours(Predictor):
             If None, all edge weights are considered equal.
             Otherwise holds the name of the edge attribute used as weight.
 
+        method : string, optional
+            Either 'pairwise' (compute scores pair by pair) or 'sparse'
+            (compute all scores at once from a sparse matrix product).
+
         """
-        res = Scoresheet()
+        _check_method(method)
+        if method == "sparse":
+            inter = _Intersections(self, weight)
+            return inter.scoresheet(_common_neighbours(inter, alpha))
+
+        res = self._new_scoresheet()
         for a, b in self.likely_pairs():
             if weight is None or alpha == 0.0:
                 w = neighbourhood_intersection_size(self.G, a, b, weight=None)
@@ -110,9 +498,19 @@ class CommonNeighbours(Predictor):
                 res[(a, b)] = w
         return res
 
+    def _predict_for(self, nodes, alpha=1.0, weight=None, method="pairwise"):
+        return _predict_for(
+            self, _common_neighbours, nodes, weight, method, alpha=alpha
+        )
+
+    def _score_pairs(self, pairs, alpha=1.0, weight=None, method="pairwise"):
+        return _score_pairs(
+            self, _common_neighbours, pairs, weight, method, alpha=alpha
+        )
+
 
 class Cosine(Predictor):
-    def predict(self, weight=None):
+    def predict(self, weight=None, method="pairwise"):
         """Predict by cosine measure of neighbours
 
         Parameters
@@ -121,22 +519,41 @@ class Cosine(Predictor):
             If None, all edge weights are considered equal.
             Otherwise holds the name of the edge attribute used as weight.
 
+        method : string, optional
+            Either 'pairwise' (compute scores pair by pair) or 'sparse'
+            (compute all scores at once from a sparse matrix product).
+
         """
-        res = Scoresheet()
+        _check_method(method)
+        if method == "sparse":
+            inter = _Intersections(self, weight)
+            return inter.scoresheet(_cosine(inter))
+
+        res = self._new_scoresheet()
+        size = self.index.neighbourhood_size_map(weight)
         for a, b in self.likely_pairs():
             w = neighbourhood_intersection_size(self.G, a, b, weight) / math.sqrt(
-                neighbourhood_size(self.G, a, weight)
-                * neighbourhood_size(self.G, b, weight)
+                size[a] * size[b]
             )
             if w > 0:
                 res[(a, b)] = w
         return res
 
+    def _predict_for(self, nodes, weight=None, method="pairwise"):
+        return _predict_for(self, _cosine, nodes, weight, method)
+
+    def _score_pairs(self, pairs, weight=None, method="pairwise"):
+        return _score_pairs(self, _cosine, pairs, weight, method)
+
 
 class DegreeProduct(Predictor):
     def predict(self, weight=None, minimum=1):
         """Predict by degree product (preferential attachment)
 
+        Since every pair of nodes gets a score, the scores are not stored but
+        computed as needed: we return a `ProductScoresheet` that can
+        efficiently yield the highest-scoring pairs.
+
         Parameters
         ----------
         weight : None or string, optional
@@ -148,18 +565,14 @@ class DegreeProduct(Predictor):
             prediction is ignored.
 
         """
-        res = Scoresheet()
-        for a, b in all_pairs(self.eligible_nodes()):
-            w = neighbourhood_size(self.G, a, weight) * neighbourhood_size(
-                self.G, b, weight
-            )
-            if w >= minimum:
-                res[(a, b)] = w
-        return res
+        eligible = np.flatnonzero(self.eligible_mask())
+        nodes = [self.index.nodes[i] for i in eligible.tolist()]
+        sizes = self.index.neighbourhood_sizes(weight)[eligible]
+        return ProductScoresheet(nodes, sizes, minimum)
 
 
 class Jaccard(Predictor):
-    def predict(self, weight=None):
+    def predict(self, weight=None, method="pairwise"):
         """Predict by Jaccard index of neighbours
 
         Parameters
@@ -168,20 +581,36 @@ class Jaccard(Predictor):
             If None, all edge weights are considered equal.
             Otherwise holds the name of the edge attribute used as weight.
 
+        method : string, optional
+            Either 'pairwise' (compute scores pair by pair) or 'sparse'
+            (compute all scores at once from a sparse matrix product).
+
         """
-        res = Scoresheet()
+        _check_method(method)
+        if method == "sparse":
+            inter = _Intersections(self, weight)
+            return inter.scoresheet(_jaccard(inter))
+
+        res = self._new_scoresheet()
+        size = self.index.neighbourhood_size_map(weight)
         for a, b in self.likely_pairs():
             # Best performance: weighted numerator, unweighted denominator.
             numerator = neighbourhood_intersection_size(self.G, a, b, weight)
-            denominator = neighbourhood_union_size(self.G, a, b, weight)
+            denominator = size[a] + size[b] - numerator
             w = numerator / denominator
             if w > 0:
                 res[(a, b)] = w
         return res
 
+    def _predict_for(self, nodes, weight=None, method="pairwise"):
+        return _predict_for(self, _jaccard, nodes, weight, method)
+
+    def _score_pairs(self, pairs, weight=None, method="pairwise"):
+        return _score_pairs(self, _jaccard, pairs, weight, method)
+
 
 class NMeasure(Predictor):
-    def predict(self, weight=None):
+    def predict(self, weight=None, method="pairwise"):
         """Predict by N measure of neighbours
 
         The N measure was defined by Egghe (2009).
@@ -192,31 +621,47 @@ class NMeasure(Predictor):
             If None, all edge weights are considered equal.
             Otherwise holds the name of the edge attribute used as weight.
 
+        method : string, optional
+            Either 'pairwise' (compute scores pair by pair) or 'sparse'
+            (compute all scores at once from a sparse matrix product).
+
         """
-        res = Scoresheet()
+        _check_method(method)
+        if method == "sparse":
+            inter = _Intersections(self, weight)
+            return inter.scoresheet(_n_measure(inter))
+
+        res = self._new_scoresheet()
+        size = self.index.neighbourhood_size_map(weight)
         for a, b in self.likely_pairs():
             w = (
                 math.sqrt(2)
                 * neighbourhood_intersection_size(self.G, a, b, weight)
-                / math.sqrt(
-                    neighbourhood_size(self.G, a, weight) ** 2
-                    + neighbourhood_size(self.G, b, weight) ** 2
-                )
+                / math.sqrt(size[a] ** 2 + size[b] ** 2)
             )
             if w > 0:
                 res[(a, b)] = w
         return res
 
+    def _predict_for(self, nodes, weight=None, method="pairwise"):
+        return _predict_for(self, _n_measure, nodes, weight, method)
 
-def _predict_overlap(predictor, function, weight=None):
-    res = Scoresheet()
+    def _score_pairs(self, pairs, weight=None, method="pairwise"):
+        return _score_pairs(self, _n_measure, pairs, weight, method)
+
+
+def _predict_overlap(predictor, function, weight=None, method="pairwise"):
+    _check_method(method)
+    if method == "sparse":
+        inter = _Intersections(predictor, weight)
+        return inter.scoresheet(_overlap(inter, function))
+
+    res = predictor._new_scoresheet()
+    size = predictor.index.neighbourhood_size_map(weight)
     for a, b in predictor.likely_pairs():
         # Best performance: weighted numerator, unweighted denominator.
         numerator = neighbourhood_intersection_size(predictor.G, a, b, weight)
-        denominator = function(
-            neighbourhood_size(predictor.G, a, weight),
-            neighbourhood_size(predictor.G, b, weight),
-        )
+        denominator = function(size[a], size[b])
         w = numerator / denominator
         if w > 0:
             res[(a, b)] = w
@@ -224,7 +669,7 @@ def _predict_overlap(predictor, function, weight=None):
 
 
 class MaxOverlap(Predictor):
-    def predict(self, weight=None):
+    def predict(self, weight=None, method="pairwise"):
         """Predict by maximum overlap between neighbours
 
         Parameters
@@ -233,12 +678,22 @@ class MaxOverlap(Predictor):
             If None, all edge weights are considered equal.
             Otherwise holds the name of the edge attribute used as weight.
 
+        method : string, optional
+            Either 'pairwise' (compute scores pair by pair) or 'sparse'
+            (compute all scores at once from a sparse matrix product).
+
         """
-        return _predict_overlap(self, max, weight)
+        return _predict_overlap(self, np.maximum, weight, method)
+
+    def _predict_for(self, nodes, weight=None, method="pairwise"):
+        return _predict_for(self, _max_overlap, nodes, weight, method)
+
+    def _score_pairs(self, pairs, weight=None, method="pairwise"):
+        return _score_pairs(self, _max_overlap, pairs, weight, method)
 
 
 class MinOverlap(Predictor):
-    def predict(self, weight=None):
+    def predict(self, weight=None, method="pairwise"):
         """Predict by minimum overlap between neighbours
 
         Parameters
@@ -247,12 +702,22 @@ class MinOverlap(Predictor):
             If None, all edge weights are considered equal.
             Otherwise holds the name of the edge attribute used as weight.
 
+        method : string, optional
+            Either 'pairwise' (compute scores pair by pair) or 'sparse'
+            (compute all scores at once from a sparse matrix product).
+
         """
-        return _predict_overlap(self, min, weight)
+        return _predict_overlap(self, np.minimum, weight, method)
+
+    def _predict_for(self, nodes, weight=None, method="pairwise"):
+        return _predict_for(self, _min_overlap, nodes, weight, method)
+
+    def _score_pairs(self, pairs, weight=None, method="pairwise"):
+        return _score_pairs(self, _min_overlap, pairs, weight, method)
 
 
 class Pearson(Predictor):
-    def predict(self, weight=None):
+    def predict(self, weight=None, method="pairwise"):
         """Predict by Pearson correlation between neighbours
 
         Parameters
@@ -261,17 +726,26 @@ class Pearson(Predictor):
             If None, all edge weights are considered equal.
             Otherwise holds the name of the edge attribute used as weight.
 
+        method : string, optional
+            Either 'pairwise' (compute scores pair by pair) or 'sparse'
+            (compute all scores at once from a sparse matrix product).
+
         """
-        res = Scoresheet()
+        _check_method(method)
+        if method == "sparse":
+            inter = _Intersections(self, weight)
+            return inter.scoresheet(_pearson(inter))
+
+        res = self._new_scoresheet()
         # 'Full' Pearson looks at all possible pairs. Since those are likely
         # of little value for link prediction, we restrict ourselves to pairs
         # with at least one common neighbour.
+        n = len(self.G)
+        l2norm = self.index.neighbourhood_size_map(weight)
+        l1norm = self.index.neighbourhood_size_map(weight, power=1)
         for a, b in self.likely_pairs():
-            n = len(self.G)
-            a_l2norm = neighbourhood_size(self.G, a, weight)
-            b_l2norm = neighbourhood_size(self.G, b, weight)
-            a_l1norm = neighbourhood_size(self.G, a, weight, power=1)
-            b_l1norm = neighbourhood_size(self.G, b, weight, power=1)
+            a_l2norm, b_l2norm = l2norm[a], l2norm[b]
+            a_l1norm, b_l1norm = l1norm[a], l1norm[b]
             intersect = neighbourhood_intersection_size(self.G, a, b, weight)
 
             numerator = (n * intersect) - (a_l1norm * b_l1norm)
@@ -284,9 +758,15 @@ class Pearson(Predictor):
                 res[(a, b)] = w
         return res
 
+    def _predict_for(self, nodes, weight=None, method="pairwise"):
+        return _predict_for(self, _pearson, nodes, weight, method)
+
+    def _score_pairs(self, pairs, weight=None, method="pairwise"):
+        return _score_pairs(self, _pearson, pairs, weight, method)
+
 
 class ResourceAllocation(Predictor):
-    def predict(self, weight=None):
+    def predict(self, weight=None, method="pairwise"):
         """Predict with resource allocation index of neighbours
 
         Resource allocation was defined by Zhou, Lu & Zhang (2009, Eur. Phys.
@@ -298,8 +778,19 @@ class ResourceAllocation(Predictor):
             If None, all edge weights are considered equal.
             Otherwise holds the name of the edge attribute used as weight.
 
+        method : string, optional
+            Either 'pairwise' (compute scores pair by pair) or 'sparse'
+            (compute all scores at once from a sparse matrix product).
+
         """
-        res = Scoresheet()
+        _check_method(method)
+        if method == "sparse":
+            factors = _resource_allocation_factors(self.index, weight)
+            inter = _Intersections(self, weight, factors=factors)
+            return inter.scoresheet(inter.values)
+
+        res = self._new_scoresheet()
+        size = self.index.neighbourhood_size_map(weight)
         for a, b in self.likely_pairs():
             intersection = set(neighbourhood(self.G, a)) & set(neighbourhood(self.G, b))
             w = 0
@@ -308,7 +799,13 @@ class ResourceAllocation(Predictor):
                     numerator = float(self.G[a][c][weight] * self.G[b][c][weight])
                 else:
                     numerator = 1
-                w += numerator / neighbourhood_size(self.G, c, weight)
+                w += numerator / size[c]
             if w > 0:
                 res[(a, b)] = w
         return res
+
+    def _predict_for(self, nodes, weight=None, method="pairwise"):
+        return _predict_for(self, _resource_allocation, nodes, weight, method)
+
+    def _score_pairs(self, pairs, weight=None, method="pairwise"):
+        return _score_pairs(self, _resource_allocation, pairs, weight, method)
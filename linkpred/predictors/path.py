@@ -1,14 +1,31 @@
+import logging
+import math
+
 import networkx as nx
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import dijkstra
+from scipy.sparse.linalg import splu
 
 from ..evaluation import Scoresheet
 from ..util import progressbar
 from .base import Predictor
 
+log = logging.getLogger(__name__)
+
 __all__ = ["GraphDistance", "Katz"]
 
 
 class GraphDistance(Predictor):
-    def predict(self, weight="weight", alpha=1):
+    def predict(
+        self,
+        weight="weight",
+        alpha=1,
+        *,
+        method="networkx",
+        radius=None,
+        block_size=None,
+    ):
         r"""Predict by graph distance
 
         This is based on the dissimilarity measures of Egghe & Rousseau (2003):
@@ -35,7 +52,29 @@ class GraphDistance(Predictor):
             Parameter to determine relative importance of intermediate
             link strength
 
+        method : string, optional
+            Either 'networkx' (shortest paths with NetworkX) or 'csgraph'
+            (breadth-first search or Dijkstra with `scipy.sparse.csgraph`,
+            for blocks of source nodes at a time). The latter is much faster
+            and only needs memory for one block of distances at a time. Both
+            give the same results, also in directed networks.
+
+        radius : float or None, optional
+            If given, pairs that are further apart than `radius` are not
+            predicted. This limits the search to the neighbourhood of each
+            node.
+
+        block_size : int or None, optional
+            Only for method 'csgraph': number of source nodes per block
+
         """
+        if method == "csgraph":
+            rows, cols, distances = self._csgraph(weight, alpha, radius, block_size)
+            return self._scoresheet_from_arrays(rows, cols, 1 / distances)
+        if method != "networkx":
+            msg = f"Unknown method '{method}': use either 'networkx' or 'csgraph'"
+            raise ValueError(msg)
+
         res = Scoresheet()
 
         if weight is None:
@@ -47,7 +86,13 @@ class GraphDistance(Predictor):
                 (u, v, 1 / d[weight] ** alpha) for u, v, d in self.G.edges(data=True)
             )
 
-        dist = nx.shortest_path_length(G, weight=weight)
+        if radius is None:
+            dist = nx.shortest_path_length(G, weight=weight)
+        elif weight is None:
+            # Path lengths are integers: stay within a fractional radius
+            dist = nx.all_pairs_shortest_path_length(G, cutoff=math.floor(radius))
+        else:
+            dist = nx.all_pairs_dijkstra_path_length(G, cutoff=radius, weight=weight)
         for a, others in dist:
             if not self.eligible_node(a):
                 continue
@@ -58,20 +103,85 @@ class GraphDistance(Predictor):
                 res[(a, b)] = w
         return res
 
+    def _csgraph(self, weight, alpha, radius=None, block_size=None):
+        n = len(self.index)
+        if block_size is None:
+            # Keep dense blocks of distances to about 10 million entries
+            block_size = max(1, 10**7 // max(n, 1))
+        unweighted = weight is None or alpha == 0
+        adj = self.index.adjacency(None if unweighted else weight)
+        # Like the networkx method, only follow edge directions without weights
+        directed = self.G.is_directed() and weight is None
+        if self.G.is_directed() and not directed:
+            adj = _undirected(adj)
+        if not unweighted:
+            # We assume that edge weights denote proximities
+            adj = adj.copy()
+            adj.data = 1 / adj.data**alpha
+        limit = np.inf if radius is None else radius
 
-def matrix_power(arr, n):
-    """Matrix power: perform matrix multiplication n times"""
-    if n < 1:
-        msg = "Expected power equal to 1 or higher"
-        raise ValueError(msg)
-    if n == 1:
-        return arr
+        eligible = self.eligible_mask()
+        sources = np.flatnonzero(eligible)
+        rows, cols, distances = [np.empty(0, int)], [np.empty(0, int)], [np.empty(0)]
+        for start in progressbar(range(0, len(sources), block_size), "Blocks: "):
+            block = sources[start : start + block_size]
+            dist = dijkstra(
+                adj, directed, indices=block, unweighted=unweighted, limit=limit
+            )
+            if directed:
+                # As with networkx, the distance from the later node to the
+                # earlier one wins, if there is a path in that direction.
+                backward = dijkstra(
+                    adj.T,
+                    directed=True,
+                    indices=block,
+                    unweighted=unweighted,
+                    limit=limit,
+                )
+                dist = np.where(np.isfinite(backward), backward, dist)
+            reached = np.isfinite(dist)
+            reached[:, ~eligible] = False
+            i, j = np.nonzero(reached)
+            # Each pair (i, j) once, with i < j
+            keep = block[i] < j
+            i, j = i[keep], j[keep]
+            block_rows, block_cols, block_distances = self._keep_top(
+                block[i], j, dist[i, j], largest=False
+            )
+            rows.append(block_rows)
+            cols.append(block_cols)
+            distances.append(block_distances)
+
+        return np.concatenate(rows), np.concatenate(cols), np.concatenate(distances)
+
+
+def _undirected(adj):
+    """Get symmetric version of directed adjacency matrix `adj`
 
-    return arr @ matrix_power(arr, n - 1)
+    This mirrors `networkx.Graph(G)`: if there are edges in both directions,
+    the one from the later node to the earlier one wins.
+
+    """
+    lower = sp.tril(adj, k=-1, format="csr")
+    upper = sp.triu(adj, k=1, format="csr")
+    upper = upper - upper.multiply(lower.T != 0)
+    upper = (upper + lower.T).tocsr()
+    upper.eliminate_zeros()
+    return (upper + upper.T).tocsr()
 
 
 class Katz(Predictor):
-    def predict(self, beta=0.001, max_power=5, weight="weight", dtype=None):
+    def predict(
+        self,
+        beta=0.001,
+        max_power=5,
+        weight="weight",
+        dtype=None,
+        *,
+        method="series",
+        threshold=None,
+        max_entries=None,
+    ):
         """Predict by Katz (1953) measure
 
         Let `A` be an adjacency matrix for the directed network `G`.
@@ -97,27 +207,132 @@ class Katz(Predictor):
         dtype : a data type
             data type of edge weights
 
+        method : string, optional
+            Either 'series' (sum the first `max_power` powers of `A`) or
+            'solve' (compute the full series (I - beta A)^-1 - I by solving
+            sparse linear systems for blocks of nodes). The latter ignores
+            `max_power` and is only meaningful if beta is smaller than
+            1 / (largest eigenvalue of A).
+
+        threshold : float or None, optional
+            Only for method 'series': after each step, drop entries of the
+            current power that contribute less than `threshold` to the score
+            (i.e. entries of beta^k A^k below `threshold`).
+
+        max_entries : int or None, optional
+            Only for method 'series': after each step, only keep the
+            `max_entries` largest entries in each row of the current power.
+            Memory use is then proportional to n * max_entries.
+
+        If entries are dropped, the total of all dropped contributions to the
+        Katz matrix (including the ones that would have followed from them in
+        later steps) is stored in `self.approximation_error`. This assumes
+        that edge weights are not negative. Otherwise, it is set to 0.
+
         """
-        nodelist = list(self.G.nodes)
-        adj = nx.to_scipy_sparse_array(self.G, dtype=dtype, weight=weight)
-        res = Scoresheet()
+        if method not in ("series", "solve"):
+            msg = f"Unknown method '{method}': use either 'series' or 'solve'"
+            raise ValueError(msg)
+
+        self.approximation_error = 0.0
+        adj = nx.to_scipy_sparse_array(
+            self.G, nodelist=self.index.nodes, dtype=dtype, weight=weight, format="csr"
+        )
+        if method == "solve":
+            rows, cols, scores = self._solve(adj, beta)
+        else:
+            rows, cols, scores = self._series(
+                adj, beta, max_power, threshold, max_entries
+            )
+        return self._scoresheet_from_arrays(rows, cols, scores)
 
+    def _series(self, adj, beta, max_power, threshold=None, max_entries=None):
+        pruned = threshold is not None or max_entries is not None
+        total = sp.csr_array(adj.shape)
+        power = None
+        # Sums of all entries of the exact and the pruned series
+        walks = np.ones(adj.shape[0])
+        exact_sum = pruned_sum = 0.0
         for k in progressbar(range(1, max_power + 1), "Computing matrix powers: "):
-            # The below method is found to be fastest for iterating through a
-            # sparse matrix, see
-            # http://stackoverflow.com/questions/4319014/
-            matrix = matrix_power(adj, k).tocoo()
-            for i, j, d in zip(matrix.row, matrix.col, matrix.data):
-                if i == j:
-                    continue
-                u, v = nodelist[i], nodelist[j]
-                if self.eligible(u, v):
-                    w = d * (beta**k)
-                    res[(u, v)] += w
+            power = adj if power is None else power @ adj
+            if pruned:
+                power = _prune(
+                    power, threshold / beta**k if threshold else None, max_entries
+                )
+                walks = adj @ walks
+                exact_sum += beta**k * walks.sum()
+                pruned_sum += beta**k * power.sum()
+            total = total + power * (beta**k)
+
+        if pruned:
+            self.approximation_error = exact_sum - pruned_sum
+            log.info(
+                "Pruned Katz: dropped %g of %g in total (relative error %g)",
+                self.approximation_error,
+                exact_sum,
+                self.approximation_error / exact_sum if exact_sum else 0.0,
+            )
 
-        # We count double in case of undirected networks ((i, j) and (j, i))
+        # Each pair (i, j) once: in undirected networks, K is symmetric; in
+        # directed networks, the score is K[i, j] + K[j, i].
+        total = total + total.T
         if not self.G.is_directed():
-            for pair in res:
-                res[pair] /= 2
+            total = total / 2
+        total = sp.triu(total, k=1).tocoo()
+        return self._eligible_only(total.row, total.col, total.data)
 
-        return res
+    def _solve(self, adj, beta, block_size=None):
+        n = adj.shape[0]
+        if block_size is None:
+            # Keep dense blocks to about 10 million entries
+            block_size = max(1, 10**7 // max(n, 1))
+        system = sp.identity(n, format="csc") - beta * adj.astype(float)
+        lu = splu(system.tocsc())
+
+        rows, cols, scores = [np.empty(0, int)], [np.empty(0, int)], [np.empty(0)]
+        for start in progressbar(range(0, n, block_size), "Solving blocks: "):
+            stop = min(start + block_size, n)
+            rhs = np.zeros((n, stop - start))
+            rhs[np.arange(start, stop), np.arange(stop - start)] = 1
+            # Column j of (I - beta A)^-1 is the solution for unit vector e_j.
+            # We can ignore the identity matrix, since we skip i == j anyway.
+            block = lu.solve(rhs)
+            if self.G.is_directed():
+                block = block + lu.solve(rhs, trans="T")
+            i, j = np.nonzero(block)
+            keep = i < j + start
+            i, j = i[keep], j[keep]
+            block_rows, block_cols, block_scores = self._eligible_only(
+                i, j + start, block[i, j]
+            )
+            block_rows, block_cols, block_scores = self._keep_top(
+                block_rows, block_cols, block_scores
+            )
+            rows.append(block_rows)
+            cols.append(block_cols)
+            scores.append(block_scores)
+
+        return np.concatenate(rows), np.concatenate(cols), np.concatenate(scores)
+
+    def _eligible_only(self, rows, cols, scores):
+        if self.eligible_attr is None:
+            return rows, cols, scores
+        eligible = self.eligible_mask()
+        keep = eligible[rows] & eligible[cols]
+        return rows[keep], cols[keep], scores[keep]
+
+
+def _prune(matrix, threshold=None, max_entries=None):
+    """Drop entries below threshold and keep max_entries largest ones per row"""
+    matrix = sp.csr_array(matrix, copy=True)
+    if threshold is not None:
+        matrix.data[matrix.data < threshold] = 0
+        matrix.eliminate_zeros()
+    if max_entries is not None:
+        row = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+        order = np.lexsort((-matrix.data, row))
+        rank = np.empty(len(order), dtype=int)
+        rank[order] = np.arange(len(order)) - matrix.indptr[row[order]]
+        matrix.data[rank >= max_entries] = 0
+        matrix.eliminate_zeros()
+    return matrix
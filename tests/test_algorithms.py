@@ -0,0 +1,152 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from linkpred.network import (
+    GoogleMatrix,
+    SimRankFingerprints,
+    approximate_rooted_pagerank,
+    rooted_pagerank,
+    rooted_pagerank_block,
+    simrank,
+    sparse_simrank,
+)
+from linkpred.network.algorithms import raw_google_matrix
+
+
+@pytest.fixture
+def graph():
+    G = nx.gnm_random_graph(40, 80, seed=6, directed=True)
+    for u, v, d in G.edges(data=True):
+        d["weight"] = (u + v) % 3 + 1
+    return G
+
+
+def as_array(G, pagerank):
+    return np.array([pagerank[v] for v in G])
+
+
+def test_google_matrix():
+    A = np.array([[0, 1, 3], [0, 0, 0], [2, 0, 0]])
+    M = GoogleMatrix(A)
+    expected = np.array([[0, 0.25, 0.75], [1 / 3, 1 / 3, 1 / 3], [1, 0, 0]])
+    assert M.toarray() == pytest.approx(expected)
+    assert list(M.dangling) == [False, True, False]
+
+    x = np.array([[0.2, 1], [0.5, 0], [0.3, 0]])
+    assert M.dot(x) == pytest.approx(expected @ x)
+    assert M.propagate(x) == pytest.approx(expected.T @ x)
+    teleport = np.array([[1, 0], [0, 0], [0, 1]])
+    assert M.propagate(x, teleport) == pytest.approx(
+        expected.T @ x + (teleport - 1 / 3) * x[1]
+    )
+
+    with pytest.raises(ValueError):
+        GoogleMatrix(np.zeros((0, 0)))
+
+
+def test_google_matrix_from_graph(graph):
+    G = graph
+    M = GoogleMatrix.from_graph(G)
+    assert M.toarray() == pytest.approx(raw_google_matrix(G))
+    assert M.toarray().sum(axis=1) == pytest.approx(1)
+    reversed_ = GoogleMatrix.from_graph(G, reverse=True)
+    assert reversed_.toarray() == pytest.approx(raw_google_matrix(G.reverse()))
+
+
+def test_raw_google_matrix():
+    G = nx.DiGraph()
+    G.add_weighted_edges_from([(0, 1, 1), (0, 2, 3), (2, 0, 2), (2, 3, 2)])
+    G.add_node(4)
+    # Each row sums to one; dangling nodes 1, 3 and 4 link to every node
+    expected = np.array(
+        [
+            [0, 0.25, 0.75, 0, 0],
+            [0.2, 0.2, 0.2, 0.2, 0.2],
+            [0.5, 0, 0, 0.5, 0],
+            [0.2, 0.2, 0.2, 0.2, 0.2],
+            [0.2, 0.2, 0.2, 0.2, 0.2],
+        ]
+    )
+    assert raw_google_matrix(G) == pytest.approx(expected)
+    assert raw_google_matrix(G, weight=None)[0] == pytest.approx([0, 0.5, 0.5, 0, 0])
+    with pytest.raises(ValueError, match="Empty network"):
+        raw_google_matrix(nx.Graph())
+
+
+@pytest.mark.parametrize("beta", [0, 0.1])
+def test_rooted_pagerank_block(graph, beta):
+    G = graph
+    T = GoogleMatrix(nx.to_scipy_sparse_array(G, nodelist=list(G)))
+    roots = [0, 5, 17]
+    pagerank = rooted_pagerank_block(T, roots, alpha=0.8, beta=beta, tol=1e-10)
+    for i, root in enumerate(roots):
+        expected = rooted_pagerank(G, root, alpha=0.8, beta=beta)
+        assert pagerank[:, i] == pytest.approx(as_array(G, expected), abs=1e-5)
+
+
+def test_approximate_rooted_pagerank(graph):
+    G = graph
+    T = GoogleMatrix(nx.to_scipy_sparse_array(G, nodelist=list(G)))
+    exact = as_array(
+        G, nx.pagerank(G, personalization={3: 1}, tol=1e-13, max_iter=1000)
+    )
+    previous = 1
+    for epsilon in (1e-2, 1e-4, 1e-6):
+        estimate, residual = approximate_rooted_pagerank(T, 3, epsilon=epsilon)
+        approximation = np.zeros(len(G))
+        approximation[list(estimate)] = list(estimate.values())
+        # The residual is exactly the (L1) error
+        assert np.all(approximation <= exact + 1e-12)
+        assert residual == pytest.approx(np.abs(exact - approximation).sum())
+        assert residual < previous
+        previous = residual
+
+
+@pytest.mark.parametrize("weight", ["weight", None])
+def test_simrank(graph, weight):
+    G = graph
+    G.add_node("isolated")
+    # Sum over the in-links of both nodes, divided by their number of
+    # out-links; nodes without out-links link to every node
+    A = nx.to_numpy_array(G, weight=weight)
+    A[A.sum(axis=1) == 0] = 1 / len(G)
+    M = A / A.sum(axis=1)
+    expected = np.identity(len(G))
+    for _ in range(5):
+        expected = 0.6 * M.T @ expected @ M
+        np.fill_diagonal(expected, 1)
+
+    sim = simrank(G, c=0.6, num_iterations=5, weight=weight)
+    assert sim == pytest.approx(expected)
+    assert (sim[-1, :-1] > 0).all()
+
+
+def test_sparse_simrank(graph):
+    G = graph
+    T = GoogleMatrix(nx.to_scipy_sparse_array(G, nodelist=list(G)).T)
+    sim = sparse_simrank(T, threshold=None).toarray()
+    assert sim == pytest.approx(sim.T)
+    assert np.diag(sim) == pytest.approx(1)
+
+    pruned = sparse_simrank(T, threshold=0.01)
+    sources = [7, 3, 7, 21]
+    rows = sparse_simrank(T, sources, threshold=0.01)
+    assert rows.shape == (4, len(G))
+    assert rows.toarray() == pytest.approx(pruned.toarray()[sources])
+
+
+def test_simrank_fingerprints(graph):
+    G = graph
+    T = GoogleMatrix(nx.to_scipy_sparse_array(G, nodelist=list(G)).T)
+    fingerprints = SimRankFingerprints(T, c=0.6, num_iterations=5, seed=3)
+    assert fingerprints.positions.shape == (100, 6, len(G))
+
+    sim = np.identity(len(G))
+    rows, cols, scores = fingerprints.all_pairs()
+    assert np.all(rows < cols)
+    sim[rows, cols] = sim[cols, rows] = scores
+    for u in (0, 11):
+        assert fingerprints.similarities(u) == pytest.approx(sim[u])
+        for v in (3, 11, 25):
+            assert fingerprints.similarity(u, v) == pytest.approx(sim[u, v])
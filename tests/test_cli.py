@@ -114,6 +114,7 @@ def test_handle_arguments():
         "predictors": [],
         "exclude": "old",
         "profile": None,
+        "top_k": None,
         "training-file": "training",
     }
 
@@ -146,3 +147,6 @@ def test_handle_arguments():
 
     args = handle_arguments(["training", "-f", "eps"])
     assert args["chart_filetype"] == "eps"
+
+    args = handle_arguments(["training", "-k", "10"])
+    assert args["top_k"] == 10
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from linkpred.evaluation import (
+    ArrayScoresheet,
+    BaseScoresheet,
+    EvaluationSheet,
+    Pair,
+    UndefinedError,
+    average_precision,
+    precision_at_k,
+    r_precision,
+    recall_at_k,
+    roc_auc,
+    scores_and_labels,
+)
+
+from .utils import assert_array_equal
+
+
+class TestMetrics:
+    def setup_method(self):
+        rng = np.random.default_rng(42)
+        self.scores = rng.permutation(100).astype(float)
+        self.labels = np.zeros(100, dtype=bool)
+        self.labels[rng.choice(100, 20, replace=False)] = True
+        scoresheet = BaseScoresheet(dict(enumerate(self.scores)))
+        relevant = set(np.flatnonzero(self.labels).tolist())
+        self.sheet = EvaluationSheet(scoresheet, relevant, universe=100)
+
+    def test_consistent_with_evaluation_sheet(self):
+        precision, recall = self.sheet.precision(), self.sheet.recall()
+        ranked_labels = np.diff(np.r_[0, self.sheet.tp]) == 1
+
+        assert average_precision(self.scores, self.labels) == pytest.approx(
+            precision[ranked_labels].mean()
+        )
+        # Area under the curve by the trapezoidal rule
+        fallout = self.sheet.fallout()
+        area = np.sum(np.diff(fallout) * (recall[1:] + recall[:-1]) / 2)
+        assert roc_auc(self.scores, self.labels) == pytest.approx(area)
+        ks = [1, 5, 50, 100]
+        assert_array_equal(
+            precision_at_k(self.scores, self.labels, ks), precision[np.subtract(ks, 1)]
+        )
+        assert_array_equal(
+            recall_at_k(self.scores, self.labels, ks), recall[np.subtract(ks, 1)]
+        )
+        num_relevant = self.labels.sum()
+        assert r_precision(self.scores, self.labels) == precision[num_relevant - 1]
+
+    def test_ties(self):
+        scores = [3, 2, 2, 2, 1]
+        labels = [False, True, False, False, True]
+        # Each of the tied items is relevant with probability 1/3
+        assert precision_at_k(scores, labels, 2) == pytest.approx(1 / 6)
+        assert r_precision(scores, labels) == pytest.approx(1 / 6)
+        # The relevant item ranks 2nd, 3rd or 4th; the other one is 5th
+        expected = np.mean([1 / 2, 1 / 3, 1 / 4]) / 2 + 2 / 5 / 2
+        assert average_precision(scores, labels) == pytest.approx(expected)
+        # The tied relevant item beats half of the two tied others
+        assert roc_auc(scores, labels) == pytest.approx(1 / 6)
+
+    def test_unscored(self):
+        scores, labels = [3, 2, 1], [True, False, True]
+        assert average_precision(scores, labels, num_relevant=4) == pytest.approx(
+            (1 + 2 / 3) / 4
+        )
+        assert recall_at_k(scores, labels, 3, num_relevant=4) == pytest.approx(0.5)
+        assert precision_at_k(scores, labels, 6) == pytest.approx(1 / 3)
+        # One unscored relevant item and two unscored others: the former
+        # loses against the scored item and ties with the unscored ones
+        auc = roc_auc(scores, labels, num_relevant=3, num_universe=6)
+        assert auc == pytest.approx((3 + 2 + 0.5 * 2) / 9)
+
+    def test_undefined(self):
+        with pytest.raises(UndefinedError):
+            average_precision([1, 2], [False, False])
+        with pytest.raises(UndefinedError):
+            roc_auc([1, 2], [True, True])
+        with pytest.raises(UndefinedError):
+            roc_auc([], [])
+        with pytest.raises(ValueError, match="same length"):
+            roc_auc([1, 2], [True])
+        with pytest.raises(ValueError, match="positive"):
+            precision_at_k([1, 2], [True, False], 0)
+
+
+def test_scores_and_labels():
+    relevant = {Pair("a", "b"), Pair("b", "c")}
+    scoresheet = BaseScoresheet(
+        {Pair("a", "b"): 1.0, Pair("a", "c"): 2.0, Pair("b", "c"): 0.5}
+    )
+    scores, labels = scores_and_labels(scoresheet, relevant)
+    assert dict(zip(scores.tolist(), labels.tolist())) == {
+        1.0: True,
+        2.0: False,
+        0.5: True,
+    }
+
+    scoresheet = ArrayScoresheet(["a", "b", "c"], [0, 0, 1], [1, 2, 2], [1, 2, 0.5])
+    del scoresheet[Pair("a", "c")]
+    scores, labels = scores_and_labels(scoresheet, relevant)
+    assert_array_equal(scores, [1, 0.5])
+    assert_array_equal(labels, [True, True])
@@ -2,8 +2,11 @@ import numpy as np
 import pytest
 
 from linkpred.evaluation import (
+    ArrayScoresheet,
     BaseScoresheet,
     EvaluationSheet,
+    Pair,
+    ProductScoresheet,
     Scoresheet,
     StaticEvaluation,
     UndefinedError,
@@ -140,6 +143,44 @@ class TestEvaluationSheet:
         sheet = EvaluationSheet(data)
         assert_array_equal(sheet.data, data)
 
+    def test_init_implicit_scoresheet(self):
+        scores = ProductScoresheet([1, 2, 3, 4], [4, 3, 2, 1])
+        sheet = EvaluationSheet(scores, relevant={Pair(1, 2), Pair(3, 4)}, universe=6)
+        expected = np.array(
+            [
+                [1, 1, 1, 1, 1, 2],
+                [0, 1, 2, 3, 4, 4],
+                [1, 1, 1, 1, 1, 0],
+                [4, 3, 2, 1, 0, 0],
+            ]
+        ).T
+        assert_array_equal(sheet.data, expected)
+
+    def test_init_array_scoresheet(self):
+        nodes = list(range(6))
+        rows, cols = [0, 0, 1, 2, 3, 4, 1], [1, 2, 3, 4, 5, 5, 5]
+        scores = [0.5, 0.9, 0.5, 0.1, 0.3, 0.5, 0.2]
+        array_sheet = ArrayScoresheet(nodes, rows, cols, scores)
+        del array_sheet[(1, 5)]
+        sheet = Scoresheet(array_sheet.items())
+        relevant = {Pair(0, 1), Pair(4, 5), Pair(2, 4), Pair(0, 5)}
+
+        # Same result as retrieving items one by one
+        for universe in (None, 15, [Pair(u, v) for u in nodes for v in nodes if u < v]):
+            static = StaticEvaluation(relevant=relevant, universe=universe)
+            expected = []
+            for pair, _ in array_sheet.ranked_items():
+                static.add_retrieved_item(pair)
+                expected.append(
+                    (static.num_tp, static.num_fp, static.num_fn, static.num_tn)
+                )
+            for data in (array_sheet, sheet):
+                found = EvaluationSheet(data, relevant=relevant, universe=universe)
+                assert_array_equal(found.data, np.array(expected))
+
+        with pytest.raises(ValueError):
+            EvaluationSheet(array_sheet, relevant=relevant, universe=6)
+
     def test_to_file_from_file(self):
         data = np.array([[1, 0, 0, 1], [1, 1, 0, 0]])
         sheet = EvaluationSheet(data)
@@ -149,6 +190,33 @@ class TestEvaluationSheet:
             newsheet = EvaluationSheet.from_file(fname)
             assert_array_equal(sheet.data, newsheet.data)
 
+    def test_compact(self):
+        sheet = EvaluationSheet(
+            self.scores, relevant=self.rel, universe=self.num_universe
+        )
+        assert sheet.compact
+        assert sheet.tp.dtype == sheet.fp.dtype == np.int32
+        assert sheet.num_relevant == len(self.rel)
+        assert sheet.num_universe == self.num_universe
+
+        with temp_file(".npz") as fname:
+            sheet.to_file(fname)
+            newsheet = EvaluationSheet.from_file(fname)
+        assert newsheet.compact
+        assert_array_equal(sheet.data, newsheet.data)
+
+        # Other file names get the text format
+        with temp_file(".txt") as fname:
+            sheet.to_file(fname)
+            assert_array_equal(np.loadtxt(fname), sheet.data)
+            newsheet = EvaluationSheet.from_file(fname)
+        assert not newsheet.compact
+        assert_array_equal(sheet.data, newsheet.data)
+
+        counts = EvaluationSheet.from_counts([1, 1, 2], [0, 1, 1], 3)
+        assert_array_equal(counts.fn, [2, 2, 1])
+        assert_array_equal(counts.tn, [-1, -1, -1])
+
     def test_measures(self):
         sheet_num_universe = EvaluationSheet(
             self.scores, relevant=self.rel, universe=self.num_universe
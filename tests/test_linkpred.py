@@ -8,7 +8,9 @@ import smokesignal
 
 import linkpred
 from linkpred.evaluation.listeners import (
+    AUCListener,
     CacheEvaluationListener,
+    CutoffListener,
     FMaxListener,
     FScorePlotter,
     RecallPrecisionPlotter,
@@ -180,6 +182,23 @@ class TestLinkpred:
             lp = linkpred.LinkPred(self.config_file(exclude="bla"))
             lp.excluded
 
+    def test_excluded_cached(self):
+        lp = linkpred.LinkPred(self.config_file(training=True, exclude="new"))
+        excluded = lp.excluded
+        assert lp.excluded is excluded
+        assert excluded.inverted
+
+        # Rebuilt for the preprocessed network
+        lp.preprocess()
+        assert lp.excluded is not excluded
+        assert lp.excluded.index.G is lp.training
+
+        # Shared with predictors
+        predictor = linkpred.predictors.CommonNeighbours(
+            lp.training, excluded=lp.excluded
+        )
+        assert predictor.exclusions() is lp.excluded
+
     def test_preprocess_only_training(self):
         lp = linkpred.LinkPred(self.config_file(training=True))
         lp.preprocess()
@@ -218,13 +237,27 @@ class TestLinkpred:
         assert lp.evaluator.params["universe"] == 2
         assert isinstance(lp.evaluator.params["universe"], int)
 
+    def test_setup_output_ranking_metrics(self):
+        for name, klass in (("auc", AUCListener), ("precision-at-k", CutoffListener)):
+            config = self.config_file(training=True, test=True, output=[name])
+            lp = linkpred.LinkPred(config)
+            lp.setup_output()
+            listener = lp.listeners[0]
+            assert isinstance(listener, klass)
+            # No evaluation sheets needed
+            assert lp.evaluator is None
+            assert len(listener.relevant) == 1
+            assert listener.num_universe == 2
+            smokesignal.clear_all()
+
     def test_predict_all(self):
         # Mock out linkpred.predictors
         class Stub:
-            def __init__(self, training, eligible, excluded):
+            def __init__(self, training, eligible, excluded, top_k=None):
                 self.training = training
                 self.eligible = eligible
                 self.excluded = excluded
+                self.top_k = top_k
 
             def predict(self, **params):
                 self.params = params
@@ -242,6 +275,65 @@ class TestLinkpred:
         results = list(lp.predict_all())
         assert results == [("A", "scoresheet"), ("B", "scoresheet")]
 
+    def test_predict_all_neighbour_batch(self):
+        config = self.config_file(training=True)
+        config["predictors"] = [
+            {"name": "Jaccard"},
+            {"name": "Katz"},
+            {"name": "CommonNeighbours", "parameters": {"method": "pairwise"}},
+            {"name": "Cosine", "parameters": {"weight": "weight"}},
+        ]
+        lp = linkpred.LinkPred(config)
+        lp.preprocess()
+        assert lp._neighbour_batches() == {(None, "pairwise"): [0, 2]}
+        results = list(lp.predict_all())
+        assert [name for name, _ in results] == [
+            "Jaccard",
+            "Katz",
+            "CommonNeighbours",
+            "Cosine",
+        ]
+        for name, scoresheet in results:
+            predictor = getattr(linkpred.predictors, name)(
+                lp.training, excluded=lp.excluded
+            )
+            assert scoresheet == predictor.predict()
+
+    def test_predict_all_neighbour_batch_other_parameters(self):
+        config = self.config_file(training=True)
+        fh = io.BytesIO(
+            b"*Vertices 4\n1 A\n2 B\n3 C\n4 D\n"
+            b"*Edges 4\n1 2 1\n1 3 4\n2 4 2\n3 4 3\n"
+        )
+        fh.name = "foo.net"
+        config["training-file"] = fh
+        config["predictors"] = [
+            {
+                "name": "CommonNeighbours",
+                "parameters": {"alpha": 0.5, "weight": "weight"},
+            },
+            {"name": "CommonNeighbours", "parameters": {"weight": "weight"}},
+            {"name": "Jaccard", "parameters": {"weight": "weight"}},
+            {"name": "Jaccard", "parameters": {"weight": "weight"}},
+        ]
+        lp = linkpred.LinkPred(config)
+        lp.preprocess()
+        assert lp._neighbour_batches() == {("weight", "pairwise"): [1, 2]}
+        results = list(lp.predict_all())
+        assert [name for name, _ in results] == [
+            "CommonNeighbours",
+            "CommonNeighbours",
+            "Jaccard",
+            "Jaccard",
+        ]
+        for profile, (name, scoresheet) in zip(config["predictors"], results):
+            predictor = getattr(linkpred.predictors, name)(
+                lp.training, excluded=lp.excluded
+            )
+            assert scoresheet
+            assert scoresheet == predictor.predict(**profile["parameters"])
+        assert results[0][1] != results[1][1]
+
     def test_process_predictions(self):
         @smokesignal.on("prediction_finished")
         def a(scoresheet, dataset, predictor):
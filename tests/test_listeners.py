@@ -5,8 +5,10 @@ import smokesignal
 
 from linkpred.evaluation import BaseScoresheet, EvaluationSheet
 from linkpred.evaluation.listeners import (
+    AUCListener,
     CacheEvaluationListener,
     CachePredictionListener,
+    CutoffListener,
     EvaluatingListener,
     _timestamped_filename,
 )
@@ -67,6 +69,30 @@ def test_CacheEvaluationListener():
     smokesignal.emit("evaluation_finished", ev, "d", "p")
 
     ev2 = EvaluationSheet.from_file(l.fname)
+    assert ev2.compact
     assert_array_equal(ev.data, ev2.data)
     smokesignal.clear_all()
     os.unlink(l.fname)
+
+
+def test_auc_listener():
+    scoresheet = BaseScoresheet({1: 10, 3: 5, 2: 2, 4: 1})
+    listener = AUCListener("test", relevant={1, 2}, universe=4)
+    smokesignal.emit("prediction_finished", scoresheet, "d", "p")
+
+    with open(listener.fname) as fh:
+        assert fh.read() == "d\tp\t0.7500\n"
+    smokesignal.clear_all()
+    os.unlink(listener.fname)
+
+
+def test_cutoff_listener():
+    scoresheet = BaseScoresheet({1: 10, 3: 5, 2: 2, 4: 1})
+    listener = CutoffListener("test", relevant={1, 2}, cutoffs=[1, 3])
+    smokesignal.emit("prediction_finished", scoresheet, "d", "p")
+
+    with open(listener.fname) as fh:
+        lines = fh.read().splitlines()
+    assert lines == ["d\tp\t1\t1.0000\t0.5000", "d\tp\t3\t0.6667\t1.0000"]
+    smokesignal.clear_all()
+    os.unlink(listener.fname)
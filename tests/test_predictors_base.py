@@ -1,7 +1,18 @@
 import networkx as nx
+import pytest
 
 from linkpred.evaluation import Pair
-from linkpred.predictors import CommonNeighbours, Copy, Predictor, all_predictors
+from linkpred.predictors import (
+    CommonNeighbours,
+    Copy,
+    DegreeProduct,
+    GraphDistance,
+    Jaccard,
+    Katz,
+    Predictor,
+    Random,
+    all_predictors,
+)
 
 
 def test_bipartite_common_neighbour():
@@ -37,6 +48,106 @@ def test_postprocessing():
             assert score == prediction_only_new_links[link]
 
 
+@pytest.mark.parametrize(
+    "predictor,params",
+    [
+        (CommonNeighbours, {}),
+        (CommonNeighbours, {"method": "sparse"}),
+        (Copy, {}),
+        (DegreeProduct, {}),
+        (GraphDistance, {}),
+        (GraphDistance, {"method": "csgraph"}),
+        (Katz, {"method": "solve"}),
+        (Random, {"seed": 1}),
+    ],
+)
+@pytest.mark.parametrize("rule", ["old", "new"])
+@pytest.mark.parametrize("top_k", [None, 10])
+def test_exclusion_rule(predictor, params, rule, top_k):
+    G = nx.karate_club_graph()
+    excluded = G.edges() if rule == "old" else list(nx.non_edges(G))
+    expected = predictor(G, excluded=excluded, top_k=top_k)(**params)
+    prediction = predictor(G, excluded=rule, top_k=top_k)(**params)
+    assert len(prediction) == len(expected)
+    assert sorted(prediction.values()) == sorted(expected.values())
+    for pair in prediction:
+        assert G.has_edge(*pair) == (rule == "new")
+
+
+def test_exclusion_rule_candidates():
+    G = nx.karate_club_graph()
+    for rule in ("old", "new"):
+        predictor = Predictor(G, excluded=rule)
+        for pair in predictor.likely_pairs():
+            assert predictor.is_excluded(*pair) is False
+            assert G.has_edge(*pair) == (rule == "new")
+    mask = Predictor(G, excluded="old").excluded_mask([0, 0, 1], [1, 9, 0])
+    assert mask.tolist() == [True, False, True]
+    mask = Predictor(G, excluded="new").excluded_mask([0, 0, 1], [1, 9, 0])
+    assert mask.tolist() == [False, True, False]
+
+
+@pytest.mark.parametrize(
+    "predictor,params",
+    [
+        (CommonNeighbours, {}),
+        (CommonNeighbours, {"method": "sparse"}),
+        (Jaccard, {}),
+        (Jaccard, {"method": "sparse"}),
+        (Katz, {}),
+    ],
+)
+@pytest.mark.parametrize("k", [1, 5, 10, 17, 5000])
+def test_top_k(predictor, params, k):
+    G = nx.karate_club_graph()
+    for excluded in (None, G.edges()):
+        expected = predictor(G, excluded=excluded)(**params)
+        prediction = predictor(G, excluded=excluded, top_k=k)(**params)
+        assert prediction == expected.top(k)
+        assert list(prediction.ranked_items()) == list(expected.ranked_items(k))
+        if excluded is not None:
+            assert not any(G.has_edge(*pair) for pair in prediction)
+
+
+def test_predict_for_fallback():
+    G = nx.karate_club_graph()
+    expected = Katz(G).predict()
+    found = Katz(G).predict_for([0, 33])
+    assert found == {
+        pair: score for pair, score in expected.items() if set(pair) & {0, 33}
+    }
+
+    found = Katz(G, excluded=G.edges()).score_pairs([(0, 1), (0, 9), (9, 0)])
+    assert found == {Pair(0, 9): expected[(0, 9)]}
+
+
+def test_likely_pairs():
+    G = nx.path_graph(5)
+    G.add_edge(1, 5)
+    pairs = list(Predictor(G).likely_pairs())
+    assert len(pairs) == len({Pair(p) for p in pairs})
+    assert {Pair(p) for p in pairs} == {
+        Pair(u, v)
+        for u in G
+        for v in nx.single_source_shortest_path_length(G, u, 2)
+        if u != v
+    }
+
+
+def test_likely_pairs_eligible():
+    B = nx.Graph()
+    B.add_nodes_from(range(1, 4), eligible=0)
+    B.add_nodes_from("abc", eligible=1)
+    B.add_edges_from([(1, "a"), (1, "b"), (2, "b"), (3, "c")])
+    pairs = Predictor(B, eligible="eligible").likely_pairs()
+    assert sorted(map(sorted, pairs)) == [["a", "b"]]
+
+
+def test_likely_pairs_directed():
+    G = nx.DiGraph([(1, 2), (2, 3)])
+    assert set(Predictor(G).likely_pairs()) == {(1, 2), (1, 3), (2, 3)}
+
+
 def test_all_predictors():
     predlist = all_predictors()
     assert len(predlist) > 0
@@ -1,5 +1,7 @@
 import networkx as nx
+import pytest
 
+from linkpred.evaluation import Pair, Scoresheet
 from linkpred.predictors.eigenvector import RootedPageRank, SimRank
 
 
@@ -25,6 +27,124 @@ class TestEigenvectorRuns:
         assert len(pred) == self.n * (self.n - 1) // 2
 
 
+class TestRootedPageRankMatrix:
+    def setup_method(self):
+        self.G = nx.gnm_random_graph(30, 50, seed=4)
+        for u, v, d in self.G.edges(data=True):
+            d["weight"] = (u * v) % 4 + 1
+        # Dangling node
+        self.G.add_node(30)
+
+    @pytest.mark.parametrize("weight", ["weight", None])
+    @pytest.mark.parametrize("beta", [0, 0.05])
+    def test_same_as_networkx(self, weight, beta):
+        expected = RootedPageRank(self.G).predict(beta=beta, weight=weight)
+        for block_size in (None, 7):
+            pred = RootedPageRank(self.G).predict(
+                beta=beta, weight=weight, method="matrix", block_size=block_size
+            )
+            assert pred == pytest.approx(expected, abs=1e-4)
+
+    def test_directed(self):
+        G = nx.gnm_random_graph(20, 50, seed=5, directed=True)
+        expected = RootedPageRank(G).predict(alpha=0.7)
+        pred = RootedPageRank(G).predict(alpha=0.7, method="matrix")
+        assert pred == pytest.approx(expected, abs=1e-4)
+
+    def test_nbunch_eligible(self):
+        for v in self.G:
+            self.G.nodes[v]["eligible"] = v % 4 > 0
+        nbunch = range(0, 30, 3)
+        expected = RootedPageRank(self.G, eligible="eligible").predict(nbunch)
+        pred = RootedPageRank(self.G, eligible="eligible").predict(
+            nbunch, method="matrix"
+        )
+        assert pred == pytest.approx(expected, abs=1e-4)
+
+    def test_push(self):
+        expected = RootedPageRank(self.G).predict()
+        predictor = RootedPageRank(self.G)
+        pred = predictor.predict(method="push", epsilon=1e-5)
+        error = predictor.approximation_error
+        assert 0 < error < 0.01
+        for pair, score in expected.items():
+            # Estimates are too low, by at most the error for each root
+            assert score - 2 * error - 1e-4 <= pred[pair] <= score + 1e-4
+
+    def test_errors(self):
+        with pytest.raises(ValueError):
+            RootedPageRank(self.G).predict(k=1, method="matrix")
+        with pytest.raises(ValueError):
+            RootedPageRank(self.G).predict(beta=0.1, method="push")
+        with pytest.raises(ValueError):
+            RootedPageRank(self.G).predict(method="foo")
+
+
+class TestSimRankVariants:
+    def setup_method(self):
+        self.G = nx.gnm_random_graph(30, 60, seed=7)
+
+    def test_sparse(self):
+        expected = nx.simrank_similarity(
+            self.G, importance_factor=0.8, max_iterations=1000, tolerance=1e-8
+        )
+        pred = SimRank(self.G).predict(
+            method="sparse", threshold=None, num_iterations=50
+        )
+        scores = {frozenset(pair): score for pair, score in pred.items()}
+        for u, v in nx.non_edges(self.G):
+            assert scores.get(frozenset((u, v)), 0) == pytest.approx(
+                expected[u][v], abs=1e-4
+            )
+
+        pruned = SimRank(self.G).predict(method="sparse", threshold=0.1)
+        assert len(pruned) < len(pred)
+        assert min(pruned.values()) >= 0.1
+
+    def test_dense_regular(self):
+        # On regular graphs, dense SimRank follows the usual definition
+        G = nx.random_regular_graph(3, 20, seed=8)
+        dense = SimRank(G).predict()
+        sparse = SimRank(G).predict(method="sparse", threshold=None)
+        assert sparse == pytest.approx(dense)
+
+    def test_montecarlo(self):
+        pred = SimRank(self.G).predict(method="montecarlo", num_walks=1000, seed=1)
+        exact = SimRank(self.G).predict(method="sparse", threshold=None)
+        assert set(pred) <= set(exact)
+        for pair, score in exact.items():
+            assert pred.get(pair, 0) == pytest.approx(score, abs=0.05)
+        again = SimRank(self.G).predict(method="montecarlo", num_walks=1000, seed=1)
+        assert pred == again
+
+    @pytest.mark.parametrize(
+        ("method", "params"),
+        [("sparse", {"threshold": 1e-3}), ("montecarlo", {"seed": 2})],
+    )
+    def test_queries(self, method, params):
+        for v in self.G:
+            self.G.nodes[v]["eligible"] = v % 5 > 0
+        predictor = SimRank(self.G, eligible="eligible")
+        full = predictor.predict(method=method, **params)
+
+        local = predictor.predict_for([1, 2, 4], method=method, **params)
+        expected = {
+            pair: score for pair, score in full.items() if {1, 2, 4} & set(pair)
+        }
+        assert local == pytest.approx(Scoresheet(expected))
+
+        pairs = [(1, 2), (3, 0), (6, 8), (9, 11)]
+        scores = predictor.score_pairs(pairs, method=method, **params)
+        expected = {
+            pair: full[pair] for pair in [(1, 2), (6, 8), (9, 11)] if Pair(pair) in full
+        }
+        assert scores == pytest.approx(Scoresheet(expected))
+
+    def test_unknown_method(self):
+        with pytest.raises(ValueError):
+            SimRank(self.G).predict(method="foo")
+
+
 class TestEigenVector:
     def test_rooted_pagerank(self):
         pass
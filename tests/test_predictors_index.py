@@ -0,0 +1,119 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from linkpred.predictors.index import ExcludedPairs, GraphIndex
+
+from .utils import assert_array_equal
+
+
+def test_graph_index():
+    G = nx.Graph()
+    G.add_weighted_edges_from([("a", "b", 2), ("b", "c", 3)])
+    index = GraphIndex(G)
+    assert len(index) == 3
+    assert index.nodes == ["a", "b", "c"]
+    assert index.index == {"a": 0, "b": 1, "c": 2}
+
+    assert_array_equal(index.adjacency().toarray(), [[0, 1, 0], [1, 0, 1], [0, 1, 0]])
+    assert_array_equal(
+        index.adjacency("weight").toarray(), [[0, 2, 0], [2, 0, 3], [0, 3, 0]]
+    )
+    assert index.adjacency() is index.adjacency()
+
+
+def test_graph_index_for_graph():
+    G = nx.path_graph(4)
+    index = GraphIndex.for_graph(G)
+    assert GraphIndex.for_graph(G) is index
+
+    G.add_edge(0, 3)
+    new_index = GraphIndex.for_graph(G)
+    assert new_index is not index
+    assert new_index.adjacency()[0, 3] == 1
+
+    # Swapping one edge for another keeps the numbers of nodes and edges
+    index = new_index
+    G.remove_edge(0, 3)
+    G.add_edge(0, 2)
+    new_index = GraphIndex.for_graph(G)
+    assert new_index is not index
+    assert new_index.adjacency()[0, 2] == 1
+
+
+def test_graph_index_for_graph_weights():
+    G = nx.Graph()
+    G.add_weighted_edges_from([("a", "b", 2), ("b", "c", 3)])
+    index = GraphIndex.for_graph(G)
+    assert index.neighbourhood_size_map("weight", power=1)["a"] == 2
+
+    # Unweighted data are still valid, weighted data are not
+    G["a"]["b"]["weight"] = 5
+    index.adjacency()
+    assert GraphIndex.for_graph(G) is not index
+    new_index = GraphIndex.for_graph(G)
+    assert new_index.neighbourhood_size_map("weight", power=1)["a"] == 5
+    assert new_index.google_matrix("weight") is not index.google_matrix("weight")
+
+
+def test_neighbourhood_sizes():
+    G = nx.Graph()
+    G.add_weighted_edges_from([("a", "b", 2), ("b", "c", 3)])
+    index = GraphIndex(G)
+
+    assert_array_equal(index.neighbourhood_sizes(), [1, 2, 1])
+    assert_array_equal(index.neighbourhood_sizes("weight"), [4, 13, 9])
+    assert_array_equal(index.neighbourhood_sizes("weight", power=1), [2, 5, 3])
+    assert index.neighbourhood_size_map("weight") == {"a": 4, "b": 13, "c": 9}
+
+
+def test_google_matrix():
+    G = nx.DiGraph([(0, 1), (0, 2), (1, 2)])
+    index = GraphIndex(G)
+    M = index.google_matrix()
+    assert M is index.google_matrix()
+    assert M.toarray() == pytest.approx(
+        np.array([[0, 0.5, 0.5], [0, 0, 1], [1 / 3, 1 / 3, 1 / 3]])
+    )
+    reversed_ = index.google_matrix(reverse=True)
+    assert reversed_.toarray() == pytest.approx(
+        np.array([[1 / 3, 1 / 3, 1 / 3], [1, 0, 0], [0.5, 0.5, 0]])
+    )
+
+
+def test_excluded_pairs():
+    G = nx.path_graph(4)
+    G.add_edge(2, 2)
+    index = GraphIndex(G)
+    old = ExcludedPairs.from_rule(index, "old")
+    new = ExcludedPairs.from_rule(index, "new")
+    links = {(0, 1), (1, 2), (2, 3)}
+    non_links = {(0, 2), (0, 3), (1, 3)}
+
+    assert len(old) == len(new) == 3
+    assert {tuple(sorted(pair)) for pair in old} == links
+    assert {tuple(sorted(pair)) for pair in new} == non_links
+    for u, v in links:
+        assert (v, u) in old
+        assert (v, u) not in new
+    assert (2, 2) not in old
+    assert ("x", 0) not in old
+    assert ("x", 0) not in new
+    assert_array_equal(old.mask([0, 3, 2], [1, 0, 1]), [True, False, True])
+    assert_array_equal(new.mask([0, 3, 2], [1, 0, 1]), [False, True, False])
+
+    pairs = ExcludedPairs.from_pairs(index, [(1, 0), (0, 1), (3, "x"), (2, 2)])
+    assert set(pairs) == {(0, 1)}
+    assert len(ExcludedPairs.from_rule(index, None)) == 0
+    with pytest.raises(ValueError):
+        ExcludedPairs.from_rule(index, "bla")
+
+    # Same network, with nodes in a different order
+    H = nx.Graph()
+    H.add_nodes_from([3, 2, 1, 0])
+    H.add_edges_from(G.edges())
+    other = GraphIndex(H)
+    renumbered = new.for_index(other)
+    assert new.for_index(index) is new
+    assert renumbered.index is other
+    assert {tuple(sorted(pair)) for pair in renumbered} == non_links
@@ -1,6 +1,9 @@
+import itertools
+
 import networkx as nx
+import pytest
 
-from linkpred.evaluation import Pair
+from linkpred.evaluation import Pair, Scoresheet
 from linkpred.predictors.misc import Community, Copy, Random
 
 
@@ -24,6 +27,25 @@ def test_community():
     assert len(prediction) <= 190
 
 
+def test_community_scores(monkeypatch):
+    community = pytest.importorskip("community")
+    G = nx.karate_club_graph()
+    dendrogram = community.generate_dendrogram(G, random_state=1)
+    monkeypatch.setattr(community, "generate_dendrogram", lambda _: dendrogram)
+
+    expected = Scoresheet()
+    for i in range(len(dendrogram)):
+        partition = community.partition_at_level(dendrogram, i)
+        for u, v in itertools.combinations(G, 2):
+            if partition[u] == partition[v]:
+                expected[(u, v)] += len(dendrogram) - i
+
+    prediction = Community(G).predict()
+    assert dict(prediction.items()) == expected
+    top = Community(G, top_k=10).predict()
+    assert sorted(top.values()) == sorted(expected.values())[-10:]
+
+
 def test_community_exclude_noneligible():
     G = nx.erdos_renyi_graph(20, 0.1)
     G.add_nodes_from(range(10), eligible=True)
@@ -53,3 +75,46 @@ def test_random_exclude_noneligible():
         for j in range(5):
             if i != j:
                 assert Pair(i, j) in prediction
+
+
+def test_random_seed():
+    G = nx.karate_club_graph()
+    prediction = Random(G).predict(seed=1)
+    assert dict(prediction.items()) == dict(Random(G).predict(seed=1).items())
+    assert dict(prediction.items()) != dict(Random(G).predict(seed=2).items())
+    assert all(0 <= score < 1 for score in prediction.values())
+
+
+def test_random_excluded_top_k():
+    G = nx.karate_club_graph()
+    expected = Random(G, excluded=G.edges()).predict(seed=1)
+    assert len(expected) == 34 * 33 / 2 - 78
+    prediction = Random(G, excluded=G.edges(), top_k=10).predict(seed=1)
+    assert prediction == dict(expected.ranked_items(10))
+
+
+def test_random_sample():
+    G = nx.karate_club_graph()
+    prediction = Random(G, excluded=G.edges()).predict(sample=100, seed=1)
+    assert len(prediction) == 100
+    assert not any(G.has_edge(*pair) for pair in prediction)
+    assert prediction == Random(G, excluded=G.edges()).predict(sample=100, seed=1)
+
+    # Sample larger than the number of pairs
+    prediction = Random(G, excluded=G.edges()).predict(sample=1000)
+    assert len(prediction) == 34 * 33 / 2 - 78
+
+    # Only linked pairs are left
+    prediction = Random(G, excluded="new").predict(sample=50, seed=1)
+    assert len(prediction) == 50
+    assert all(G.has_edge(*pair) for pair in prediction)
+    prediction = Random(G, excluded="new").predict(sample=100)
+    assert len(prediction) == 78
+
+
+def test_random_sample_eligible():
+    G = nx.Graph()
+    G.add_nodes_from(range(5), eligible=True)
+    G.add_nodes_from(range(5, 10), eligible=False)
+    prediction = Random(G, eligible="eligible").predict(sample=10)
+    assert set(prediction) == {Pair(i, j) for i in range(5) for j in range(i)}
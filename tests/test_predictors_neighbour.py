@@ -181,3 +181,166 @@ class TestWeighted:
         known = {(1, 5): 1 / 3, (2, 3): 77 / 130, (1, 4): 17 / 30, (4, 5): 1 / 15}
         found = nbr.ResourceAllocation(self.G).predict(weight="weight")
         assert found == pytest.approx(Scoresheet(known))
+
+
+def test_degree_product_top_k():
+    G = nx.gnm_random_graph(100, 300, seed=4)
+    expected = nbr.DegreeProduct(G, excluded=G.edges()).predict()
+    assert len(expected) == 100 * 99 / 2 - 300
+    found = nbr.DegreeProduct(G, excluded=G.edges(), top_k=20).predict()
+    assert found == dict(expected.ranked_items(20))
+    assert not any(G.has_edge(*pair) for pair in found)
+
+
+SPARSE_PREDICTORS = [
+    nbr.AdamicAdar,
+    nbr.AssociationStrength,
+    nbr.CommonNeighbours,
+    nbr.Cosine,
+    nbr.Jaccard,
+    nbr.MaxOverlap,
+    nbr.MinOverlap,
+    nbr.NMeasure,
+    nbr.Pearson,
+    nbr.ResourceAllocation,
+]
+
+
+def random_graph():
+    """Random weighted graph shared by the tests of vectorized predictors"""
+    G = nx.gnm_random_graph(40, 120, seed=1)
+    for i, (u, v) in enumerate(G.edges()):
+        G[u][v]["weight"] = i % 5 + 1
+    return G
+
+
+def random_digraph():
+    G = nx.gnm_random_graph(30, 90, seed=2, directed=True)
+    nx.add_cycle(G, range(30))  # No nodes without successors
+    return G
+
+
+class TestSparse:
+    def setup_method(self):
+        self.G = random_graph()
+
+    @pytest.mark.parametrize("predictor", SPARSE_PREDICTORS)
+    @pytest.mark.parametrize("weight", [None, "weight"])
+    def test_same_as_pairwise(self, predictor, weight):
+        expected = predictor(self.G).predict(weight=weight)
+        found = predictor(self.G).predict(weight=weight, method="sparse")
+        assert found == pytest.approx(expected)
+
+    def test_same_ranking_as_pairwise(self):
+        # Integer scores with many ties, on nodes that are not in sorted order
+        G = nx.relabel_nodes(self.G, {v: (v * 7) % 40 for v in self.G})
+        expected = nbr.CommonNeighbours(G).predict()
+        found = nbr.CommonNeighbours(G).predict(method="sparse")
+        assert list(found.ranked_items()) == list(expected.ranked_items())
+
+    # Pairwise Adamic/Adar fails on common successors with one successor
+    @pytest.mark.parametrize("predictor", SPARSE_PREDICTORS[1:])
+    def test_directed(self, predictor):
+        G = random_digraph()
+        expected = predictor(G).predict()
+        assert predictor(G).predict(method="sparse") == pytest.approx(expected)
+
+    def test_common_neighbours_alpha(self):
+        expected = nbr.CommonNeighbours(self.G).predict(alpha=0.5, weight="weight")
+        found = nbr.CommonNeighbours(self.G).predict(
+            alpha=0.5, weight="weight", method="sparse"
+        )
+        assert found == pytest.approx(expected)
+
+    def test_bipartite(self):
+        B = nx.bipartite.random_graph(20, 30, 0.2, seed=3)
+        expected = nbr.Jaccard(B, eligible="bipartite").predict()
+        found = nbr.Jaccard(B, eligible="bipartite").predict(method="sparse")
+        assert found == pytest.approx(expected)
+
+    def test_unknown_method(self):
+        with pytest.raises(ValueError):
+            nbr.Cosine(self.G).predict(method="foo")
+
+
+class TestNeighbourMeasures:
+    def setup_method(self):
+        self.G = random_graph()
+
+    @pytest.mark.parametrize("method", ["pairwise", "sparse"])
+    @pytest.mark.parametrize("weight", [None, "weight"])
+    def test_same_as_predictors(self, method, weight):
+        found = nbr.predict_neighbour_measures(
+            self.G, nbr.neighbour_measures, weight=weight, method=method
+        )
+        assert set(found) == set(nbr.neighbour_measures)
+        for name, scoresheet in found.items():
+            expected = getattr(nbr, name)(self.G).predict(weight=weight)
+            assert scoresheet == pytest.approx(expected)
+
+    @pytest.mark.parametrize("method", ["pairwise", "sparse"])
+    def test_directed(self, method):
+        G = random_digraph()
+        found = nbr.predict_neighbour_measures(G, ["Cosine", "Jaccard"], method=method)
+        for name, scoresheet in found.items():
+            assert scoresheet == pytest.approx(getattr(nbr, name)(G).predict())
+
+    def test_excluded(self):
+        excluded = self.G.edges()
+        found = nbr.predict_neighbour_measures(
+            self.G, ["CommonNeighbours"], excluded=excluded
+        )
+        expected = nbr.CommonNeighbours(self.G, excluded=excluded).predict()
+        assert found["CommonNeighbours"] == pytest.approx(expected)
+
+    def test_unknown_measure(self):
+        with pytest.raises(ValueError):
+            nbr.predict_neighbour_measures(self.G, ["DegreeProduct"])
+
+
+class TestLocalQueries:
+    def setup_method(self):
+        self.G = random_graph()
+
+    @pytest.mark.parametrize("name", nbr.neighbour_measures)
+    @pytest.mark.parametrize("weight", [None, "weight"])
+    def test_predict_for(self, name, weight):
+        predictor = getattr(nbr, name)(self.G)
+        nodes = {0, 1, 7}
+        expected = {
+            pair: score
+            for pair, score in predictor.predict(weight=weight).items()
+            if set(pair) & nodes
+        }
+        found = predictor.predict_for(nodes, weight=weight)
+        assert found == pytest.approx(Scoresheet(expected))
+
+    @pytest.mark.parametrize("name", nbr.neighbour_measures)
+    def test_score_pairs(self, name):
+        predictor = getattr(nbr, name)(self.G)
+        expected = predictor.predict()
+        pairs = [*list(expected)[::10], (0, 1), (1, 0)]
+        found = predictor.score_pairs(pairs)
+        for pair in pairs:
+            assert found[pair] == pytest.approx(expected[pair])
+
+    def test_directed(self):
+        G = random_digraph()
+        predictor = nbr.Cosine(G)
+        expected = {
+            pair: score for pair, score in predictor.predict().items() if 3 in pair
+        }
+        assert predictor.predict_for([3]) == pytest.approx(Scoresheet(expected))
+
+    def test_bipartite(self):
+        B = nx.bipartite.random_graph(20, 30, 0.2, seed=3)
+        predictor = nbr.Jaccard(B, eligible="bipartite")
+        expected = {
+            pair: score for pair, score in predictor.predict().items() if 25 in pair
+        }
+        found = predictor.predict_for([25, 3])
+        assert found == pytest.approx(Scoresheet(expected))
+
+    def test_excluded(self):
+        predictor = nbr.CommonNeighbours(self.G, excluded=self.G.edges())
+        assert not any(self.G.has_edge(*pair) for pair in predictor.predict_for([0]))
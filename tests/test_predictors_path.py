@@ -2,7 +2,7 @@ import networkx as nx
 import numpy as np
 import pytest
 
-from linkpred.evaluation import Scoresheet
+from linkpred.evaluation import Pair, Scoresheet
 from linkpred.predictors.path import GraphDistance, Katz
 
 
@@ -29,6 +29,74 @@ def test_katz():
             assert K[i, j] == pytest.approx(katz[(u, v)], abs=1e-5)
 
 
+@pytest.mark.parametrize("directed", [False, True])
+def test_katz_solve(directed):
+    G = nx.gnm_random_graph(30, 60, seed=1, directed=directed)
+    beta = 0.05
+    nodes = list(G.nodes())
+    M = nx.to_numpy_array(G, nodelist=nodes)
+    K = np.linalg.inv(np.identity(30) - beta * M) - np.identity(30)
+    if directed:
+        K = K + K.T
+
+    katz = Katz(G).predict(beta=beta, method="solve")
+    assert len(katz) == np.count_nonzero(np.triu(K, k=1))
+    for (u, v), score in katz.items():
+        assert score == pytest.approx(K[nodes.index(u), nodes.index(v)])
+
+    # The series converges to the same result
+    series = Katz(G).predict(beta=beta, max_power=30)
+    assert series == pytest.approx(katz)
+
+
+def test_katz_directed():
+    G = nx.DiGraph([(0, 1), (1, 2), (2, 0), (2, 3)])
+    katz = Katz(G).predict(beta=0.1, max_power=2)
+    # Walks 0 -> 1 and 1 -> 2 -> 0
+    assert katz[(0, 1)] == pytest.approx(0.1 + 0.01)
+    assert katz[(1, 3)] == pytest.approx(0.01)
+
+
+def test_katz_pruned():
+    G = nx.gnm_random_graph(50, 150, seed=3)
+    beta = 0.05
+
+    katz = Katz(G)
+    full = katz.predict(beta=beta)
+    assert katz.approximation_error == 0
+    assert katz.predict(beta=beta, threshold=0) == pytest.approx(full)
+    assert katz.approximation_error == pytest.approx(0)
+
+    katz = Katz(G)
+    pruned = katz.predict(beta=beta, threshold=1e-4)
+    A = nx.to_numpy_array(G)
+    power, error = np.identity(50), 0
+    for k in range(1, 6):
+        power = power @ A
+        power[beta**k * power < 1e-4] = 0
+        error += beta**k * (np.linalg.matrix_power(A, k).sum() - power.sum())
+    assert katz.approximation_error == pytest.approx(error)
+    assert len(pruned) < len(full)
+
+    katz = Katz(G)
+    pruned = katz.predict(beta=beta, max_entries=3)
+    assert katz.approximation_error > 0
+    assert len(pruned) < len(full)
+    assert all(score <= full[pair] + 1e-12 for pair, score in pruned.items())
+
+    # Not pruning again resets the error of the previous call
+    assert katz.predict(beta=beta) == pytest.approx(full)
+    assert katz.approximation_error == 0
+    katz.predict(beta=beta, max_entries=3)
+    katz.predict(beta=beta, method="solve")
+    assert katz.approximation_error == 0
+
+
+def test_katz_unknown_method():
+    with pytest.raises(ValueError):
+        Katz(nx.path_graph(3)).predict(method="foo")
+
+
 class TestGraphDistance:
     def setup_method(self):
         self.G = nx.Graph()
@@ -36,7 +104,8 @@ class TestGraphDistance:
             [(0, 1, 1), (0, 2, 3), (1, 2, 1), (1, 3, 2), (2, 4, 1)]
         )
 
-    def test_unweighted(self):
+    @pytest.mark.parametrize("method", ["networkx", "csgraph"])
+    def test_unweighted(self, method):
         known = {
             (0, 1): 1,
             (0, 2): 1,
@@ -50,13 +119,14 @@ class TestGraphDistance:
             (3, 4): 1 / 3,
         }
         known = Scoresheet(known)
-        graph_distance = GraphDistance(self.G).predict(weight=None)
+        graph_distance = GraphDistance(self.G).predict(weight=None, method=method)
         assert graph_distance == pytest.approx(known)
 
-        graph_distance = GraphDistance(self.G).predict(alpha=0)
+        graph_distance = GraphDistance(self.G).predict(alpha=0, method=method)
         assert graph_distance == pytest.approx(known)
 
-    def test_weighted(self):
+    @pytest.mark.parametrize("method", ["networkx", "csgraph"])
+    def test_weighted(self, method):
         known = {
             (0, 1): 1,
             (0, 2): 3,
@@ -70,10 +140,11 @@ class TestGraphDistance:
             (3, 4): 0.4,
         }
         known = Scoresheet(known)
-        graph_distance = GraphDistance(self.G).predict()
+        graph_distance = GraphDistance(self.G).predict(method=method)
         assert graph_distance == pytest.approx(known)
 
-    def test_weighted_alpha(self):
+    @pytest.mark.parametrize("method", ["networkx", "csgraph"])
+    def test_weighted_alpha(self, method):
         from math import sqrt
 
         known = {
@@ -89,5 +160,78 @@ class TestGraphDistance:
             (3, 4): 1 / (2 + 1 / sqrt(2)),
         }
         known = Scoresheet(known)
-        graph_distance = GraphDistance(self.G).predict(alpha=0.5)
+        graph_distance = GraphDistance(self.G).predict(alpha=0.5, method=method)
         assert graph_distance == pytest.approx(known)
+
+    @pytest.mark.parametrize("method", ["networkx", "csgraph"])
+    def test_radius(self, method):
+        graph_distance = GraphDistance(self.G).predict(radius=1.5, method=method)
+        known = {(0, 1): 1, (1, 2): 1, (2, 4): 1, (0, 4): 0.75, (0, 3): 2 / 3}
+        known.update({(2, 3): 2 / 3, (0, 2): 3, (1, 3): 2})
+        assert graph_distance == pytest.approx(Scoresheet(known))
+
+        graph_distance = GraphDistance(self.G).predict(
+            weight=None, radius=1, method=method
+        )
+        assert set(graph_distance) == {Pair(u, v) for u, v in self.G.edges()}
+
+    def test_radius_fractional(self):
+        G = nx.gnm_random_graph(40, 60, seed=2)
+        for u, v, d in G.edges(data=True):
+            d["weight"] = (u + v) % 5 + 1
+        for weight in (None, "weight"):
+            expected = GraphDistance(G).predict(weight=weight, radius=2.5)
+            graph_distance = GraphDistance(G).predict(
+                weight=weight, radius=2.5, method="csgraph"
+            )
+            assert graph_distance == pytest.approx(expected)
+            assert min(expected.values()) >= 1 / 2.5
+
+    def test_csgraph_blocks(self):
+        G = nx.gnm_random_graph(40, 60, seed=2)
+        for u, v, d in G.edges(data=True):
+            d["weight"] = (u + v) % 5 + 1
+        for v in G:
+            G.nodes[v]["eligible"] = v % 3 > 0
+
+        expected = GraphDistance(G, eligible="eligible").predict(alpha=0.5)
+        for block_size in (None, 1, 7):
+            graph_distance = GraphDistance(G, eligible="eligible").predict(
+                alpha=0.5, method="csgraph", block_size=block_size
+            )
+            assert graph_distance == pytest.approx(expected)
+
+        excluded = [(u, v) for u, v in G.edges() if u % 3 and v % 3]
+        graph_distance = GraphDistance(
+            G, eligible="eligible", excluded=excluded, top_k=10
+        ).predict(alpha=0.5, method="csgraph", block_size=4)
+        for pair in excluded:
+            del expected[pair]
+        assert sorted(graph_distance.values()) == pytest.approx(
+            sorted(expected.values())[-10:]
+        )
+
+    def test_csgraph_directed(self):
+        G = nx.DiGraph([(0, 1), (1, 2), (3, 2)])
+        graph_distance = GraphDistance(G).predict(weight=None, method="csgraph")
+        known = {(0, 1): 1, (1, 2): 1, (2, 3): 1, (0, 2): 0.5}
+        assert graph_distance == pytest.approx(Scoresheet(known))
+
+        # As with networkx, the path from the later node 2 to 0 counts
+        G = nx.DiGraph([(0, 2), (2, 1), (1, 0)])
+        graph_distance = GraphDistance(G).predict(weight=None, method="csgraph")
+        assert graph_distance[(0, 2)] == pytest.approx(0.5)
+
+        G = nx.gnm_random_graph(30, 70, seed=3, directed=True)
+        for u, v, d in G.edges(data=True):
+            d["weight"] = (u * v) % 4 + 1
+        for kwargs in ({"weight": None}, {"alpha": 0.5}, {"radius": 1.5}):
+            expected = GraphDistance(G).predict(**kwargs)
+            graph_distance = GraphDistance(G).predict(
+                method="csgraph", block_size=7, **kwargs
+            )
+            assert graph_distance == pytest.approx(expected)
+
+    def test_unknown_method(self):
+        with pytest.raises(ValueError):
+            GraphDistance(self.G).predict(method="foo")
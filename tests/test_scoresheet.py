@@ -1,7 +1,20 @@
+import itertools
+import pickle
+
 import networkx as nx
+import numpy as np
 import pytest
 
-from linkpred.evaluation.scoresheet import BaseScoresheet, Pair, Scoresheet
+from linkpred.evaluation.scoresheet import (
+    ArrayScoresheet,
+    BaseScoresheet,
+    BoundedScoresheet,
+    CommunityScoresheet,
+    Pair,
+    ProductScoresheet,
+    RandomScoresheet,
+    Scoresheet,
+)
 
 from .utils import temp_file
 
@@ -84,6 +97,17 @@ def test_pair():
     assert str(pair) == "\xc4\x87 - a"
 
 
+def test_pair_compact():
+    pair = Pair("a", "b")
+    assert not hasattr(pair, "__dict__")
+    assert pair.elements == ("b", "a")
+    assert list(pair) == ["b", "a"]
+    assert len(pair) == 2
+    assert pair[1] == "a"
+    assert hash(pair) == hash(Pair(pair)) == hash(("b", "a"))
+    assert pickle.loads(pickle.dumps(pair)) == pair
+
+
 def test_pair_identical_elements():
     with pytest.raises(AssertionError):
         Pair("a", "a")
@@ -104,6 +128,11 @@ def test_scoresheet():
     del sheet[t]
     assert len(sheet) == 0
 
+    pair = Pair("b", "a")
+    sheet[pair] = 3
+    assert next(iter(sheet)) is pair
+    assert sheet[pair] == sheet[t] == 3.0
+
 
 def test_scoresheet_process_data():
     t = ("a", "b")
@@ -112,6 +141,200 @@ def test_scoresheet_process_data():
     G.add_edge(*t, weight=5)
     s = [(t, 5)]
 
-    for x in (d, G, s):
+    for x in (d, G, s, Scoresheet(d)):
         sheet = Scoresheet(x)
         assert sheet[t] == 5.0
+
+
+@pytest.mark.parametrize(
+    "implicit",
+    [
+        ArrayScoresheet(["a", "b", "c"], [0, 1], [1, 2], [0.5, 0.9]),
+        ProductScoresheet(["a", "b", "c"], [1, 3, 2]),
+        RandomScoresheet(["a", "b", "c"], key=1),
+        CommunityScoresheet(["a", "b", "c"], [[0, 0, 1]]),
+    ],
+)
+def test_scoresheet_from_implicit(implicit):
+    expected = dict(implicit.items())
+    assert Scoresheet(implicit) == expected
+    assert BoundedScoresheet(len(implicit), implicit) == expected
+    bounded = BoundedScoresheet(1, implicit)
+    assert list(bounded.ranked_items()) == list(implicit.ranked_items(1))
+
+
+def test_scoresheet_ranking_ties():
+    data = {
+        (1, 2): 1,
+        (3, 1): 2,
+        (4, 2): 1,
+        (2, 3): 2,
+        (1, 4): 1,
+        (4, 3): 0,
+    }
+    sheet = Scoresheet(data)
+    # Ties are broken by the (sorted) pair, in decreasing order
+    expected = [
+        (Pair(3, 2), 2.0),
+        (Pair(3, 1), 2.0),
+        (Pair(4, 2), 1.0),
+        (Pair(4, 1), 1.0),
+        (Pair(2, 1), 1.0),
+        (Pair(4, 3), 0.0),
+    ]
+    for n in range(1, len(data) + 1):
+        assert list(sheet.ranked_items(n)) == expected[:n]
+        assert sheet.top(n) == dict(expected[:n])
+    assert list(sheet.ranked_items()) == expected
+
+    # The cached ranking is reset when the scoresheet changes
+    sheet[(4, 3)] += 3
+    assert sheet.top(1) == {Pair(4, 3): 3.0}
+    del sheet[(4, 3)]
+    assert list(sheet.ranked_items()) == expected[:-1]
+    sheet.update({Pair(4, 3): 5.0})
+    assert next(sheet.ranked_items()) == (Pair(4, 3), 5.0)
+    sheet.pop(Pair(4, 3))
+    assert list(sheet.ranked_items()) == expected[:-1]
+
+
+def test_bounded_scoresheet():
+    data = {("a", "b"): 3, ("a", "c"): 1, ("b", "c"): 4, ("c", "d"): 2}
+    sheet = BoundedScoresheet(2, data)
+    assert len(sheet) == 2
+    assert sheet.top() == Scoresheet(data).top(2)
+    assert sheet[("a", "c")] == 0.0
+    assert len(sheet) == 2
+
+    sheet[("d", "e")] = 5
+    assert list(sheet.ranked_items()) == [(Pair("d", "e"), 5.0), (Pair("b", "c"), 4.0)]
+    sheet[("d", "e")] = 0
+    sheet[("a", "e")] = 3.5
+    assert list(sheet.ranked_items()) == [(Pair("b", "c"), 4.0), (Pair("a", "e"), 3.5)]
+
+
+def test_bounded_scoresheet_excluded():
+    data = {("a", "b"): 3, ("a", "c"): 1, ("b", "c"): 4}
+    sheet = BoundedScoresheet(2, data, excluded={Pair("b", "c")})
+    assert list(sheet.ranked_items()) == [(Pair("a", "b"), 3.0), (Pair("a", "c"), 1.0)]
+
+
+def test_product_scoresheet():
+    nodes = ["a", "b", "c", "d"]
+    values = [1, 3, 2, 0]
+    sheet = ProductScoresheet(nodes, values, minimum=2)
+    expected = Scoresheet({("b", "c"): 6, ("a", "b"): 3, ("a", "c"): 2})
+    assert len(sheet) == 3
+    assert dict(sheet.items()) == expected
+    assert list(sheet.ranked_items()) == list(expected.ranked_items())
+    assert sheet.top(1) == {Pair("b", "c"): 6.0}
+    assert ("a", "d") not in sheet
+    assert sheet[("a", "d")] == 0.0
+
+    del sheet[("a", "b")]
+    assert len(sheet) == 2
+    assert ("a", "b") not in sheet
+    assert list(sheet) == [Pair("b", "c"), Pair("a", "c")]
+    with pytest.raises(KeyError):
+        del sheet[("a", "d")]
+
+
+def test_product_scoresheet_to_file():
+    sheet = ProductScoresheet(["a", "b", "c"], [1, 2, 3])
+    with temp_file() as fname:
+        sheet.to_file(fname)
+        assert Scoresheet.from_file(fname) == dict(sheet.items())
+
+
+def test_product_scoresheet_ties():
+    # Nodes are not in sorted order, values repeat and 2 * 6 == 3 * 4
+    nodes = [7, 3, 9, 1, 5, 0, 8, 2, 6, 4]
+    values = [2, 6, 3, 4, 2, 0, 6, 3, 1, 4]
+    sheet = ProductScoresheet(nodes, values, minimum=0)
+    expected = Scoresheet(
+        {
+            (u, v): a * b
+            for (u, a), (v, b) in itertools.combinations(zip(nodes, values), 2)
+        }
+    )
+    ranking = list(expected.ranked_items())
+    assert list(sheet.ranked_items()) == ranking
+    assert sheet.top(9) == dict(ranking[:9])
+
+
+def test_array_scoresheet_ties():
+    # Nodes are not in sorted order and many pairs share a score
+    nodes = [7, 3, 9, 1, 5, 0, 8, 2, 6, 4]
+    rows, cols = np.triu_indices(len(nodes), 1)
+    scores = (rows + cols) % 3
+    sheet = ArrayScoresheet(nodes, rows, cols, scores)
+    expected = Scoresheet(
+        {
+            (nodes[i], nodes[j]): score
+            for i, j, score in zip(rows.tolist(), cols.tolist(), scores.tolist())
+        }
+    )
+    ranking = list(expected.ranked_items())
+    assert list(sheet.ranked_items()) == ranking
+    assert list(sheet.ranked_items(7)) == ranking[:7]
+    assert list(sheet.truncated(7).ranked_items()) == ranking[:7]
+    rows, cols, _ = sheet.ranked_arrays()
+    pairs = [Pair(nodes[i], nodes[j]) for i, j in zip(rows.tolist(), cols.tolist())]
+    assert pairs == [pair for pair, _ in ranking]
+
+
+def test_random_scoresheet():
+    sheet = RandomScoresheet(range(60), key=3)
+    sheet.block_size = 100  # Force several blocks
+    assert len(sheet) == 60 * 59 / 2
+    scores = {Pair(u, v): sheet[(u, v)] for u in range(60) for v in range(u)}
+    assert all(0 <= score < 1 for score in scores.values())
+    ranked = list(sheet.ranked_items())
+    assert dict(ranked) == scores
+    assert [score for _, score in ranked] == sorted(scores.values(), reverse=True)
+    assert list(sheet.ranked_items(5)) == ranked[:5]
+    assert RandomScoresheet(range(60), key=4)[(0, 1)] != sheet[(0, 1)]
+
+
+def test_community_scoresheet():
+    nodes = ["a", "b", "c", "d", "e", "f"]
+    labels = [[0, 0, 1, 1, 2, 3], [0, 0, 0, 0, 1, 2], [0, 0, 0, 0, 1, 1]]
+    sheet = CommunityScoresheet(nodes, labels)
+    expected = {("a", "b"): 6, ("c", "d"): 6, ("e", "f"): 1}
+    expected.update(dict.fromkeys([("a", "c"), ("a", "d"), ("b", "c"), ("b", "d")], 3))
+    expected = Scoresheet(expected)
+    assert len(sheet) == 7
+    assert dict(sheet.items()) == expected
+    assert list(sheet.ranked_items()) == list(expected.ranked_items())
+    assert ("a", "e") not in sheet
+
+    del sheet[("c", "d")]
+    assert len(sheet) == 6
+    assert sheet.top(2) == {Pair("a", "b"): 6.0, Pair("b", "d"): 3.0}
+
+
+def test_array_scoresheet():
+    nodes = ["a", "b", "c", "d"]
+    sheet = ArrayScoresheet(nodes, [0, 2, 3, 1], [1, 0, 2, 3], [0.5, 0.9, 0.5, 0.1])
+    expected = Scoresheet(
+        {("a", "b"): 0.5, ("a", "c"): 0.9, ("c", "d"): 0.5, ("b", "d"): 0.1}
+    )
+    assert len(sheet) == 4
+    assert dict(sheet.items()) == expected
+    assert sheet[("c", "a")] == 0.9
+    assert ("a", "d") not in sheet
+    assert sheet[("a", "d")] == 0.0
+    assert sheet.top(2) == {Pair("a", "c"): 0.9, Pair("c", "d"): 0.5}
+    assert list(sheet.ranked_items()) == list(expected.ranked_items())
+
+    del sheet[("a", "b")]
+    assert len(sheet) == 3
+    assert sheet.top(2) == {Pair("a", "c"): 0.9, Pair("c", "d"): 0.5}
+    assert list(sheet) == [Pair("a", "c"), Pair("c", "d"), Pair("b", "d")]
+    rows, cols, scores = sheet.arrays()
+    assert sorted(zip(rows.tolist(), cols.tolist())) == [(0, 2), (1, 3), (2, 3)]
+    assert sorted(scores.tolist()) == [0.1, 0.5, 0.9]
+
+    with temp_file() as fname:
+        sheet.to_file(fname)
+        assert Scoresheet.from_file(fname) == dict(sheet.items())